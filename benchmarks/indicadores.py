@@ -0,0 +1,113 @@
+"""Desempenho dos indicadores NumPy (src/indicators.py).
+
+Mede o tempo por chamada de cada kernel e da implementação original em
+pandas que ele substituiu. A equivalência entre os dois é verificada em
+tests/test_indicators.py. Rodar da raiz do projeto:
+
+    python -m benchmarks.indicadores
+"""
+import sys
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from src import indicators as indicadores
+
+TAMANHOS = (200, 1000, 10000)
+
+
+# Implementações originais da EstrategiaTrading, mantidas aqui como referência
+def ema_pandas(data, period):
+    return pd.Series(data).ewm(span=period, adjust=False).mean().values
+
+
+def macd_pandas(data, short_period=12, long_period=26, signal_period=9):
+    macd_line = ema_pandas(data, short_period) - ema_pandas(data, long_period)
+    return macd_line, ema_pandas(macd_line, signal_period)
+
+
+def rsi_original(data, period=14):
+    delta = np.diff(data)
+    gain = np.where(delta > 0, delta, 0)
+    loss = np.where(delta < 0, -delta, 0)
+    avg_gain = np.convolve(gain, np.ones(period) / period, mode='valid')
+    avg_loss = np.convolve(loss, np.ones(period) / period, mode='valid')
+    rs = avg_gain / np.where(avg_loss == 0, 0.000001, avg_loss)
+    rsi = 100 - (100 / (1 + rs))
+    return np.concatenate([np.full(period - 1, 50), rsi])
+
+
+def bollinger_pandas(data, period=20, num_std=2):
+    sma = pd.Series(data).rolling(window=period).mean()
+    std = pd.Series(data).rolling(window=period).std()
+    return (sma + std * num_std).values, sma.values, (sma - std * num_std).values
+
+
+def stochastic_pandas(high, low, close, period=14, k_smooth=3, d_smooth=3):
+    low_min = pd.Series(low).rolling(window=period).min()
+    high_max = pd.Series(high).rolling(window=period).max()
+    k = 100 * ((pd.Series(close) - low_min) / (high_max - low_min))
+    k = k.rolling(window=k_smooth).mean()
+    d = k.rolling(window=d_smooth).mean()
+    return k.values, d.values
+
+
+def atr_pandas(high, low, close, period=14):
+    high, low, close = pd.Series(high), pd.Series(low), pd.Series(close)
+    tr = pd.concat([high - low, abs(high - close.shift()), abs(low - close.shift())], axis=1).max(axis=1)
+    return tr.rolling(window=period).mean().values
+
+
+def momentum_original(data, period=10):
+    momentum = np.zeros_like(data)
+    momentum[period:] = data[period:] - data[:-period]
+    momentum[:period] = momentum[period]
+    return momentum
+
+
+def gerar_barras(n, seed=0, base=130000.0):
+    rng = np.random.default_rng(seed)
+    close = base + np.cumsum(rng.normal(0, 50, n)).round(0)
+    high = close + rng.uniform(0, 60, n).round(0)
+    low = close - rng.uniform(0, 60, n).round(0)
+    return high, low, close
+
+
+def casos(high, low, close):
+    """(nome, kernel, referência) com os parâmetros usados pela estratégia"""
+    return [
+        ("ema9", lambda: indicadores.ema(close, 9), lambda: ema_pandas(close, 9)),
+        ("ema50", lambda: indicadores.ema(close, 50), lambda: ema_pandas(close, 50)),
+        ("macd", lambda: indicadores.macd(close), lambda: macd_pandas(close)),
+        ("rsi", lambda: indicadores.rsi(close, 14), lambda: rsi_original(close, 14)),
+        ("bollinger", lambda: indicadores.bollinger_bands(close, 20, 1.8),
+         lambda: bollinger_pandas(close, 20, 1.8)),
+        ("stochastic", lambda: indicadores.stochastic(high, low, close, 10),
+         lambda: stochastic_pandas(high, low, close, 10)),
+        ("atr", lambda: indicadores.atr(high, low, close, 10), lambda: atr_pandas(high, low, close, 10)),
+        ("momentum", lambda: indicadores.momentum(close, 10), lambda: momentum_original(close, 10)),
+    ]
+
+
+def medir(repeticoes=200):
+    linhas = []
+    for n in TAMANHOS:
+        high, low, close = gerar_barras(n)
+        vezes = max(5, repeticoes * 200 // n)
+        for nome, kernel, referencia in casos(high, low, close):
+            t_kernel = min(timeit.repeat(kernel, number=vezes, repeat=3)) / vezes
+            t_referencia = min(timeit.repeat(referencia, number=vezes, repeat=3)) / vezes
+            linhas.append((nome, n, t_referencia * 1e6, t_kernel * 1e6, t_referencia / t_kernel))
+    return linhas
+
+
+def main():
+    print(f"{'indicador':<12}{'barras':>8}{'original (us)':>16}{'numpy (us)':>14}{'ganho':>8}")
+    for nome, n, t_referencia, t_kernel, ganho in medir():
+        print(f"{nome:<12}{n:>8}{t_referencia:>16.1f}{t_kernel:>14.1f}{ganho:>7.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
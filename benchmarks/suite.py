@@ -0,0 +1,216 @@
+"""Suíte de benchmarks do caminho quente, com saída JSON estável para comparar versões.
+
+Roda sobre o mt5_simulado (relógio parado, barras sintéticas com semente
+fixa), então não precisa de terminal. Rodar da raiz do projeto:
+
+    python -m benchmarks.suite --saida atual.json
+    python -m benchmarks.suite --base anterior.json --tolerancia 0.25
+
+Com --base, cada medida cuja mediana piorou mais que a tolerância (e mais
+que --folga-us) é listada e o processo termina com código 1.
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+
+import numpy as np
+
+from src import mt5_simulado
+
+simulador = mt5_simulado.SimuladorMT5(velocidade=0)
+simulador.gerar_sintetico("BENCH", barras=50000, seed=42)
+mt5 = mt5_simulado.instalar(simulador)
+
+from src.multi_asset_log_system import MultiAssetLogSystem  # noqa: E402
+from src.multi_asset_trading import EstrategiaTrading  # noqa: E402
+from src.order_gateway import GatewayOrdens  # noqa: E402
+from src.risk_engine import MotorRisco  # noqa: E402
+
+VERSAO_FORMATO = 1
+TAMANHOS = (200, 1000, 10000)
+
+
+class LogNulo:
+    def habilitado(self, ativo, nivel):
+        return True
+
+    def logar(self, ativo, mensagem, *args, **kwargs):
+        pass
+
+
+def medir(funcao, repeticoes, preparar=None, aquecimento=5, rodadas=3):
+    """Estatísticas em microssegundos do tempo por chamada de `funcao`.
+
+    Cada medida é repetida em `rodadas` e fica a rodada de menor mediana,
+    o que tira boa parte do ruído de outros processos na máquina.
+    """
+    for _ in range(aquecimento):
+        if preparar:
+            preparar()
+        funcao()
+    melhor = None
+    for _ in range(rodadas):
+        tempos = np.empty(repeticoes)
+        for i in range(repeticoes):
+            if preparar:
+                preparar()
+            inicio = time.perf_counter_ns()
+            funcao()
+            tempos[i] = time.perf_counter_ns() - inicio
+        if melhor is None or np.median(tempos) < np.median(melhor):
+            melhor = tempos
+    tempos = melhor / 1000.0
+    return {
+        "n": repeticoes * rodadas,
+        "min_us": round(float(tempos.min()), 1),
+        "mediana_us": round(float(np.median(tempos)), 1),
+        "p95_us": round(float(np.percentile(tempos, 95)), 1),
+        "media_us": round(float(tempos.mean()), 1),
+    }
+
+
+def criar_estrategia():
+    # Sem limite de envios por segundo nem de posições: a medida é a latência de uma ordem, não a vazão
+    estrategia = EstrategiaTrading("BENCH", "M5", 1, LogNulo(), gateway=GatewayOrdens(max_por_segundo=1e9),
+                                   risco=MotorRisco(max_positions=float("inf"), max_daily_loss=float("inf")))
+    estrategia.verificar_horario_favoravel = lambda: False  # ciclo sem envio de ordem; ver bench_ordem
+    return estrategia
+
+
+def bench_indicadores(resultados):
+    estrategia = criar_estrategia()
+    # O relógio começa no aquecimento do simulador (barra 1000): avança para haver max(TAMANHOS) barras fechadas
+    simulador.posicionar(int(simulador.ativos["BENCH"].m1['time'][max(TAMANHOS) + 1]))
+    for n in TAMANHOS:
+        barras = mt5.copy_rates_from_pos("BENCH", mt5.TIMEFRAME_M1, 1, n)
+        assert len(barras) == n, f"{len(barras)} barras para o caso de {n}"
+        high, low, close = barras['high'], barras['low'], barras['close']
+        casos = {
+            "ema9": lambda: estrategia.ema(close, 9),
+            "macd": lambda: estrategia.macd(close),
+            "rsi": lambda: estrategia.rsi(close, 14),
+            "bollinger": lambda: estrategia.bollinger_bands(close, 20, estrategia.bb_desvio),
+            "stochastic": lambda: estrategia.stochastic(high, low, close, estrategia.stoch_period),
+            "atr": lambda: estrategia.atr(high, low, close, estrategia.atr_period),
+            "momentum": lambda: estrategia.momentum(close, 10),
+        }
+        repeticoes = max(20, 200000 // n)
+        for nome, funcao in casos.items():
+            resultados[f"indicador.{nome}.{n}"] = medir(funcao, repeticoes)
+
+
+def bench_ciclo(resultados):
+    """Um analisar_e_operar completo, com uma barra M5 nova a cada chamada"""
+    estrategia = criar_estrategia()
+    simulador.posicionar(int(simulador.ativos["BENCH"].m1['time'][5000]))
+    resultados["ciclo.barra_nova"] = medir(estrategia.analisar_e_operar, 300,
+                                           preparar=lambda: simulador.avancar(300))
+    resultados["ciclo.mesma_barra"] = medir(estrategia.analisar_e_operar, 300)
+
+
+def bench_ordem(resultados):
+    """Caminho de abrir_ordem até o resultado do gateway (inclui as trocas de thread)"""
+    estrategia = criar_estrategia()
+    atr = 100.0
+
+    resultados["ordem.abrir_ordem"] = medir(
+        lambda: estrategia.abrir_ordem(mt5.ORDER_TYPE_BUY, atr, atr * 1.5).result(), 500,
+        preparar=simulador.posicoes.clear,
+    )
+    resultados["ordem.verificar_risco"] = medir(estrategia.verificar_risco_posicao, 1000)
+
+
+def bench_log(resultados):
+    mensagem = "📊 Análise: preço 131154.00000 | RSI 45.20 | força 3"
+
+    log = MultiAssetLogSystem()
+    resultados["log.sem_interface"] = medir(lambda: log.logar("BENCH", mensagem), 20000)
+    log.definir_nivel("TRADE", "BENCH")
+    resultados["log.abaixo_do_nivel"] = medir(
+        lambda: log.logar("BENCH", "  • RSI: %.2f %s", 45.2, "⚪", nivel="DEBUG"), 20000
+    )
+
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+        root.withdraw()
+    except Exception as e:
+        resultados["log.com_interface"] = {"indisponivel": type(e).__name__}
+        return
+    try:
+        log = MultiAssetLogSystem()
+        log.criar_interface_logs(root, ["BENCH"])
+        resultados["log.com_interface"] = medir(lambda: log.logar("BENCH", mensagem), 2000)
+        inicio = time.perf_counter()
+        root.update()
+        resultados["log.com_interface.redesenho"] = {
+            "n": 1, "total_ms": round((time.perf_counter() - inicio) * 1e3, 1)
+        }
+    finally:
+        root.destroy()
+
+
+def executar():
+    resultados = {}
+    bench_indicadores(resultados)
+    bench_ciclo(resultados)
+    bench_ordem(resultados)
+    bench_log(resultados)
+    return {
+        "formato": VERSAO_FORMATO,
+        "ambiente": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "plataforma": platform.platform(),
+            "processador": platform.processor() or platform.machine(),
+        },
+        "resultados": resultados,
+    }
+
+
+def comparar(atual, base, tolerancia, folga_us=5.0):
+    """Medidas cuja mediana piorou mais que `tolerancia` (fração) e mais que `folga_us` em relação à base"""
+    regressoes = []
+    for nome, medida in sorted(atual["resultados"].items()):
+        anterior = base.get("resultados", {}).get(nome)
+        if not anterior or "mediana_us" not in medida or "mediana_us" not in anterior:
+            continue
+        limite = max(anterior["mediana_us"] * (1 + tolerancia), anterior["mediana_us"] + folga_us)
+        if medida["mediana_us"] > limite:
+            regressoes.append((nome, anterior["mediana_us"], medida["mediana_us"]))
+    return regressoes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--saida", help="arquivo JSON para gravar os resultados (padrão: stdout)")
+    parser.add_argument("--base", help="JSON de uma execução anterior para comparar")
+    parser.add_argument("--tolerancia", type=float, default=0.2, help="piora relativa aceita (padrão 0.2)")
+    parser.add_argument("--folga-us", type=float, default=5.0,
+                        help="piora absoluta ignorada em medidas muito rápidas (padrão 5us)")
+    args = parser.parse_args(argv)
+
+    atual = executar()
+    texto = json.dumps(atual, indent=2, sort_keys=True, ensure_ascii=False)
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as arquivo:
+            arquivo.write(texto + "\n")
+    else:
+        print(texto)
+
+    if args.base:
+        with open(args.base, encoding="utf-8") as arquivo:
+            base = json.load(arquivo)
+        regressoes = comparar(atual, base, args.tolerancia, args.folga_us)
+        for nome, antes, depois in regressoes:
+            print(f"❌ {nome}: {antes:.1f}us -> {depois:.1f}us", file=sys.stderr)
+        if regressoes:
+            return 1
+        print("✅ Sem regressões acima da tolerância", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1 @@
+"""Raiz do projeto no sys.path, para os testes importarem `src` e `benchmarks` como nos scripts"""
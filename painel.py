@@ -1,6 +1,6 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-import MetaTrader5 as mt5
+from src.mt5_client import mt5
 from utils import obter_saldo
 from estrategia import EstrategiaTrading
 from log_system import LogSystem
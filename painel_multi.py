@@ -1,7 +1,7 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-import MetaTrader5 as mt5
 from utils import obter_saldo
+from src.mt5_client import mt5
 from src.multi_asset_trading import MultiAssetTrading
 from src.multi_asset_log_system import MultiAssetLogSystem
 import threading
@@ -254,7 +254,7 @@ class PainelMultiAsset:
             
             self.log_system.logar("Sistema", "✅ Ativos atualizados com sucesso!")
         except Exception as e:
-            self.log_system.logar("Sistema", f"❌ Erro ao carregar ativos: {e}")
+            self.log_system.logar("Sistema", f"❌ Erro ao carregar ativos: {e}", nivel="ERROR")
 
     def toggle_asset(self, index):
         config = self.asset_configs[index]
@@ -288,7 +288,7 @@ class PainelMultiAsset:
                 self.log_system.logar(f"Ativo {index+1}", "⚠️ O lote deve ser maior que zero!")
                 return False
         except ValueError:
-            self.log_system.logar(f"Ativo {index+1}", "❌ Valor de lote inválido!")
+            self.log_system.logar(f"Ativo {index+1}", "❌ Valor de lote inválido!", nivel="ERROR")
             return False
 
         return True
@@ -310,12 +310,13 @@ class PainelMultiAsset:
             float(config['lote'].get()),
             self.log_system
         )
+        self.multi_trading.iniciar_ativo(ativo)
         
         self.log_system.logar(f"Ativo {index+1}", f"✅ Iniciando operações em {ativo}")
 
     def validar_mercado(self, info, ativo, index):
         if info is None:
-            self.log_system.logar(f"Ativo {index+1}", f"❌ Ativo {ativo} não encontrado no MetaTrader 5.")
+            self.log_system.logar(f"Ativo {index+1}", f"❌ Ativo {ativo} não encontrado no MetaTrader 5.", nivel="ERROR")
             return False
 
         if not info.visible:
@@ -323,12 +324,12 @@ class PainelMultiAsset:
             return False
 
         if info.trade_mode != mt5.SYMBOL_TRADE_MODE_FULL:
-            self.log_system.logar(f"Ativo {index+1}", f"❌ Ativo {ativo} não está liberado para operar!")
+            self.log_system.logar(f"Ativo {index+1}", f"❌ Ativo {ativo} não está liberado para operar!", nivel="ERROR")
             return False
 
         tick = mt5.symbol_info_tick(ativo)
         if tick is None:
-            self.log_system.logar(f"Ativo {index+1}", f"❌ Não foi possível obter preços do ativo {ativo}.")
+            self.log_system.logar(f"Ativo {index+1}", f"❌ Não foi possível obter preços do ativo {ativo}.", nivel="ERROR")
             return False
 
         spread = (tick.ask - tick.bid) / info.point
@@ -377,3 +378,4 @@ if __name__ == "__main__":
     root = tk.Tk()
     app = PainelMultiAsset(root)
     root.mainloop()
+    app.multi_trading.parar_todos()
@@ -0,0 +1,170 @@
+"""Modo asyncio do MultiAssetTrading.
+
+Cada estratégia vira uma tarefa (coroutine) que executa um ciclo, dorme até
+o próximo (`asyncio.sleep` com a espera do AgendadorBarras) e repete. Parar
+um ativo é cancelar a tarefa; não há flag `operando` para conferir.
+
+O ciclo em si continua síncrono (indicadores em NumPy e chamadas ao
+terminal pelo ClienteMT5) e roda num ThreadPoolExecutor limitado a
+`max_ciclos` ciclos simultâneos. Todas as chamadas ao terminal, deste
+runtime e do caminho com threads, passam pela única thread de E/S do
+ClienteMT5: uma chamada travada trava todas as estratégias. O timeout de
+ciclo não evita isso; ele mantém o loop livre (o servidor de controle
+continua respondendo) e tira do ar a estratégia cujo ciclo passou do limite:
+ela é marcada como degradada e a tarefa termina, sem disparar outro ciclo.
+O ciclo travado não pode ser interrompido, então o ativo continua reservado
+(para este runtime e para o PoolEstrategias) até ele terminar; a liberação
+é feita pela thread do executor que o concluiu, mesmo que o loop já tenha
+sido fechado. Depois disso o ativo pode ser iniciado de novo. Chamadas
+diretas ao terminal a partir de coroutines usam `await runtime.chamar(...)`,
+também com timeout.
+
+Roda ao lado do caminho com threads: usa as estratégias de um
+MultiAssetTrading e recusa ativos que já estejam no PoolEstrategias. Para
+comparar os dois, rode parte dos ativos em cada modo:
+
+    runtime = RuntimeAssincrono(multi_trading)
+    threading.Thread(target=asyncio.run, args=(runtime.executar(["WIN$"], porta_controle=8765),),
+                     daemon=True).start()
+
+Com `porta_controle`, um servidor local aceita comandos de uma linha
+(`status`, `iniciar ATIVO`, `parar ATIVO`) e responde em JSON.
+"""
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from src.metrics import metricas
+from src.mt5_client import mt5
+
+
+class RuntimeAssincrono:
+    def __init__(self, multi_trading, max_ciclos=4, timeout_ciclo=60.0, timeout_terminal=10.0):
+        self.multi = multi_trading
+        self.max_ciclos = max_ciclos
+        self.timeout_ciclo = timeout_ciclo
+        self.timeout_terminal = timeout_terminal
+        self.executor = ThreadPoolExecutor(max_ciclos, thread_name_prefix="ciclos-async")
+        self.tarefas = {}  # ativo -> asyncio.Task
+        self.degradados = set()  # ativos parados por um ciclo além do timeout, ainda em andamento
+        self.conexoes = {}  # tarefa do atendimento -> StreamWriter
+        self.parada = None
+        self.metricas = metricas.ativo("asyncio")
+
+    async def chamar(self, nome, *args, timeout=None, **kwargs):
+        """Chamada ao terminal pelo ClienteMT5 sem bloquear o loop; asyncio.TimeoutError se demorar demais"""
+        futuro = asyncio.wrap_future(mt5.enviar(nome, *args, **kwargs))
+        return await asyncio.wait_for(futuro, timeout or self.timeout_terminal)
+
+    async def _rodar(self, ativo, estrategia):
+        tarefa = asyncio.current_task()
+        ciclo = None
+        try:
+            while True:
+                ciclo = self.executor.submit(estrategia.executar_ciclo)
+                try:
+                    # shield: cancelar a tarefa não marca o ciclo como cancelado enquanto ele roda
+                    espera = await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(ciclo)), self.timeout_ciclo)
+                except asyncio.TimeoutError:
+                    with self.multi.lock:
+                        self.degradados.add(ativo)
+                    self.metricas.contar("ciclos_expirados")
+                    estrategia.logar("⏱️ Ciclo excedeu %gs; estratégia degradada e parada até o ciclo terminar",
+                                     self.timeout_ciclo, nivel="ERROR", evento="timeout")
+                    return
+                await asyncio.sleep(espera)
+        finally:
+            if ciclo is not None and not ciclo.cancel() and not ciclo.done():
+                # Ativo reservado até o ciclo terminar; o callback roda na thread do executor
+                ciclo.add_done_callback(lambda _: self._liberar(ativo, tarefa))
+            else:
+                self._liberar(ativo, tarefa)
+
+    def _liberar(self, ativo, tarefa):
+        """Devolve o ativo (chamado no loop ou na thread do executor que concluiu o ciclo)"""
+        with self.multi.lock:
+            if self.tarefas.get(ativo) is not tarefa:
+                return
+            del self.tarefas[ativo]
+            self.degradados.discard(ativo)
+            self.multi.assincronos.discard(ativo)
+
+    def iniciar_ativo(self, ativo):
+        """Cria a tarefa do ativo (chamar de dentro do loop); False se não existe ou já está rodando"""
+        with self.multi.lock:
+            estrategia = self.multi.estrategias.get(ativo)
+            if (estrategia is None or ativo in self.tarefas or ativo in self.multi.assincronos
+                    or ativo in self.multi.em_processos or self.multi.pool.ocupada(estrategia)):
+                return False
+            estrategia.operando = True
+            estrategia.parada.clear()
+            self.multi.assincronos.add(ativo)
+            self.tarefas[ativo] = asyncio.get_running_loop().create_task(
+                self._rodar(ativo, estrategia), name=f"estrategia-{ativo}"
+            )
+        return True
+
+    def parar_ativo(self, ativo):
+        tarefa = self.tarefas.get(ativo)
+        if tarefa is None or tarefa.done():
+            return False
+        tarefa.cancel()
+        return True
+
+    def status(self):
+        resumo = metricas.resumo()
+        with self.multi.lock:
+            ativos = {ativo: ativo in self.degradados for ativo in self.tarefas}
+        return {
+            ativo: {**resumo.get(ativo, {}).get("contadores", {}), "degradado": degradado}
+            for ativo, degradado in ativos.items()
+        }
+
+    async def _atender(self, leitor, escritor):
+        self.conexoes[asyncio.current_task()] = escritor
+        try:
+            while linha := await leitor.readline():
+                comando, _, ativo = linha.decode("utf-8").strip().partition(" ")
+                if comando == "status":
+                    resposta = {"ok": True, "ativos": self.status()}
+                elif comando == "iniciar":
+                    resposta = {"ok": self.iniciar_ativo(ativo)}
+                elif comando == "parar":
+                    resposta = {"ok": self.parar_ativo(ativo)}
+                else:
+                    resposta = {"ok": False, "erro": f"comando desconhecido: {comando}"}
+                escritor.write((json.dumps(resposta, ensure_ascii=False) + "\n").encode("utf-8"))
+                await escritor.drain()
+        finally:
+            self.conexoes.pop(asyncio.current_task(), None)
+            escritor.close()
+
+    async def executar(self, ativos=None, porta_controle=None, host="127.0.0.1"):
+        """Roda os ativos dados (padrão: todos do MultiAssetTrading) até `parar()`"""
+        self.parada = asyncio.Event()
+        for ativo in (ativos if ativos is not None else list(self.multi.estrategias)):
+            self.iniciar_ativo(ativo)
+        servidor = None
+        if porta_controle is not None:
+            servidor = await asyncio.start_server(self._atender, host, porta_controle)
+        try:
+            await self.parada.wait()
+        finally:
+            with self.multi.lock:
+                tarefas = list(self.tarefas.values())
+            for tarefa in tarefas:
+                tarefa.cancel()
+            await asyncio.gather(*tarefas, return_exceptions=True)
+            if servidor is not None:
+                servidor.close()
+                atendimentos = list(self.conexoes)
+                for escritor in self.conexoes.values():
+                    escritor.close()  # o readline pendente retorna b"" e o atendimento termina
+                await asyncio.gather(*atendimentos, return_exceptions=True)
+                await servidor.wait_closed()
+            self.executor.shutdown(wait=False)
+
+    def parar(self):
+        """Cancela todas as tarefas e encerra `executar` (chamar de dentro do loop)"""
+        if self.parada is not None:
+            self.parada.set()
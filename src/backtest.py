@@ -0,0 +1,162 @@
+import heapq
+from collections import namedtuple
+from datetime import time
+
+import numpy as np
+import pandas as pd
+
+from src.bar_ingestion import precos_validos
+from src.signal_rules import ParametrosEstrategia, avaliar_series, calcular_series, distancias_sl_tp
+
+ResultadoBacktest = namedtuple("ResultadoBacktest", ["trades", "equity"])
+
+COLUNAS_TRADES = [
+    "entrada", "saida", "tipo", "preco_entrada", "preco_saida", "sl", "tp",
+    "forca_tendencia", "motivo", "resultado",
+]
+
+
+def _segundos_do_dia(hora):
+    return hora.hour * 3600 + hora.minute * 60 + hora.second
+
+
+class MotorBacktest:
+    """Backtest vetorizado das regras de sinal da EstrategiaTrading sobre um histórico de barras.
+
+    Indicadores e sinais são calculados de uma vez para todas as barras, com
+    as mesmas regras do analisar_e_operar. Um sinal na barra i (já fechada)
+    entra na abertura da barra i+1 com SL/TP pelo ATR e força da tendência,
+    exatamente como no abrir_ordem (inclusive a multiplicação pelo `point`).
+    Só o percurso de cada trade até SL/TP é buscado individualmente.
+    """
+
+    def __init__(self, parametros=None, lote=1.0, point=1.0, capital_inicial=0.0,
+                 horario_inicio=time(9, 0), horario_fim=time(17, 30), filtrar_horario=True, aquecimento=100):
+        self.parametros = parametros or ParametrosEstrategia()
+        self.lote = float(lote)
+        self.point = float(point)
+        self.capital_inicial = float(capital_inicial)
+        self.horario_inicio = horario_inicio
+        self.horario_fim = horario_fim
+        self.filtrar_horario = filtrar_horario
+        self.aquecimento = aquecimento
+
+    def sinais(self, barras):
+        """Sinais de compra e venda de cada barra (já com horário e aquecimento), força e distâncias"""
+        close = barras['close'].astype(np.float64)
+        high = barras['high'].astype(np.float64)
+        low = barras['low'].astype(np.float64)
+        n = len(close)
+
+        series = calcular_series(close, high, low, barras['tick_volume'], self.parametros)
+        condicoes = avaliar_series(series, close, high, low, self.parametros)
+
+        def alinhar(valores, preenchimento=False):
+            saida = np.full(n, preenchimento, dtype=np.asarray(valores).dtype)
+            saida[2:] = valores
+            return saida
+
+        validos = np.zeros(n, dtype=bool)
+        validos[self.aquecimento - 1:] = True
+        for nome in ("ema9", "ema21", "ema50", "macd", "rsi"):
+            validos &= ~np.isnan(series[nome])
+
+        # O horário é o da decisão: abertura da barra seguinte, onde a ordem é enviada
+        if self.filtrar_horario:
+            segundos = np.empty(n, dtype=np.int64)
+            segundos[:-1] = barras['time'][1:] % 86400
+            segundos[-1] = -1
+            validos &= ((segundos >= _segundos_do_dia(self.horario_inicio))
+                        & (segundos <= _segundos_do_dia(self.horario_fim)))
+        validos[-1] = False  # não há barra seguinte para entrar
+
+        compra = alinhar(condicoes.pre_compra) & validos
+        venda = alinhar(condicoes.pre_venda) & validos & ~compra
+        forca = alinhar(condicoes.forca_tendencia, 0)
+        sl_distance, tp_distance = distancias_sl_tp(series["atr"], forca, self.parametros)
+        return compra, venda, forca, sl_distance, tp_distance
+
+    def _buscar_saida(self, inicio, compra, sl, tp, open_, high, low):
+        """Primeira barra a partir de `inicio` que toca SL ou TP; SL vence no empate"""
+        n = len(high)
+        tamanho = 64
+        while inicio < n:
+            fim = min(n, inicio + tamanho)
+            if compra:
+                toca_sl = low[inicio:fim] <= sl
+                toca_tp = high[inicio:fim] >= tp
+            else:
+                toca_sl = high[inicio:fim] >= sl
+                toca_tp = low[inicio:fim] <= tp
+            tocou = toca_sl | toca_tp
+            if tocou.any():
+                k = int(np.argmax(tocou))
+                indice = inicio + k
+                if toca_sl[k]:
+                    # Gap além do stop sai na abertura
+                    preco = min(open_[indice], sl) if compra else max(open_[indice], sl)
+                    return indice, preco, "sl"
+                preco = max(open_[indice], tp) if compra else min(open_[indice], tp)
+                return indice, preco, "tp"
+            inicio = fim
+            tamanho *= 2
+        return n - 1, None, "fim"
+
+    def executar(self, barras):
+        if len(barras) < self.aquecimento + 2 or not precos_validos(barras, ('open', 'high', 'low', 'close')):
+            raise ValueError("Histórico insuficiente ou com preços inválidos para o backtest")
+
+        compra, venda, forca, sl_distance, tp_distance = self.sinais(barras)
+        open_ = barras['open'].astype(np.float64)
+        high = barras['high'].astype(np.float64)
+        low = barras['low'].astype(np.float64)
+        close = barras['close'].astype(np.float64)
+        tempos = barras['time']
+        n = len(close)
+
+        trades = []
+        abertas = []  # heap com o índice de saída das posições abertas
+        for i in np.flatnonzero(compra | venda):
+            entrada = i + 1
+            while abertas and abertas[0] < entrada:
+                heapq.heappop(abertas)
+            if len(abertas) >= self.parametros.max_positions:
+                continue
+
+            eh_compra = bool(compra[i])
+            preco = open_[entrada]
+            if eh_compra:
+                sl = preco - sl_distance[i] * self.point
+                tp = preco + tp_distance[i] * self.point
+            else:
+                sl = preco + sl_distance[i] * self.point
+                tp = preco - tp_distance[i] * self.point
+
+            saida, preco_saida, motivo = self._buscar_saida(entrada, eh_compra, sl, tp, open_, high, low)
+            if preco_saida is None:
+                preco_saida = close[-1]
+            resultado = (preco_saida - preco if eh_compra else preco - preco_saida) * self.lote
+
+            heapq.heappush(abertas, saida)
+            trades.append((
+                tempos[entrada], tempos[saida], "COMPRA" if eh_compra else "VENDA", preco, preco_saida,
+                sl, tp, int(forca[i]), motivo, resultado, saida,
+            ))
+
+        tabela = pd.DataFrame(trades, columns=COLUNAS_TRADES + ["indice_saida"])
+        realizados = np.bincount(
+            tabela["indice_saida"].to_numpy(dtype=np.int64), weights=tabela["resultado"].to_numpy(), minlength=n
+        ) if len(tabela) else np.zeros(n)
+        equity = pd.Series(
+            self.capital_inicial + np.cumsum(realizados),
+            index=pd.to_datetime(tempos, unit="s"),
+            name="equity",
+        )
+        for coluna in ("entrada", "saida"):
+            tabela[coluna] = pd.to_datetime(tabela[coluna], unit="s")
+        return ResultadoBacktest(tabela.drop(columns="indice_saida"), equity)
+
+
+def executar_backtest(barras, parametros=None, **opcoes):
+    """Atalho: MotorBacktest(parametros, **opcoes).executar(barras)"""
+    return MotorBacktest(parametros, **opcoes).executar(barras)
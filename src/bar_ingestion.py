@@ -0,0 +1,56 @@
+from collections import namedtuple
+
+import numpy as np
+from numpy.lib.stride_tricks import as_strided
+
+# Layout do array estruturado devolvido por copy_rates_from_pos / copy_rates_range
+DTYPE_BARRAS = np.dtype([
+    ('time', '<i8'),
+    ('open', '<f8'),
+    ('high', '<f8'),
+    ('low', '<f8'),
+    ('close', '<f8'),
+    ('tick_volume', '<u8'),
+    ('spread', '<i4'),
+    ('real_volume', '<u8'),
+], align=False)
+
+CAMPOS_ESTRATEGIA = ('time', 'high', 'low', 'close', 'tick_volume')
+CAMPOS_PRECO = ('high', 'low', 'close')
+
+CamposBarras = namedtuple("CamposBarras", CAMPOS_ESTRATEGIA)
+
+
+def extrair_campos(barras):
+    """Views (sem cópia) das colunas que a estratégia consome"""
+    return CamposBarras(*(barras[campo] for campo in CAMPOS_ESTRATEGIA))
+
+
+def _bloco_contiguo(dtype, campos):
+    """Offset do primeiro campo se `campos` forem float64 consecutivos no registro, senão None"""
+    try:
+        tipos = [dtype.fields[campo] for campo in campos]
+    except (KeyError, TypeError):
+        return None
+    inicio = tipos[0][1]
+    for i, (tipo, offset) in enumerate(tipos):
+        if tipo != np.float64 or offset != inicio + 8 * i:
+            return None
+    return inicio
+
+
+def precos_validos(barras, campos=CAMPOS_PRECO):
+    """Verifica NaN/inf só nas colunas de preço usadas, numa única passada vetorizada.
+
+    Quando as colunas são vizinhas no registro (high, low, close no layout do
+    MT5), elas são vistas como uma matriz n x k sobre a própria memória do
+    array estruturado, sem cópia.
+    """
+    if len(barras) == 0:
+        return True
+    if _bloco_contiguo(barras.dtype, campos) is not None:
+        primeira = barras[campos[0]]
+        matriz = as_strided(primeira, shape=(len(barras), len(campos)),
+                            strides=(primeira.strides[0], 8), writeable=False)
+        return bool(np.isfinite(matriz).all())
+    return all(bool(np.isfinite(barras[campo]).all()) for campo in campos)
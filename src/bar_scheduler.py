@@ -0,0 +1,95 @@
+import time
+
+# Relógio e velocidade usados pelos agendadores; trocados pelo replay do mt5_simulado
+_relogio = time.time
+_velocidade = 1.0
+
+SEGUNDOS_TIMEFRAME = {
+    "M1": 60,
+    "M5": 300,
+    "M15": 900,
+    "M30": 1800,
+    "H1": 3600,
+    "H4": 14400,
+    "D1": 86400,
+}
+
+
+def configurar_relogio(relogio=time.time, velocidade=1.0):
+    """Faz os agendadores seguirem outro relógio; as esperas são divididas por `velocidade`"""
+    global _relogio, _velocidade
+    _relogio = relogio
+    _velocidade = float(velocidade) if velocidade and velocidade > 0 else 1.0
+
+
+class AgendadorBarras:
+    """Calcula quando acordar uma estratégia: no fechamento da barra do timeframe.
+
+    A diferença entre o relógio do servidor e o local é um limite inferior:
+    a abertura da barra em formação e a hora do último tick (`time_msc` do
+    symbol_info_tick) aconteceram antes do "agora" do servidor. Só a abertura
+    da barra não basta: uma estratégia iniciada 17 s depois da abertura
+    acordaria 17 s atrasada em todas as barras seguintes. A hora do tick,
+    registrada em `registrar_tempo_servidor`, deixa a estimativa justa desde
+    a primeira barra (a menos do atraso do último tick).
+    """
+
+    # Acordadas cedo demais seguidas antes de aceitar uma estimativa menor (ex.: horário de verão)
+    LIMITE_TENTATIVAS = 3
+
+    def __init__(self, timeframe, intrabar=False, cadencia_intrabar=5.0, margem=0.2, espera_minima=0.5):
+        self.segundos = SEGUNDOS_TIMEFRAME.get(timeframe, SEGUNDOS_TIMEFRAME["M5"])
+        self.intrabar = intrabar
+        self.cadencia_intrabar = float(cadencia_intrabar)
+        self.margem = margem
+        self.espera_minima = espera_minima
+        self.diferenca_servidor = None
+        self.tempo_formacao = None
+        self.tentativas = 0
+
+    def registrar_barra(self, tempo_formacao):
+        """Registra a abertura (hora do servidor) da barra em formação mais recente; True se é uma barra nova"""
+        tempo_formacao = int(tempo_formacao)
+        candidato = tempo_formacao - _relogio()
+        nova = self.tempo_formacao is None or tempo_formacao > self.tempo_formacao
+
+        if self.diferenca_servidor is None or candidato > self.diferenca_servidor:
+            self.diferenca_servidor = candidato
+        elif nova and self.tentativas > self.LIMITE_TENTATIVAS:
+            self.diferenca_servidor = candidato
+
+        if nova:
+            self.tentativas = 0
+            self.tempo_formacao = tempo_formacao
+        return nova
+
+    def registrar_tempo_servidor(self, tempo_servidor):
+        """Aperta a estimativa com uma hora do servidor observada agora (ex.: `time_msc / 1000` do último tick)"""
+        candidato = float(tempo_servidor) - _relogio()
+        if self.diferenca_servidor is None or candidato > self.diferenca_servidor:
+            self.diferenca_servidor = candidato
+
+    def agora_servidor(self):
+        return _relogio() + (self.diferenca_servidor or 0.0)
+
+    def proximo_fechamento(self):
+        if self.tempo_formacao is None:
+            return None
+        return self.tempo_formacao + self.segundos
+
+    def proxima_espera(self):
+        """Segundos (de relógio real) até a próxima análise"""
+        fechamento = self.proximo_fechamento()
+        if fechamento is None:
+            espera = self.espera_minima
+        else:
+            espera = fechamento - self.agora_servidor() + self.margem
+            if espera <= 0:
+                # A barra já deveria ter fechado mas a próxima ainda não apareceu
+                # (sem ticks ou mercado fechado): tenta de novo com recuo exponencial
+                self.tentativas += 1
+                espera = self.espera_minima * 2 ** min(self.tentativas - 1, 10)
+
+        if self.intrabar:
+            espera = min(espera, self.cadencia_intrabar)
+        return max(self.espera_minima, min(espera, self.segundos)) / _velocidade
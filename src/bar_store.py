@@ -0,0 +1,117 @@
+"""Armazém local de barras, um arquivo por (ativo, timeframe).
+
+Cada arquivo é só a sequência de registros no layout do MT5 (DTYPE_BARRAS),
+sem cabeçalho, e só recebe barras fechadas no fim. Assim ele pode ser
+aberto com np.memmap e lido como view sem cópia. Um registro incompleto
+no fim (gravação interrompida ou ainda em andamento) é ignorado pelas
+leituras e só é cortado pelo `atualizar`, sob o lock do arquivo.
+"""
+import os
+import threading
+
+import numpy as np
+
+from src.bar_ingestion import DTYPE_BARRAS
+from src.mt5_client import mt5
+
+
+class ArmazemBarras:
+    """Histórico de barras em disco, completado de forma incremental pelo terminal"""
+
+    def __init__(self, diretorio="dados_barras", carga_inicial=100000, lote_busca=5000):
+        self.diretorio = diretorio
+        self.carga_inicial = carga_inicial
+        self.lote_busca = lote_busca
+        self.locks = {}
+        self.lock = threading.Lock()
+        os.makedirs(diretorio, exist_ok=True)
+
+    def caminho(self, ativo, timeframe):
+        nome = "".join(c if c.isalnum() or c in "._-" else "_" for c in ativo)
+        return os.path.join(self.diretorio, f"{nome}_{timeframe}.bin")
+
+    def _lock(self, ativo, timeframe):
+        with self.lock:
+            return self.locks.setdefault((ativo, timeframe), threading.Lock())
+
+    def _registros(self, caminho):
+        """Quantidade de registros completos (um registro parcial no fim é ignorado)"""
+        try:
+            tamanho = os.path.getsize(caminho)
+        except OSError:
+            return 0
+        return tamanho // DTYPE_BARRAS.itemsize
+
+    def _reparar(self, caminho):
+        """Corta um registro parcial deixado por uma gravação interrompida (chamar com o lock do arquivo)"""
+        try:
+            tamanho = os.path.getsize(caminho)
+        except OSError:
+            return
+        sobra = tamanho % DTYPE_BARRAS.itemsize
+        if sobra:
+            with open(caminho, "r+b") as arquivo:
+                arquivo.truncate(tamanho - sobra)
+
+    def _mapear(self, caminho, registros):
+        if registros == 0:
+            return np.empty(0, dtype=DTYPE_BARRAS)
+        return np.memmap(caminho, dtype=DTYPE_BARRAS, mode="r", shape=(registros,))
+
+    def ultimo_tempo(self, ativo, timeframe):
+        caminho = self.caminho(ativo, timeframe)
+        registros = self._registros(caminho)
+        if registros == 0:
+            return None
+        return int(self._mapear(caminho, registros)['time'][-1])
+
+    def ler(self, ativo, timeframe, inicio=None, fim=None, quantidade=None):
+        """View somente leitura (memmap) das barras em disco.
+
+        `inicio`/`fim` são timestamps do servidor (fim exclusivo); `quantidade`
+        limita às últimas N barras do intervalo.
+        """
+        caminho = self.caminho(ativo, timeframe)
+        barras = self._mapear(caminho, self._registros(caminho))
+        if inicio is not None or fim is not None:
+            tempos = barras['time']
+            a = 0 if inicio is None else int(np.searchsorted(tempos, inicio, side="left"))
+            b = len(barras) if fim is None else int(np.searchsorted(tempos, fim, side="left"))
+            barras = barras[a:b]
+        if quantidade is not None:
+            barras = barras[max(0, len(barras) - quantidade):]
+        return barras
+
+    def _buscar_faltantes(self, ativo, timeframe, ultimo):
+        """Barras fechadas posteriores a `ultimo`, ampliando o pedido até encostar nele"""
+        if ultimo is None:
+            return mt5.copy_rates_from_pos(ativo, timeframe, 1, self.carga_inicial)
+
+        quantidade = min(self.lote_busca, self.carga_inicial)
+        while True:
+            barras = mt5.copy_rates_from_pos(ativo, timeframe, 1, quantidade)
+            if (barras is None or len(barras) < quantidade or quantidade >= self.carga_inicial
+                    or int(barras['time'][0]) <= ultimo):
+                return barras
+            quantidade = min(quantidade * 4, self.carga_inicial)
+
+    def atualizar(self, ativo, timeframe):
+        """Acrescenta ao arquivo as barras fechadas que faltam; retorna quantas foram gravadas"""
+        with self._lock(ativo, timeframe):
+            caminho = self.caminho(ativo, timeframe)
+            self._reparar(caminho)
+            ultimo = self.ultimo_tempo(ativo, timeframe)
+            barras = self._buscar_faltantes(ativo, timeframe, ultimo)
+            if barras is None or len(barras) == 0:
+                return 0
+
+            barras = np.asarray(barras).astype(DTYPE_BARRAS, copy=False)
+            if ultimo is not None:
+                barras = barras[barras['time'] > ultimo]
+            if len(barras) == 0:
+                return 0
+            with open(caminho, "ab") as arquivo:
+                arquivo.write(barras.tobytes())
+                arquivo.flush()
+                os.fsync(arquivo.fileno())
+            return len(barras)
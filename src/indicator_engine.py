@@ -0,0 +1,274 @@
+import math
+from collections import deque
+
+import numpy as np
+
+
+class EMAIncremental:
+    """EMA com adjust=False (mesma recorrência do ewm do pandas)"""
+
+    def __init__(self, period):
+        self.alpha = 2.0 / (period + 1)
+        self.valor = math.nan
+
+    def espiar(self, x):
+        if math.isnan(self.valor):
+            return x
+        return self.alpha * x + (1 - self.alpha) * self.valor
+
+    def avancar(self, x):
+        self.valor = self.espiar(x)
+        return self.valor
+
+
+class MediaMovel:
+    """Média e desvio padrão (ddof=1) em janela móvel com somas acumuladas"""
+
+    RESSINCRONIZAR_A_CADA = 1024
+
+    def __init__(self, period):
+        self.period = period
+        self.janela = deque(maxlen=period)
+        self.referencia = 0.0
+        self.soma = 0.0
+        self.soma_quadrados = 0.0
+        self.nulos = 0
+        self.nao_zeros = 0
+        self.passos = 0
+
+    def _somas_com(self, x):
+        """Somas da janela caso x entre agora, sem alterar o estado"""
+        soma, soma_quadrados = self.soma, self.soma_quadrados
+        nulos, nao_zeros = self.nulos, self.nao_zeros
+        if len(self.janela) == self.period:
+            saindo = self.janela[0]
+            if math.isnan(saindo):
+                nulos -= 1
+            else:
+                d = saindo - self.referencia
+                soma -= d
+                soma_quadrados -= d * d
+                nao_zeros -= saindo != 0
+        if math.isnan(x):
+            nulos += 1
+        else:
+            d = x - self.referencia
+            soma += d
+            soma_quadrados += d * d
+            nao_zeros += x != 0
+        return soma, soma_quadrados, nulos, nao_zeros
+
+    def _estatisticas(self, tamanho, soma, soma_quadrados, nulos, nao_zeros):
+        if tamanho < self.period or nulos:
+            return math.nan, math.nan
+        if not nao_zeros:
+            return 0.0, 0.0
+        media = soma / self.period
+        variancia = (soma_quadrados - soma * media) / (self.period - 1) if self.period > 1 else math.nan
+        return self.referencia + media, math.sqrt(max(variancia, 0.0))
+
+    def espiar(self, x):
+        tamanho = min(len(self.janela) + 1, self.period)
+        return self._estatisticas(tamanho, *self._somas_com(x))
+
+    def avancar(self, x):
+        self.soma, self.soma_quadrados, self.nulos, self.nao_zeros = self._somas_com(x)
+        self.janela.append(x)
+        self.passos += 1
+        if self.passos % self.RESSINCRONIZAR_A_CADA == 0:
+            self._ressincronizar()
+        return self._estatisticas(len(self.janela), self.soma, self.soma_quadrados, self.nulos, self.nao_zeros)
+
+    def _ressincronizar(self):
+        """Recalcula as somas do zero para limitar o erro de arredondamento"""
+        validos = [v for v in self.janela if not math.isnan(v)]
+        self.referencia = validos[-1] if validos else 0.0
+        desvios = [v - self.referencia for v in validos]
+        self.soma = math.fsum(desvios)
+        self.soma_quadrados = math.fsum(d * d for d in desvios)
+
+
+class ExtremoMovel:
+    """Mínimo ou máximo em janela móvel (deque monotônica, O(1) amortizado)"""
+
+    def __init__(self, period, maximo=False):
+        self.period = period
+        self.maximo = maximo
+        self.candidatos = deque()  # (indice, valor)
+        self.indice = 0
+
+    def _domina(self, a, b):
+        return a >= b if self.maximo else a <= b
+
+    def espiar(self, x):
+        if self.indice + 1 < self.period:
+            return math.nan
+        inicio = self.indice - self.period + 1
+        for i, v in self.candidatos:
+            if i >= inicio:
+                return v if self._domina(v, x) else x
+        return x
+
+    def avancar(self, x):
+        valor = self.espiar(x)
+        while self.candidatos and self._domina(x, self.candidatos[-1][1]):
+            self.candidatos.pop()
+        self.candidatos.append((self.indice, x))
+        self.indice += 1
+        while self.candidatos[0][0] <= self.indice - self.period:
+            self.candidatos.popleft()
+        return valor
+
+
+class MotorIndicadores:
+    """Estado incremental dos indicadores da EstrategiaTrading para um (ativo, timeframe).
+
+    As barras fechadas avançam o estado em O(1); a barra em formação só é
+    "espiada" (calculada sem alterar o estado) até fechar. Os valores
+    coincidem com os métodos em lote de EstrategiaTrading aplicados a toda a
+    série consumida desde o aquecimento.
+    """
+
+    CAMPOS = (
+        "ema9", "ema21", "ema50", "macd", "sinal_macd", "rsi",
+        "bb_superior", "bb_medio", "bb_inferior", "stoch_k", "stoch_d",
+        "atr", "momentum",
+    )
+
+    def __init__(self, ativo, timeframe, bb_period=20, bb_desvio=2, stoch_period=14,
+                 atr_period=14, rsi_period=14, momentum_period=10, historico=3):
+        self.ativo = ativo
+        self.timeframe = timeframe
+        self.bb_desvio = bb_desvio
+        self.historico = historico
+        self.params = (bb_period, stoch_period, atr_period, rsi_period, momentum_period)
+        self.resetar()
+
+    def resetar(self):
+        bb_period, stoch_period, atr_period, rsi_period, momentum_period = self.params
+        self.ema9 = EMAIncremental(9)
+        self.ema21 = EMAIncremental(21)
+        self.ema50 = EMAIncremental(50)
+        self.ema12 = EMAIncremental(12)
+        self.ema26 = EMAIncremental(26)
+        self.sinal = EMAIncremental(9)
+        self.ganhos = MediaMovel(rsi_period)
+        self.perdas = MediaMovel(rsi_period)
+        self.rsi_period = rsi_period
+        self.bollinger = MediaMovel(bb_period)
+        self.minimas = ExtremoMovel(stoch_period)
+        self.maximas = ExtremoMovel(stoch_period, maximo=True)
+        self.stoch_k = MediaMovel(3)
+        self.stoch_d = MediaMovel(3)
+        self.atr = MediaMovel(atr_period)
+        self.fechamentos = deque(maxlen=momentum_period)
+        self.momentum_period = momentum_period
+
+        self.barras = 0
+        self.fechamento_anterior = math.nan
+        self.tempo_ultima_fechada = None
+        self.valores_fechados = {campo: deque(maxlen=self.historico) for campo in self.CAMPOS}
+        self.valores_formacao = None
+
+    def _calcular(self, high, low, close, avancar):
+        """Calcula todos os indicadores de uma barra; avancar=True consolida o estado"""
+        passo = (lambda ind, x: ind.avancar(x)) if avancar else (lambda ind, x: ind.espiar(x))
+
+        ema9 = passo(self.ema9, close)
+        ema21 = passo(self.ema21, close)
+        ema50 = passo(self.ema50, close)
+        macd = passo(self.ema12, close) - passo(self.ema26, close)
+        sinal_macd = passo(self.sinal, macd)
+
+        anterior = self.fechamento_anterior
+        if math.isnan(anterior):
+            rsi = 50.0
+        else:
+            delta = close - anterior
+            media_ganho, _ = passo(self.ganhos, delta if delta > 0 else 0.0)
+            media_perda, _ = passo(self.perdas, -delta if delta < 0 else 0.0)
+            if math.isnan(media_ganho):
+                rsi = 50.0
+            else:
+                rs = media_ganho / (media_perda if media_perda != 0 else 0.000001)
+                rsi = 100 - (100 / (1 + rs))
+
+        bb_medio, desvio = passo(self.bollinger, close)
+        bb_superior = bb_medio + desvio * self.bb_desvio
+        bb_inferior = bb_medio - desvio * self.bb_desvio
+
+        low_min = passo(self.minimas, low)
+        high_max = passo(self.maximas, high)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            k_bruto = float(100 * (np.float64(close - low_min) / np.float64(high_max - low_min)))
+        stoch_k, _ = passo(self.stoch_k, k_bruto)
+        stoch_d, _ = passo(self.stoch_d, stoch_k)
+
+        if math.isnan(anterior):
+            tr = high - low
+        else:
+            tr = max(high - low, abs(high - anterior), abs(low - anterior))
+        atr, _ = passo(self.atr, tr)
+
+        if len(self.fechamentos) == self.momentum_period:
+            momentum = close - self.fechamentos[0]
+        else:
+            momentum = math.nan
+        if avancar:
+            self.fechamentos.append(close)
+            self.fechamento_anterior = close
+
+        return {
+            "ema9": ema9, "ema21": ema21, "ema50": ema50,
+            "macd": macd, "sinal_macd": sinal_macd, "rsi": rsi,
+            "bb_superior": bb_superior, "bb_medio": bb_medio, "bb_inferior": bb_inferior,
+            "stoch_k": stoch_k, "stoch_d": stoch_d, "atr": atr, "momentum": momentum,
+        }
+
+    def fechar_barra(self, tempo, high, low, close):
+        """Consolida uma barra fechada (O(1))"""
+        valores = self._calcular(float(high), float(low), float(close), avancar=True)
+        for campo, valor in valores.items():
+            self.valores_fechados[campo].append(valor)
+        self.tempo_ultima_fechada = int(tempo)
+        self.barras += 1
+        return valores
+
+    def atualizar_formacao(self, high, low, close):
+        """Recalcula apenas a barra em formação, sem alterar o estado consolidado"""
+        self.valores_formacao = self._calcular(float(high), float(low), float(close), avancar=False)
+        return self.valores_formacao
+
+    def sincronizar(self, tempo, high, low, close):
+        """Alimenta o motor com a janela de barras do terminal (a última está em formação).
+
+        Consolida só as barras fechadas ainda não vistas e atualiza a barra em
+        formação. Se houver um buraco entre o estado e a janela recebida, o
+        motor é reaquecido com a janela inteira.
+        """
+        n = len(tempo)
+        if n == 0:
+            return self.valores()
+
+        inicio = 0
+        if self.tempo_ultima_fechada is not None:
+            if int(tempo[0]) > self.tempo_ultima_fechada:
+                self.resetar()
+            else:
+                inicio = int(np.searchsorted(tempo, self.tempo_ultima_fechada, side="right"))
+
+        for i in range(inicio, n - 1):
+            self.fechar_barra(tempo[i], high[i], low[i], close[i])
+
+        self.atualizar_formacao(high[-1], low[-1], close[-1])
+        return self.valores()
+
+    def valores(self):
+        """Últimos valores de cada indicador; o último elemento é a barra em formação"""
+        resultado = {}
+        for campo in self.CAMPOS:
+            serie = list(self.valores_fechados[campo])
+            if self.valores_formacao is not None:
+                serie.append(self.valores_formacao[campo])
+            resultado[campo] = np.array(serie[-self.historico:], dtype=np.float64)
+        return resultado
@@ -0,0 +1,197 @@
+"""Indicadores técnicos em NumPy puro.
+
+Mesmos resultados dos métodos originais da EstrategiaTrading (que usavam
+pd.Series/ewm/rolling), sem criar Series nem DataFrames a cada chamada.
+Todas as funções trabalham no último eixo, então aceitam tanto uma série
+(1-D) quanto uma matriz de ativos x barras (2-D), e recebem opcionalmente
+buffers de saída pré-alocados (`out`).
+"""
+import math
+
+import numpy as np
+
+# Maior expoente usado nos pesos da EMA em forma fechada (exp(500) ainda cabe em float64)
+_LIMITE_EXPOENTE = 500.0
+
+
+def _como_float(data):
+    return np.ascontiguousarray(data, dtype=np.float64)
+
+
+def _saida(out, shape):
+    if out is None:
+        return np.empty(shape, dtype=np.float64)
+    if out.shape != shape:
+        raise ValueError(f"Buffer de saída com formato {out.shape}, esperado {shape}")
+    return out
+
+
+def _acumular_janela(data, period, operacao, out):
+    """Combina as `period` fatias deslocadas do último eixo com `operacao` (soma, mínimo, máximo).
+
+    São `period` operações vetorizadas sobre trechos contíguos, sem a deriva
+    numérica de somas acumuladas; as primeiras period-1 posições ficam NaN,
+    como no rolling do pandas.
+    """
+    n = data.shape[-1]
+    out[..., :period - 1] = np.nan
+    if n < period:
+        return out
+    destino = out[..., period - 1:]
+    destino[...] = data[..., :n - period + 1]
+    for deslocamento in range(1, period):
+        operacao(destino, data[..., deslocamento:n - period + 1 + deslocamento], out=destino)
+    return out
+
+
+def media_movel(data, period, out=None):
+    data = _como_float(data)
+    out = _acumular_janela(data, period, np.add, _saida(out, data.shape))
+    out /= period
+    return out
+
+
+def desvio_movel(data, period, media, out=None):
+    """Desvio padrão amostral (ddof=1) em janela móvel, em duas passadas a partir da média"""
+    data = _como_float(data)
+    out = _saida(out, data.shape)
+    n = data.shape[-1]
+    out[..., :period - 1] = np.nan
+    if n < period:
+        return out
+    destino = out[..., period - 1:]
+    centro = media[..., period - 1:]
+    destino[...] = 0
+    desvio = np.empty_like(centro)
+    for deslocamento in range(period):
+        np.subtract(data[..., deslocamento:n - period + 1 + deslocamento], centro, out=desvio)
+        desvio *= desvio
+        destino += desvio
+    destino /= period - 1
+    np.sqrt(destino, out=destino)
+    return out
+
+
+def ema(data, period, out=None):
+    """EMA com adjust=False, semente no primeiro valor (igual ao ewm do pandas).
+
+    A recorrência é resolvida em forma fechada por blocos:
+    e[j] = w^j * (w * e[-1] + alpha * soma(x[i] * w^-i)), com w = 1 - alpha.
+    """
+    data = _como_float(data)
+    out = _saida(out, data.shape)
+    n = data.shape[-1]
+    if n == 0:
+        return out
+
+    alpha = 2.0 / (period + 1)
+    w = 1.0 - alpha
+    bloco = max(1, int(_LIMITE_EXPOENTE / -math.log(w)))
+    expoentes = np.arange(min(bloco, n), dtype=np.float64)
+    pesos = w ** -expoentes
+    decaimento = w ** expoentes
+
+    anterior = data[..., 0]
+    for inicio in range(0, n, bloco):
+        fim = min(inicio + bloco, n)
+        tamanho = fim - inicio
+        trecho = out[..., inicio:fim]
+        np.multiply(data[..., inicio:fim], pesos[:tamanho], out=trecho)
+        np.cumsum(trecho, axis=-1, out=trecho)
+        trecho *= alpha
+        trecho += (w * anterior)[..., None]
+        trecho *= decaimento[:tamanho]
+        anterior = trecho[..., -1]
+    return out
+
+
+def macd(data, short_period=12, long_period=26, signal_period=9, out=None):
+    data = _como_float(data)
+    macd_line, signal_line = out if out is not None else (None, None)
+    macd_line = ema(data, short_period, out=macd_line)
+    macd_line -= ema(data, long_period)
+    signal_line = ema(macd_line, signal_period, out=signal_line)
+    return macd_line, signal_line
+
+
+def rsi(data, period=14, out=None):
+    """RSI com médias simples; como o original, retorna n-1 valores com os period-1 primeiros em 50"""
+    data = _como_float(data)
+    delta = np.diff(data, axis=-1)
+    out = _saida(out, delta.shape)
+    if delta.shape[-1] < period:
+        out[...] = 50  # nenhuma janela completa
+        return out
+    ganho = np.where(delta > 0, delta, 0.0)
+    perda = np.where(delta < 0, -delta, 0.0)
+
+    if delta.ndim == 1:
+        # Para uma série só, a convolução do original já é o caminho mais rápido
+        pesos = np.full(period, 1.0 / period)
+        media_ganho = np.convolve(ganho, pesos, mode='valid')
+        media_perda = np.convolve(perda, pesos, mode='valid')
+    else:
+        media_ganho = media_movel(ganho, period)[..., period - 1:]
+        media_perda = media_movel(perda, period)[..., period - 1:]
+    media_perda[media_perda == 0] = 0.000001
+
+    out[..., :period - 1] = 50
+    valores = out[..., period - 1:]
+    np.divide(media_ganho, media_perda, out=valores)
+    valores += 1
+    np.divide(100, valores, out=valores)
+    np.subtract(100, valores, out=valores)
+    return out
+
+
+def bollinger_bands(data, period=20, num_std=2, out=None):
+    data = _como_float(data)
+    upper, sma, lower = out if out is not None else (None, None, None)
+    sma = media_movel(data, period, out=sma)
+    std = desvio_movel(data, period, sma)
+    std *= num_std
+    upper = np.add(sma, std, out=_saida(upper, data.shape))
+    lower = np.subtract(sma, std, out=_saida(lower, data.shape))
+    return upper, sma, lower
+
+
+def stochastic(high, low, close, period=14, k_smooth=3, d_smooth=3, out=None):
+    high, low, close = _como_float(high), _como_float(low), _como_float(close)
+    k, d = out if out is not None else (None, None)
+    low_min = _acumular_janela(low, period, np.minimum, np.empty_like(low))
+    high_max = _acumular_janela(high, period, np.maximum, np.empty_like(high))
+
+    bruto = np.subtract(close, low_min)
+    high_max -= low_min
+    with np.errstate(divide="ignore", invalid="ignore"):
+        bruto /= high_max
+    bruto *= 100
+
+    k = media_movel(bruto, k_smooth, out=k)
+    d = media_movel(k, d_smooth, out=d)
+    return k, d
+
+
+def true_range(high, low, close):
+    high, low, close = _como_float(high), _como_float(low), _como_float(close)
+    tr = np.subtract(high, low)
+    anterior = close[..., :-1]
+    np.maximum(tr[..., 1:], np.abs(high[..., 1:] - anterior), out=tr[..., 1:])
+    np.maximum(tr[..., 1:], np.abs(low[..., 1:] - anterior), out=tr[..., 1:])
+    return tr
+
+
+def atr(high, low, close, period=14, out=None):
+    tr = true_range(high, low, close)
+    return media_movel(tr, period, out=out)
+
+
+def momentum(data, period=10, out=None):
+    data = _como_float(data)
+    out = _saida(out, data.shape)
+    if data.shape[-1] <= period:
+        out[...] = 0  # nenhuma janela completa
+        return out
+    np.subtract(data[..., period:], data[..., :-period], out=out[..., period:])
+    out[..., :period] = out[..., period:period + 1]
+    return out
@@ -0,0 +1,172 @@
+"""Índice em memória dos registros de log para filtrar sem varrer o texto.
+
+Cada registro vira uma linha de colunas codificadas (instante, ativo, nível,
+evento) em arrays NumPy. Como os registros chegam em ordem de tempo, o balde
+de tempo de uma consulta vira um intervalo de linhas (bisect nos inícios de
+balde), e os filtros por ativo, nível e evento são comparações de inteiros
+só dentro desse intervalo.
+
+Com um ArmazemLogs o índice não guarda texto: só o rowid de cada registro no
+SQLite, e o texto é lido do armazém para as linhas exibidas (ou para o
+filtro opcional por trecho de texto). Sem armazém os textos ficam numa lista
+paralela, limitada pela mesma retenção dos logs em memória (quantidade de
+registros e bytes).
+"""
+from bisect import bisect_left
+
+import numpy as np
+
+CAPACIDADE_PADRAO = 500000
+
+
+class _Dicionario:
+    """Códigos inteiros para valores categóricos (ativo, nível, evento)"""
+
+    def __init__(self):
+        self.codigos = {}
+        self.valores = []
+
+    def codificar(self, valor):
+        codigo = self.codigos.get(valor)
+        if codigo is None:
+            codigo = self.codigos[valor] = len(self.valores)
+            self.valores.append(valor)
+        return codigo
+
+
+class IndiceLogs:
+    def __init__(self, capacidade=CAPACIDADE_PADRAO, balde_segundos=60, armazem=None, formatar=None,
+                 max_bytes=None):
+        self.capacidade = capacidade
+        self.balde_segundos = balde_segundos
+        self.armazem = armazem  # com ele, cada registro é (instante, ativo, nivel, evento, rowid)
+        self.formatar = formatar  # (instante, ativo, mensagem) -> linha exibida, para os textos do armazém
+        self.max_bytes = max_bytes  # só sem armazém
+        self.ativos = _Dicionario()
+        self.niveis = _Dicionario()
+        self.eventos = _Dicionario()
+        tamanho = min(capacidade, 4096)
+        self.instantes = np.empty(tamanho, dtype=np.float64)
+        self.colunas = np.empty((3, tamanho), dtype=np.int32)  # ativo, nível, evento
+        self.rowids = np.empty(tamanho, dtype=np.int64)  # com armazém
+        self.tamanhos = np.empty(tamanho, dtype=np.int64)  # bytes de cada texto, sem armazém
+        self.textos = []  # sem armazém
+        self.total = 0
+        self.bytes = 0
+        self.baldes = []  # (balde, primeira linha) em ordem crescente
+        self.inicio = 0  # registros descartados desde o começo (para ids estáveis)
+
+    def __len__(self):
+        return self.total
+
+    def _descartar(self, descartar):
+        n = self.total
+        restantes = n - descartar
+        if self.armazem is None:
+            self.bytes -= int(self.tamanhos[:descartar].sum())
+        for array in (self.instantes, self.rowids, self.tamanhos):
+            array[:restantes] = array[descartar:n]
+        self.colunas[:, :restantes] = self.colunas[:, descartar:n]
+        del self.textos[:descartar]
+        self.total = restantes
+        self.inicio += descartar
+        baldes = [(balde, linha - descartar) for balde, linha in self.baldes if linha >= descartar]
+        if restantes and (not baldes or baldes[0][1] != 0):
+            baldes.insert(0, (self._balde(self.instantes[0]), 0))
+        self.baldes = baldes
+
+    def _garantir_espaco(self, extra, bytes_extra=0):
+        n = self.total
+        # Descarta os mais antigos em bloco (10% do limite) para amortizar a cópia
+        descartar = 0
+        if n + extra > self.capacidade:
+            descartar = n + extra - self.capacidade + self.capacidade // 10
+        if self.max_bytes is not None and self.bytes + bytes_extra > self.max_bytes:
+            excesso = self.bytes + bytes_extra - self.max_bytes * 0.9
+            descartar = max(descartar, int(np.searchsorted(np.cumsum(self.tamanhos[:n]), excesso)) + 1)
+        if descartar:
+            self._descartar(min(n, descartar))
+            n = self.total
+        if n + extra > len(self.instantes):
+            tamanho = min(self.capacidade, max(2 * len(self.instantes), n + extra))
+            colunas = np.empty((3, tamanho), dtype=np.int32)
+            colunas[:, :n] = self.colunas[:, :n]
+            self.colunas = colunas
+            for nome in ("instantes", "rowids", "tamanhos"):
+                antigo = getattr(self, nome)
+                novo = np.empty(tamanho, dtype=antigo.dtype)
+                novo[:n] = antigo[:n]
+                setattr(self, nome, novo)
+
+    def _balde(self, instante):
+        return int(instante // self.balde_segundos)
+
+    def adicionar(self, registros):
+        """Indexa uma lista de (instante, ativo, nivel, evento, texto), ou (..., rowid) com armazém"""
+        if not registros:
+            return
+        if self.armazem is None:
+            tamanhos = [len(registro[4].encode("utf-8")) for registro in registros]
+            self._garantir_espaco(len(registros), sum(tamanhos))
+        else:
+            self._garantir_espaco(len(registros))
+        n = self.total
+        for i, (instante, ativo, nivel, evento, conteudo) in enumerate(registros, n):
+            self.instantes[i] = instante
+            self.colunas[0, i] = self.ativos.codificar(ativo)
+            self.colunas[1, i] = self.niveis.codificar(nivel)
+            self.colunas[2, i] = self.eventos.codificar(evento)
+            if self.armazem is None:
+                self.textos.append(conteudo)
+                self.tamanhos[i] = tamanhos[i - n]
+                self.bytes += tamanhos[i - n]
+            else:
+                self.rowids[i] = conteudo
+            balde = self._balde(instante)
+            if not self.baldes or balde > self.baldes[-1][0]:
+                self.baldes.append((balde, i))
+        self.total = n + len(registros)
+
+    def _linha_inicial(self, desde):
+        if desde is None or not self.baldes:
+            return 0
+        posicao = bisect_left(self.baldes, (self._balde(desde), -1))
+        return self.baldes[posicao][1] if posicao < len(self.baldes) else self.total
+
+    def consultar(self, ativo=None, nivel=None, evento=None, desde=None, contem=None):
+        """Linhas (posições atuais) que atendem a todos os filtros, em ordem cronológica.
+
+        `nivel`/`evento` aceitam um valor ou uma coleção de valores; `desde` é
+        um timestamp e `contem` um trecho de texto (sem diferenciar maiúsculas).
+        """
+        n = self.total
+        primeira = self._linha_inicial(desde)
+        mascara = np.ones(n - primeira, dtype=bool)
+        if desde is not None:
+            mascara &= self.instantes[primeira:n] >= desde
+        for coluna, dicionario, valor in ((0, self.ativos, ativo), (1, self.niveis, nivel),
+                                          (2, self.eventos, evento)):
+            if valor is None:
+                continue
+            valores = [valor] if isinstance(valor, str) else list(valor)
+            codigos = [dicionario.codigos[v] for v in valores if v in dicionario.codigos]
+            mascara &= np.isin(self.colunas[coluna, primeira:n], codigos)
+        linhas = np.flatnonzero(mascara) + primeira
+        if contem and len(linhas):
+            trecho = contem.lower()
+            if self.armazem is None:
+                linhas = np.array([i for i in linhas if trecho in self.textos[i].lower()], dtype=np.int64)
+            else:
+                rowids = self.rowids[linhas]
+                encontrados = self.armazem.contendo(int(rowids[0]), int(rowids[-1]), trecho)
+                linhas = linhas[np.isin(rowids, encontrados)]
+        return linhas
+
+    def textos_de(self, linhas):
+        if self.armazem is None:
+            return [self.textos[i] for i in linhas]
+        return [self.formatar(*registro) for registro in self.armazem.ler([int(i) for i in self.rowids[linhas]])]
+
+    def valores(self, campo):
+        """Valores conhecidos de 'ativo', 'nivel' ou 'evento' (para preencher os filtros)"""
+        return list({"ativo": self.ativos, "nivel": self.niveis, "evento": self.eventos}[campo].valores)
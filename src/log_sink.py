@@ -0,0 +1,131 @@
+"""Gravação assíncrona dos logs estruturados em arquivos JSON Lines.
+
+As estratégias só colocam o registro numa fila em memória (sem bloquear: se
+a fila estiver cheia o registro é descartado e contado). Uma thread de
+escrita serializa os registros em lote, faz fsync no máximo a cada
+`intervalo_fsync` segundos e troca de arquivo por tamanho ou por tempo; o
+segmento fechado é comprimido com gzip.
+"""
+import gzip
+import json
+import os
+import queue
+import shutil
+import threading
+import time
+from datetime import datetime
+
+
+class SinkLogEstruturado:
+    """Um registro por linha: ts, ativo, nivel, evento, mensagem e campos extras"""
+
+    def __init__(self, diretorio="logs", prefixo="robo", max_bytes=50 * 1024 * 1024, rotacao_segundos=86400,
+                 intervalo_fsync=1.0, max_fila=100000, comprimir=True):
+        self.diretorio = diretorio
+        self.prefixo = prefixo
+        self.max_bytes = max_bytes
+        self.rotacao_segundos = rotacao_segundos
+        self.intervalo_fsync = intervalo_fsync
+        self.comprimir = comprimir
+        self.fila = queue.Queue(max_fila)
+        self.descartados = 0
+        self.gravados = 0
+        self.arquivo = None
+        self.aberto_em = 0.0
+        self.ultimo_fsync = 0.0
+        self.sujo = False
+        self.parada = threading.Event()
+        os.makedirs(diretorio, exist_ok=True)
+        self.caminho_atual = os.path.join(diretorio, f"{prefixo}.jsonl")
+        self.thread = threading.Thread(target=self._escrever, daemon=True, name="sink-logs")
+        self.thread.start()
+
+    def registrar(self, ativo, mensagem, nivel="INFO", evento="log", instante=None, **campos):
+        """Enfileira um registro; nunca bloqueia quem chama"""
+        try:
+            self.fila.put_nowait((instante or time.time(), ativo, nivel, evento, mensagem, campos))
+        except queue.Full:
+            self.descartados += 1
+
+    def _abrir(self):
+        self.arquivo = open(self.caminho_atual, "a", encoding="utf-8")
+        self.aberto_em = time.time()
+        if self.arquivo.tell() > 0:
+            # Continuação após reinício: a idade do segmento vem do arquivo
+            self.aberto_em = os.path.getmtime(self.caminho_atual)
+
+    def _precisa_rotacionar(self):
+        if self.max_bytes and self.arquivo.tell() >= self.max_bytes:
+            return True
+        return bool(self.rotacao_segundos) and time.time() - self.aberto_em >= self.rotacao_segundos
+
+    def _rotacionar(self):
+        self._sincronizar(forcar=True)
+        self.arquivo.close()
+        if os.path.getsize(self.caminho_atual) > 0:
+            sufixo = datetime.now().strftime("%Y%m%d-%H%M%S")
+            destino = os.path.join(self.diretorio, f"{self.prefixo}-{sufixo}.jsonl")
+            contador = 1
+            while os.path.exists(destino) or os.path.exists(destino + ".gz"):
+                destino = os.path.join(self.diretorio, f"{self.prefixo}-{sufixo}-{contador}.jsonl")
+                contador += 1
+            os.replace(self.caminho_atual, destino)
+            if self.comprimir:
+                with open(destino, "rb") as origem, gzip.open(destino + ".gz", "wb") as compactado:
+                    shutil.copyfileobj(origem, compactado)
+                os.remove(destino)
+        self._abrir()
+
+    def _sincronizar(self, forcar=False):
+        if not self.sujo:
+            return
+        agora = time.monotonic()
+        self.arquivo.flush()
+        if forcar or agora - self.ultimo_fsync >= self.intervalo_fsync:
+            os.fsync(self.arquivo.fileno())
+            self.ultimo_fsync = agora
+            self.sujo = False
+
+    @staticmethod
+    def _linha(registro):
+        instante, ativo, nivel, evento, mensagem, campos = registro
+        dados = {
+            "ts": datetime.fromtimestamp(instante).isoformat(timespec="milliseconds"),
+            "ativo": ativo,
+            "nivel": nivel,
+            "evento": evento,
+            "mensagem": mensagem,
+        }
+        if campos:
+            dados["campos"] = campos
+        return json.dumps(dados, ensure_ascii=False, default=str) + "\n"
+
+    def _escrever(self):
+        self._abrir()
+        while True:
+            try:
+                lote = [self.fila.get(timeout=self.intervalo_fsync)]
+            except queue.Empty:
+                lote = []
+                if self.parada.is_set():
+                    break
+            while len(lote) < 10000:
+                try:
+                    lote.append(self.fila.get_nowait())
+                except queue.Empty:
+                    break
+
+            if lote:
+                self.arquivo.write("".join(map(self._linha, lote)))
+                self.gravados += len(lote)
+                self.sujo = True
+            self._sincronizar()
+            if self._precisa_rotacionar():
+                self._rotacionar()
+        self._sincronizar(forcar=True)
+        self.arquivo.close()
+
+    def fechar(self, timeout=5.0):
+        """Grava o que estiver na fila e encerra a thread de escrita"""
+        self.parada.set()
+        self.thread.join(timeout)
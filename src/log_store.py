@@ -0,0 +1,74 @@
+import sqlite3
+import threading
+
+
+class ArmazemLogs:
+    """Histórico completo dos logs em SQLite, para consultar o que já saiu da memória e dos widgets"""
+
+    def __init__(self, caminho="logs_robo.db"):
+        self.caminho = caminho
+        self.lock = threading.Lock()
+        self.conexao = sqlite3.connect(caminho, check_same_thread=False)
+        self.conexao.execute("PRAGMA journal_mode=WAL")
+        self.conexao.execute("PRAGMA synchronous=NORMAL")
+        self.conexao.execute(
+            "CREATE TABLE IF NOT EXISTS logs (instante REAL NOT NULL, ativo TEXT NOT NULL, mensagem TEXT NOT NULL)"
+        )
+        self.conexao.execute("CREATE INDEX IF NOT EXISTS logs_ativo_instante ON logs (ativo, instante)")
+        self.conexao.execute("CREATE INDEX IF NOT EXISTS logs_instante ON logs (instante)")
+        self.conexao.commit()
+
+    def gravar(self, registros):
+        """Grava uma lista de (instante, ativo, mensagem) numa única transação; retorna os rowids, na ordem"""
+        if not registros:
+            return range(0)
+        with self.lock:
+            self.conexao.executemany("INSERT INTO logs (instante, ativo, mensagem) VALUES (?, ?, ?)", registros)
+            # Dentro da transação ninguém mais grava: os rowids novos são os últimos, consecutivos
+            ultimo = self.conexao.execute("SELECT max(rowid) FROM logs").fetchone()[0]
+            self.conexao.commit()
+        return range(ultimo - len(registros) + 1, ultimo + 1)
+
+    def ler(self, rowids):
+        """Registros (instante, ativo, mensagem) dos rowids dados, na mesma ordem"""
+        if not rowids:
+            return []
+        with self.lock:
+            linhas = self.conexao.execute(
+                f"SELECT rowid, instante, ativo, mensagem FROM logs WHERE rowid IN ({','.join('?' * len(rowids))})",
+                rowids,
+            ).fetchall()
+        por_id = {rowid: registro for rowid, *registro in linhas}
+        return [tuple(por_id[rowid]) for rowid in rowids if rowid in por_id]
+
+    def contendo(self, primeiro, ultimo, trecho):
+        """Rowids entre `primeiro` e `ultimo` cuja mensagem contém `trecho` (em minúsculas)"""
+        with self.lock:
+            linhas = self.conexao.execute(
+                "SELECT rowid, mensagem FROM logs WHERE rowid BETWEEN ? AND ?", (primeiro, ultimo)
+            ).fetchall()
+        return [rowid for rowid, mensagem in linhas if trecho in mensagem.lower()]
+
+    def consultar(self, ativo=None, inicio=None, fim=None, limite=1000):
+        """Registros (instante, ativo, mensagem) mais recentes do filtro, em ordem cronológica"""
+        condicoes, parametros = [], []
+        if ativo is not None:
+            condicoes.append("ativo = ?")
+            parametros.append(ativo)
+        if inicio is not None:
+            condicoes.append("instante >= ?")
+            parametros.append(inicio)
+        if fim is not None:
+            condicoes.append("instante < ?")
+            parametros.append(fim)
+        onde = f"WHERE {' AND '.join(condicoes)}" if condicoes else ""
+        with self.lock:
+            linhas = self.conexao.execute(
+                f"SELECT instante, ativo, mensagem FROM logs {onde} ORDER BY instante DESC, rowid DESC LIMIT ?",
+                (*parametros, limite),
+            ).fetchall()
+        return linhas[::-1]
+
+    def fechar(self):
+        with self.lock:
+            self.conexao.close()
@@ -0,0 +1,151 @@
+import threading
+import time
+
+import numpy as np
+
+from src.mt5_client import mt5
+
+
+class FluxoBarras:
+    """Buffer circular de barras de um (ativo, timeframe).
+
+    Cada barra é gravada duas vezes (posições i e i + capacidade), de forma que
+    qualquer janela das últimas `capacidade` barras é um trecho contíguo do
+    array e pode ser publicada como view, sem cópia.
+    """
+
+    def __init__(self, capacidade):
+        self.capacidade = capacidade
+        self.buffer = None
+        self.total = 0
+        self.ultimo_tempo = None
+        self.atualizado_em = 0.0
+        self.assinantes = 0
+        self.lock = threading.Lock()
+
+    def _gravar(self, barras):
+        indices = (self.total + np.arange(len(barras))) % self.capacidade
+        self.buffer[indices] = barras
+        self.buffer[indices + self.capacidade] = barras
+        self.total += len(barras)
+
+    def escrever(self, barras):
+        """Incorpora barras novas: a de mesmo horário da última substitui a barra em formação"""
+        if len(barras) == 0:
+            return
+        barras = barras[-self.capacidade:]
+        tempos = barras['time']
+
+        if self.buffer is None or self.buffer.dtype != barras.dtype:
+            self.buffer = np.zeros(2 * self.capacidade, dtype=barras.dtype)
+            self.total = 0
+            self.ultimo_tempo = None
+
+        if self.ultimo_tempo is not None and int(tempos[0]) > self.ultimo_tempo and len(barras) == self.capacidade:
+            # Buraco maior que o buffer: recomeça do zero
+            self.total = 0
+            self.ultimo_tempo = None
+
+        if self.ultimo_tempo is None:
+            novas = barras
+        else:
+            inicio = int(np.searchsorted(tempos, self.ultimo_tempo, side="left"))
+            if inicio < len(barras) and int(tempos[inicio]) == self.ultimo_tempo:
+                self.total -= 1  # reescreve a barra em formação
+            novas = barras[inicio:]
+
+        if len(novas):
+            self._gravar(novas)
+            self.ultimo_tempo = int(novas['time'][-1])
+
+    def janela(self, quantidade):
+        """View somente leitura das últimas `quantidade` barras"""
+        quantidade = min(quantidade, self.total, self.capacidade)
+        inicio = (self.total - quantidade) % self.capacidade
+        view = self.buffer[inicio:inicio + quantidade]
+        view.flags.writeable = False
+        return view
+
+
+class HubDadosMercado:
+    """Busca cada (ativo, timeframe) uma vez por atualização e distribui para as estratégias.
+
+    Cada consumidor assina o fluxo (`assinar`) antes de usar `obter` e cancela
+    a assinatura ao sair; o fluxo é liberado com a última assinatura. Só o
+    delta desde a última barra conhecida é pedido ao terminal. As estratégias
+    recebem views somente leitura do buffer do fluxo, válidas até a próxima
+    atualização daquele fluxo. A barra em formação é reescrita no mesmo lugar,
+    então com mais de um assinante a janela que a inclui é uma cópia. Com um
+    ArmazemBarras, o primeiro acesso a um fluxo é aquecido pelo disco e só o
+    delta vem do terminal.
+    """
+
+    def __init__(self, capacidade=1000, validade=0.5, armazem=None):
+        self.capacidade = capacidade
+        self.validade = validade
+        self.armazem = armazem
+        self.fluxos = {}
+        self.lock = threading.Lock()
+
+    def assinar(self, ativo, timeframe):
+        with self.lock:
+            fluxo = self.fluxos.get((ativo, timeframe))
+            if fluxo is None:
+                fluxo = self.fluxos[(ativo, timeframe)] = FluxoBarras(self.capacidade)
+            fluxo.assinantes += 1
+            return fluxo
+
+    def cancelar_assinatura(self, ativo, timeframe):
+        with self.lock:
+            fluxo = self.fluxos.get((ativo, timeframe))
+            if fluxo is None:
+                return
+            fluxo.assinantes -= 1
+            if fluxo.assinantes <= 0:
+                del self.fluxos[(ativo, timeframe)]
+
+    def _aquecer(self, fluxo, ativo, timeframe):
+        try:
+            self.armazem.atualizar(ativo, timeframe)
+        except OSError:
+            pass  # segue com o que já estiver em disco
+        fluxo.escrever(self.armazem.ler(ativo, timeframe, quantidade=self.capacidade))
+
+    def _buscar_delta(self, fluxo, ativo, timeframe):
+        if fluxo.ultimo_tempo is None and self.armazem is not None:
+            self._aquecer(fluxo, ativo, timeframe)
+        if fluxo.ultimo_tempo is None:
+            return mt5.copy_rates_from_pos(ativo, timeframe, 0, self.capacidade)
+
+        # Pede poucas barras e amplia até encostar na última barra conhecida
+        quantidade = 2
+        while True:
+            barras = mt5.copy_rates_from_pos(ativo, timeframe, 0, quantidade)
+            if (barras is None or len(barras) < quantidade or quantidade >= self.capacidade
+                    or int(barras['time'][0]) <= fluxo.ultimo_tempo):
+                return barras
+            quantidade = min(quantidade * 4, self.capacidade)
+
+    def obter(self, ativo, timeframe, quantidade, incluir_formacao=True):
+        """Últimas `quantidade` barras do fluxo (a barra em formação é a última, se incluída)"""
+        with self.lock:
+            fluxo = self.fluxos.get((ativo, timeframe))
+        if fluxo is None:
+            raise ValueError(f"Sem assinatura de {ativo} no timeframe {timeframe}")
+
+        with fluxo.lock:
+            if time.monotonic() - fluxo.atualizado_em >= self.validade:
+                barras = self._buscar_delta(fluxo, ativo, timeframe)
+                if barras is not None:
+                    fluxo.escrever(barras)
+                    fluxo.atualizado_em = time.monotonic()
+            if fluxo.total == 0:
+                return None
+            if not incluir_formacao:
+                return fluxo.janela(quantidade + 1)[:-1]
+            janela = fluxo.janela(quantidade)
+            if fluxo.assinantes > 1:
+                # Outro assinante pode estar lendo a barra em formação que a próxima atualização reescreve
+                janela = janela.copy()
+                janela.flags.writeable = False
+            return janela
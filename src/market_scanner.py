@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+
+from src.mt5_client import mt5
+from src.signal_rules import ParametrosEstrategia, avaliar_series, calcular_series
+
+
+class ScannerMercado:
+    """Avalia as regras de sinal do analisar_e_operar para muitos ativos de uma vez.
+
+    As barras de cada ativo são empilhadas em matrizes (ativos x barras) e os
+    indicadores e condições são calculados numa única passada vetorizada.
+    Horário e risco ficam de fora: são verificados na hora de operar. Só
+    barras fechadas entram, como no analisar_e_operar fora do modo intrabar;
+    com um ArmazemBarras elas vêm do disco, completado antes.
+    """
+
+    def __init__(self, timeframe=mt5.TIMEFRAME_M5, barras=200, minimo_barras=100, parametros=None, armazem=None):
+        self.timeframe = timeframe
+        self.barras = barras
+        self.minimo_barras = minimo_barras
+        self.parametros = parametros or ParametrosEstrategia()
+        self.armazem = armazem
+
+    def buscar_barras(self, ativo):
+        if self.armazem is None:
+            return mt5.copy_rates_from_pos(ativo, self.timeframe, 1, self.barras)
+        self.armazem.atualizar(ativo, self.timeframe)
+        return self.armazem.ler(ativo, self.timeframe, quantidade=self.barras)
+
+    def listar_ativos(self):
+        """Ativos visíveis no Market Watch (mesma lista do carregar_ativos)"""
+        symbols = mt5.symbols_get()
+        if symbols is None:
+            return []
+        return [symbol.name for symbol in symbols if symbol.visible]
+
+    def empilhar(self, ativos):
+        """Busca as barras de cada ativo e empilha close/high/low/volume em matrizes"""
+        series = {}
+        for ativo in ativos:
+            barras = self.buscar_barras(ativo)
+            if barras is None or len(barras) < self.minimo_barras:
+                continue
+            series[ativo] = barras
+
+        if not series:
+            return [], None
+
+        # Cada ativo contribui com suas próprias últimas N barras
+        n = min(len(barras) for barras in series.values())
+        nomes = list(series)
+        matrizes = {
+            campo: np.stack([series[ativo][campo][-n:].astype(np.float64) for ativo in nomes])
+            for campo in ("close", "high", "low", "tick_volume")
+        }
+        validos = np.isfinite(matrizes["close"]).all(axis=1)
+        validos &= np.isfinite(matrizes["high"]).all(axis=1) & np.isfinite(matrizes["low"]).all(axis=1)
+        nomes = [ativo for ativo, ok in zip(nomes, validos) if ok]
+        matrizes = {campo: matriz[validos] for campo, matriz in matrizes.items()}
+        return nomes, matrizes
+
+    def avaliar(self, close, high, low, volume):
+        """Indicadores e condições de todos os ativos; retorna os valores da última barra"""
+        series = calcular_series(close, high, low, volume, self.parametros)
+        condicoes = avaliar_series(series, close, high, low, self.parametros, ultimas=3)
+        valores = {
+            "rsi": series["rsi"][:, -1],
+            "stoch_k": series["stoch_k"][:, -1],
+            "momentum": series["momentum"][:, -1],
+            "macd": series["macd"][:, -1] - series["sinal_macd"][:, -1],
+            "atr": series["atr"][:, -1],
+            "volume_alto": series["volume_alto"][:, -1],
+        }
+        return {campo: serie[:, -1] for campo, serie in condicoes._asdict().items()}, valores
+
+    def escanear(self, ativos=None, apenas_candidatos=True):
+        """Tabela de candidatos a compra/venda ordenada pela força do sinal"""
+        if ativos is None:
+            ativos = self.listar_ativos()
+        nomes, matrizes = self.empilhar(ativos)
+        if not nomes:
+            return pd.DataFrame()
+
+        condicoes, valores = self.avaliar(
+            matrizes["close"], matrizes["high"], matrizes["low"], matrizes["tick_volume"]
+        )
+        compra = condicoes["pre_compra"]
+        venda = condicoes["pre_venda"] & ~compra
+
+        tabela = pd.DataFrame({
+            "ativo": nomes,
+            "sinal": np.where(compra, "COMPRA", np.where(venda, "VENDA", "")),
+            "forca_tendencia": condicoes["forca_tendencia"],
+            "tendencia": np.where(condicoes["tendencia_alta"], "ALTA",
+                                  np.where(condicoes["tendencia_baixa"], "BAIXA", "")),
+            "rsi_macd": (condicoes["rsi_compra"] & condicoes["macd_compra"])
+                        | (condicoes["rsi_venda"] & condicoes["macd_venda"]),
+            **valores,
+        })
+        tabela["candidato"] = compra | venda
+        if apenas_candidatos:
+            tabela = tabela[tabela["candidato"]]
+        tabela = tabela.sort_values(
+            ["candidato", "forca_tendencia", "rsi_macd", "volume_alto"], ascending=False, kind="stable"
+        )
+        return tabela.drop(columns="candidato").reset_index(drop=True)
@@ -0,0 +1,217 @@
+"""Métricas de latência por etapa do ciclo de cada ativo.
+
+Cada etapa (busca de barras, indicadores, risco, order_send, log...) tem um
+histograma de buckets fixos: registrar uma medida é um bisect e três somas,
+barato o bastante para ficar sempre ligado. As métricas de um ativo são
+escritas de mais de uma thread (os ciclos rodam em qualquer trabalhador do
+PoolEstrategias e o resultado das ordens chega pela thread do
+GatewayOrdens), então cada ativo tem um lock próprio em volta de cada
+registro e contagem: sem disputa entre ativos e barato sem contenção.
+
+As métricas podem ser lidas no próprio processo (`metricas.resumo()`),
+gravadas periodicamente num arquivo ou servidas em texto numa porta local,
+no formato de exposição do Prometheus.
+"""
+import os
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Limites superiores dos buckets, em microssegundos (o último bucket é +inf)
+LIMITES_US = (
+    10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 25000, 50000,
+    100000, 250000, 500000, 1000000, 2500000, 5000000,
+)
+_LIMITES_NS = tuple(limite * 1000 for limite in LIMITES_US)
+
+
+class Histograma:
+    __slots__ = ("contagens", "total", "soma_ns", "maximo_ns")
+
+    def __init__(self):
+        self.contagens = [0] * (len(_LIMITES_NS) + 1)
+        self.total = 0
+        self.soma_ns = 0
+        self.maximo_ns = 0
+
+    def registrar(self, ns):
+        self.contagens[bisect_left(_LIMITES_NS, ns)] += 1
+        self.total += 1
+        self.soma_ns += ns
+        if ns > self.maximo_ns:
+            self.maximo_ns = ns
+
+    def percentil(self, p):
+        """Limite superior (us) do bucket que contém o percentil `p` (0-100), limitado ao máximo visto"""
+        if self.total == 0:
+            return 0.0
+        alvo = self.total * p / 100.0
+        acumulado = 0
+        for limite, contagem in zip(LIMITES_US, self.contagens):
+            acumulado += contagem
+            if acumulado >= alvo:
+                return min(float(limite), self.maximo_ns / 1000.0)
+        return self.maximo_ns / 1000.0
+
+    def resumo(self):
+        return {
+            "n": self.total,
+            "media_us": round(self.soma_ns / self.total / 1000.0, 1) if self.total else 0.0,
+            "p50_us": self.percentil(50),
+            "p95_us": self.percentil(95),
+            "p99_us": self.percentil(99),
+            "max_us": round(self.maximo_ns / 1000.0, 1),
+        }
+
+
+class _Cronometro:
+    __slots__ = ("histograma", "lock", "inicio")
+
+    def __init__(self, histograma, lock):
+        self.histograma = histograma
+        self.lock = lock
+
+    def __enter__(self):
+        self.inicio = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        ns = time.perf_counter_ns() - self.inicio
+        with self.lock:
+            self.histograma.registrar(ns)
+        return False
+
+
+class MetricasAtivo:
+    """Histogramas por etapa e contadores de um ativo"""
+
+    def __init__(self, ativo):
+        self.ativo = ativo
+        self.etapas = {}
+        self.contadores = {}
+        self.lock = threading.Lock()
+
+    def histograma(self, etapa):
+        histograma = self.etapas.get(etapa)
+        if histograma is None:
+            # Etapa nova só sob o lock: resumo/texto iteram `etapas` com ele
+            with self.lock:
+                histograma = self.etapas.setdefault(etapa, Histograma())
+        return histograma
+
+    def medir(self, etapa):
+        """Context manager que registra a duração do bloco na etapa"""
+        return _Cronometro(self.histograma(etapa), self.lock)
+
+    def registrar(self, etapa, ns):
+        histograma = self.histograma(etapa)
+        with self.lock:
+            histograma.registrar(ns)
+
+    def contar(self, nome, quantidade=1):
+        with self.lock:
+            self.contadores[nome] = self.contadores.get(nome, 0) + quantidade
+
+    def resumo(self):
+        with self.lock:
+            return {
+                "etapas": {etapa: h.resumo() for etapa, h in self.etapas.items()},
+                "contadores": dict(self.contadores),
+            }
+
+
+class RegistroMetricas:
+    """Métricas de todos os ativos, com exportação para arquivo ou endpoint HTTP local"""
+
+    def __init__(self):
+        self.ativos = {}
+        self.lock = threading.Lock()
+        self.servidor = None
+
+    def ativo(self, nome):
+        with self.lock:
+            metricas = self.ativos.get(nome)
+            if metricas is None:
+                metricas = self.ativos[nome] = MetricasAtivo(nome)
+            return metricas
+
+    def resumo(self):
+        with self.lock:
+            ativos = list(self.ativos.values())
+        return {metricas.ativo: metricas.resumo() for metricas in ativos}
+
+    def texto(self):
+        """Métricas no formato de exposição de texto do Prometheus"""
+        with self.lock:
+            ativos = list(self.ativos.values())
+        linhas = [
+            "# HELP robo_etapa_segundos Latencia de cada etapa do ciclo da estrategia",
+            "# TYPE robo_etapa_segundos histogram",
+        ]
+        contadores = {}
+        for metricas in ativos:
+            with metricas.lock:
+                for etapa, h in metricas.etapas.items():
+                    rotulos = f'ativo="{metricas.ativo}",etapa="{etapa}"'
+                    acumulado = 0
+                    for limite, contagem in zip(LIMITES_US, h.contagens):
+                        acumulado += contagem
+                        linhas.append(f'robo_etapa_segundos_bucket{{{rotulos},le="{limite / 1e6:g}"}} {acumulado}')
+                    linhas.append(f'robo_etapa_segundos_bucket{{{rotulos},le="+Inf"}} {h.total}')
+                    linhas.append(f"robo_etapa_segundos_sum{{{rotulos}}} {h.soma_ns / 1e9:.6f}")
+                    linhas.append(f"robo_etapa_segundos_count{{{rotulos}}} {h.total}")
+                contadores[metricas.ativo] = dict(metricas.contadores)
+        linhas.append("# TYPE robo_eventos_total counter")
+        for metricas in ativos:
+            for nome, valor in contadores[metricas.ativo].items():
+                linhas.append(f'robo_eventos_total{{ativo="{metricas.ativo}",evento="{nome}"}} {valor}')
+        return "\n".join(linhas) + "\n"
+
+    def exportar_arquivo(self, caminho):
+        """Grava o texto das métricas de forma atômica (arquivo temporário + rename)"""
+        temporario = f"{caminho}.tmp"
+        with open(temporario, "w", encoding="utf-8") as arquivo:
+            arquivo.write(self.texto())
+        os.replace(temporario, caminho)
+
+    def exportar_periodicamente(self, caminho, intervalo=15.0):
+        """Thread daemon que regrava o arquivo a cada `intervalo` segundos; retorna o Event para pará-la"""
+        parada = threading.Event()
+
+        def laco():
+            while not parada.wait(intervalo):
+                try:
+                    self.exportar_arquivo(caminho)
+                except OSError:
+                    pass
+
+        threading.Thread(target=laco, daemon=True, name="exportar-metricas").start()
+        return parada
+
+    def servir(self, porta=9464, host="127.0.0.1"):
+        """Serve as métricas em http://host:porta/metrics numa thread daemon"""
+        registro = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip("/") not in ("", "/metrics"):
+                    self.send_error(404)
+                    return
+                corpo = registro.texto().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(corpo)))
+                self.end_headers()
+                self.wfile.write(corpo)
+
+            def log_message(self, *args):
+                pass
+
+        self.servidor = ThreadingHTTPServer((host, porta), Handler)
+        threading.Thread(target=self.servidor.serve_forever, daemon=True, name="servidor-metricas").start()
+        return self.servidor
+
+
+# Registro padrão usado pelas estratégias
+metricas = RegistroMetricas()
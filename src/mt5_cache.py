@@ -0,0 +1,81 @@
+"""Cache com TTL por campo para dados do terminal que mudam pouco.
+
+As especificações dos símbolos (point, digits, limites de volume, valor do
+tick) são lidas por estratégias, gateway e fluxo de ticks o tempo todo, mas
+são estáticas: o cache serve o último valor até o TTL do campo vencer (horas).
+Conta e posições não passam por aqui; quem as acompanha é o MotorRisco.
+
+As entradas não precisam de lock: leituras e trocas de entrada no dict são
+atômicas. Duas threads que encontrem a mesma entrada vencida buscam juntas,
+e o ClienteMT5 agrupa as duas leituras iguais numa só ida ao terminal. Só os
+contadores de consultas e acertos são atualizados sob lock.
+"""
+import threading
+import time
+from collections import namedtuple
+
+from src.mt5_client import mt5
+
+TTL_PADRAO = {
+    "simbolo": 3600.0,
+}
+
+EspecificacaoSimbolo = namedtuple(
+    "EspecificacaoSimbolo",
+    "nome point digits volume_min volume_max volume_step tick_value tick_size",
+)
+
+
+class CacheMT5:
+    def __init__(self, ttl=None, relogio=time.monotonic):
+        self.ttl = dict(TTL_PADRAO, **(ttl or {}))
+        self.relogio = relogio
+        self.entradas = {}  # (campo, chave) -> (expira_em, valor)
+        self.consultas = 0
+        self.acertos = 0
+        self.lock = threading.Lock()  # só para os contadores
+
+    def _obter(self, campo, chave, buscar):
+        agora = self.relogio()
+        entrada = self.entradas.get((campo, chave))
+        acerto = entrada is not None and entrada[0] > agora
+        with self.lock:
+            self.consultas += 1
+            self.acertos += acerto
+        if acerto:
+            return entrada[1]
+        valor = buscar()
+        if valor is not None:  # falhas do terminal não são guardadas
+            self.entradas[(campo, chave)] = (agora + self.ttl[campo], valor)
+        return valor
+
+    def simbolo(self, ativo):
+        """Especificação estática do símbolo, ou None se o terminal não o conhece"""
+        def buscar():
+            info = mt5.symbol_info(ativo)
+            if info is None:
+                return None
+            return EspecificacaoSimbolo(
+                ativo, info.point, info.digits, info.volume_min, info.volume_max, info.volume_step,
+                info.trade_tick_value, info.trade_tick_size,
+            )
+        return self._obter("simbolo", ativo, buscar)
+
+    def invalidar(self, *campos):
+        """Descarta as entradas dos campos dados (sem campos: todas)"""
+        campos = set(campos or self.ttl)
+        for chave in [chave for chave in list(self.entradas) if chave[0] in campos]:
+            self.entradas.pop(chave, None)
+
+    def resumo(self):
+        with self.lock:
+            consultas, acertos = self.consultas, self.acertos
+        return {
+            "consultas": consultas,
+            "acertos": acertos,
+            "entradas": len(self.entradas),
+        }
+
+
+# Cache padrão compartilhado pelas estratégias
+cache_mt5 = CacheMT5()
@@ -0,0 +1,142 @@
+"""Fachada thread-safe para o módulo MetaTrader5.
+
+A biblioteca do MT5 não foi feita para ser chamada de várias threads ao
+mesmo tempo, e aqui chamam as estratégias, o hub de dados, o scanner, o
+painel e a validação dos ativos. O cliente serializa todas as chamadas numa
+única thread de E/S: quem chama enfileira o pedido e espera o resultado.
+
+Leituras idênticas que já estão na fila ou em execução são agrupadas
+(singleflight): dez threads pedindo `account_info()` ao mesmo tempo geram uma
+chamada ao terminal e recebem o mesmo objeto. Envios de ordem nunca são
+agrupados.
+
+Uso, no lugar de `import MetaTrader5 as mt5`:
+
+    from src.mt5_client import mt5
+
+Constantes (`mt5.TIMEFRAME_M5`, `mt5.ORDER_TYPE_BUY`...) passam direto; o
+módulo real é resolvido no primeiro acesso. Vários módulos leem constantes
+na importação (os TIMEFRAMES da estratégia, os RETCODES do gateway), então o
+mt5_simulado precisa ser instalado antes de importar qualquer módulo de
+`src` que use o cliente. Latência de cada função e tempo de espera na fila
+vão para as métricas do "terminal" (src/metrics.py).
+"""
+import importlib
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from functools import partial
+
+from src.metrics import metricas
+
+# Funções só de leitura: chamadas iguais em voo são agrupadas
+LEITURAS = frozenset({
+    "account_info", "terminal_info", "version", "last_error",
+    "symbols_total", "symbols_get", "symbol_info", "symbol_info_tick",
+    "positions_total", "positions_get", "orders_total", "orders_get",
+    "history_orders_total", "history_orders_get", "history_deals_total", "history_deals_get",
+    "copy_rates_from", "copy_rates_from_pos", "copy_rates_range",
+    "copy_ticks_from", "copy_ticks_range",
+})
+
+
+class ClienteMT5:
+    def __init__(self, nome_modulo="MetaTrader5", nome_metricas="terminal"):
+        self._nome_modulo = nome_modulo
+        self._fila = queue.Queue()
+        self._em_voo = {}  # chave da leitura -> Future compartilhado
+        self._lock = threading.Lock()
+        self._thread = None
+        self.profundidade_maxima = 0
+        self.metricas = metricas.ativo(nome_metricas)
+
+    def __getattr__(self, nome):
+        if nome.startswith("_"):
+            raise AttributeError(nome)
+        valor = getattr(importlib.import_module(self._nome_modulo), nome)
+        if callable(valor):
+            valor = partial(self.chamar, nome)
+        setattr(self, nome, valor)  # próximos acessos não passam por __getattr__
+        return valor
+
+    def _iniciar(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._executar, daemon=True, name="mt5-io")
+            self._thread.start()
+
+    def enviar(self, nome, *args, **kwargs):
+        """Enfileira a chamada `nome(*args, **kwargs)` e retorna um Future com o resultado"""
+        chave = None
+        if nome in LEITURAS:
+            chave = (nome, args, tuple(sorted(kwargs.items())))
+            try:
+                hash(chave)
+            except TypeError:
+                chave = None
+
+        with self._lock:
+            self._iniciar()
+            futuro = self._em_voo.get(chave) if chave is not None else None
+            if futuro is not None:
+                self.metricas.contar("coalescidas")
+                return futuro
+            futuro = Future()
+            if chave is not None:
+                self._em_voo[chave] = futuro
+            self._fila.put((futuro, chave, nome, args, kwargs, time.perf_counter_ns()))
+            self.profundidade_maxima = max(self.profundidade_maxima, self._fila.qsize())
+        return futuro
+
+    def chamar(self, nome, *args, **kwargs):
+        """Executa a chamada na thread de E/S e espera o resultado (exceções são repassadas)"""
+        if threading.current_thread() is self._thread:
+            return getattr(importlib.import_module(self._nome_modulo), nome)(*args, **kwargs)
+        return self.enviar(nome, *args, **kwargs).result()
+
+    def _executar(self):
+        while True:
+            pedido = self._fila.get()
+            if pedido is None:
+                break
+            futuro, chave, nome, args, kwargs, enfileirado = pedido
+            inicio = time.perf_counter_ns()
+            self.metricas.registrar("fila", inicio - enfileirado)
+            try:
+                resultado = getattr(importlib.import_module(self._nome_modulo), nome)(*args, **kwargs)
+                erro = None
+            except BaseException as e:
+                erro = e
+            self.metricas.registrar(nome, time.perf_counter_ns() - inicio)
+            self.metricas.contar("chamadas")
+
+            # Sai do "em voo" antes de entregar: pedidos a partir daqui geram uma leitura nova
+            if chave is not None:
+                with self._lock:
+                    self._em_voo.pop(chave, None)
+            if futuro.set_running_or_notify_cancel():
+                if erro is None:
+                    futuro.set_result(resultado)
+                else:
+                    futuro.set_exception(erro)
+
+    def estatisticas(self):
+        """Profundidade da fila, leituras em voo e latência por função (us)"""
+        return {
+            "profundidade": self._fila.qsize(),
+            "profundidade_maxima": self.profundidade_maxima,
+            "em_voo": len(self._em_voo),
+            **self.metricas.resumo(),
+        }
+
+    def fechar(self, timeout=5.0):
+        """Encerra a thread de E/S depois dos pedidos já enfileirados"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._fila.put(None)
+            thread.join(timeout)
+
+
+# Cliente único do processo
+mt5 = ClienteMT5()
@@ -0,0 +1,510 @@
+"""Substituto local do pacote MetaTrader5 para rodar o robô sem terminal.
+
+Reproduz as chamadas que o projeto usa a partir de barras M1 gravadas (por
+exemplo de um ArmazemBarras) ou sintéticas, num relógio simulado que anda
+`velocidade` vezes mais rápido que o real (ou só quando `avancar` é
+chamado, com velocidade 0). Os timeframes maiores são agregados das barras
+M1, e a barra em formação só mostra o trecho já percorrido pelo preço, sem
+olhar o futuro. Ordens a mercado são executadas no bid/ask do momento e as
+posições são fechadas quando o preço toca o SL ou o TP.
+
+Uso, antes de importar qualquer outro módulo de `src` (eles leem constantes do
+MetaTrader5 na importação):
+
+    from src import mt5_simulado
+    simulador = mt5_simulado.SimuladorMT5(velocidade=100)
+    simulador.gerar_sintetico("WINM25")
+    mt5_simulado.instalar(simulador)
+"""
+import sys
+import threading
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+import numpy as np
+
+from src import bar_scheduler
+from src.bar_ingestion import DTYPE_BARRAS
+
+TIMEFRAME_M1 = 1
+TIMEFRAME_M5 = 5
+TIMEFRAME_M15 = 15
+TIMEFRAME_M30 = 30
+TIMEFRAME_H1 = 16385
+TIMEFRAME_H4 = 16388
+TIMEFRAME_D1 = 16408
+
+SEGUNDOS_TIMEFRAME = {
+    TIMEFRAME_M1: 60,
+    TIMEFRAME_M5: 300,
+    TIMEFRAME_M15: 900,
+    TIMEFRAME_M30: 1800,
+    TIMEFRAME_H1: 3600,
+    TIMEFRAME_H4: 14400,
+    TIMEFRAME_D1: 86400,
+}
+
+ORDER_TYPE_BUY = 0
+ORDER_TYPE_SELL = 1
+POSITION_TYPE_BUY = 0
+POSITION_TYPE_SELL = 1
+TRADE_ACTION_DEAL = 1
+ORDER_TIME_GTC = 0
+ORDER_FILLING_FOK = 0
+ORDER_FILLING_IOC = 1
+SYMBOL_TRADE_MODE_FULL = 4
+ACCOUNT_TRADE_MODE_DEMO = 0
+COPY_TICKS_ALL = -1
+
+TRADE_RETCODE_REQUOTE = 10004
+TRADE_RETCODE_DONE = 10009
+TRADE_RETCODE_INVALID = 10013
+TRADE_RETCODE_INVALID_VOLUME = 10014
+TRADE_RETCODE_INVALID_STOPS = 10016
+TRADE_RETCODE_MARKET_CLOSED = 10018
+TRADE_RETCODE_PRICE_CHANGED = 10020
+
+DTYPE_TICKS = np.dtype([
+    ('time', '<i8'),
+    ('bid', '<f8'),
+    ('ask', '<f8'),
+    ('last', '<f8'),
+    ('volume', '<u8'),
+    ('time_msc', '<i8'),
+    ('flags', '<u4'),
+    ('volume_real', '<f8'),
+])
+
+# Frações da barra M1 em que o preço passa pelos pontos abertura, 1º extremo, 2º extremo e fechamento
+_TRAJETO = np.array([0.0, 1 / 3, 2 / 3, 59 / 60])
+
+
+class SimuladorMT5:
+    """Estado do mercado simulado: relógio, barras por ativo, conta e posições"""
+
+    def __init__(self, velocidade=1.0, saldo=100000.0, aquecimento=1000):
+        self.velocidade = float(velocidade)
+        self.aquecimento = aquecimento
+        self.saldo = float(saldo)
+        self.ativos = {}
+        self.posicoes = []
+        self.negocios = []
+        self.proximo_ticket = 1
+        self.ultimo_erro = (1, "Success")
+        self.lock = threading.RLock()
+        self._tempo_base = None
+        self._real_base = time.monotonic()
+
+    # Relógio
+    def agora(self):
+        """Hora atual do servidor simulado (timestamp em segundos)"""
+        if self._tempo_base is None:
+            inicios = [int(a.m1['time'][min(self.aquecimento, len(a.m1) - 1)]) for a in self.ativos.values()]
+            self._tempo_base = float(max(inicios)) if inicios else time.time()
+            self._real_base = time.monotonic()
+        return self._tempo_base + (time.monotonic() - self._real_base) * self.velocidade
+
+    def posicionar(self, tempo):
+        with self.lock:
+            self._tempo_base = float(tempo)
+            self._real_base = time.monotonic()
+
+    def avancar(self, segundos):
+        with self.lock:
+            self.posicionar(self.agora() + segundos)
+
+    # Dados
+    def adicionar_ativo(self, nome, barras_m1, point=1.0, digits=0, spread=5, tick_value=None, tick_size=None,
+                        volume_min=1.0, volume_max=100.0, volume_step=1.0):
+        """Registra um ativo a partir de barras M1 no layout do MT5 (memmap aceito)"""
+        barras_m1 = np.asarray(barras_m1)
+        if len(barras_m1) == 0:
+            raise ValueError(f"Sem barras para {nome}")
+        self.ativos[nome] = SimpleNamespace(
+            nome=nome, m1=barras_m1, agregadas={}, spread=spread,
+            info=dict(
+                name=nome, visible=True, trade_mode=SYMBOL_TRADE_MODE_FULL, point=point, digits=digits,
+                spread=spread, volume_min=volume_min, volume_max=volume_max, volume_step=volume_step,
+                trade_tick_value=tick_value if tick_value is not None else point,
+                trade_tick_size=tick_size if tick_size is not None else point,
+                description=f"{nome} (simulado)",
+            ),
+        )
+
+    def gerar_sintetico(self, nome, barras=20000, preco=130000.0, volatilidade=30.0, inicio=1700000000, seed=None,
+                        **info):
+        """Passeio aleatório M1 contínuo a partir de `inicio`"""
+        rng = np.random.default_rng(seed)
+        point = info.get("point", 1.0)
+        close = preco + np.cumsum(rng.normal(0, volatilidade, barras))
+        close = np.round(close / point) * point
+        open_ = np.r_[preco, close[:-1]]
+        dados = np.zeros(barras, dtype=DTYPE_BARRAS)
+        dados['time'] = inicio // 60 * 60 + 60 * np.arange(barras)
+        dados['open'] = open_
+        dados['close'] = close
+        dados['high'] = np.maximum(open_, close) + np.round(rng.uniform(0, volatilidade, barras) / point) * point
+        dados['low'] = np.minimum(open_, close) - np.round(rng.uniform(0, volatilidade, barras) / point) * point
+        dados['tick_volume'] = rng.integers(100, 2000, barras)
+        dados['spread'] = info.get("spread", 5)
+        self.adicionar_ativo(nome, dados, **info)
+
+    def _agregar(self, ativo, timeframe):
+        """Barras do timeframe a partir das M1 e o índice da barra agregada de cada M1"""
+        cache = ativo.agregadas.get(timeframe)
+        if cache is None:
+            segundos = SEGUNDOS_TIMEFRAME.get(timeframe, 60)
+            m1 = ativo.m1
+            chave = m1['time'] // segundos * segundos
+            novo = np.r_[True, chave[1:] != chave[:-1]]
+            inicios = np.flatnonzero(novo)
+            barras = np.zeros(len(inicios), dtype=DTYPE_BARRAS)
+            barras['time'] = chave[inicios]
+            barras['open'] = m1['open'][inicios]
+            barras['high'] = np.maximum.reduceat(m1['high'], inicios)
+            barras['low'] = np.minimum.reduceat(m1['low'], inicios)
+            barras['close'] = m1['close'][np.r_[inicios[1:], len(m1)] - 1]
+            barras['tick_volume'] = np.add.reduceat(m1['tick_volume'], inicios)
+            barras['spread'] = m1['spread'][inicios]
+            cache = ativo.agregadas[timeframe] = (barras, inicios, np.cumsum(novo) - 1)
+        return cache
+
+    def _indice_m1(self, ativo, agora):
+        """Índice da barra M1 corrente e a fração dela já decorrida"""
+        m1 = ativo.m1
+        i = int(np.searchsorted(m1['time'], agora, side="right")) - 1
+        if i < 0:
+            return -1, 0.0
+        return i, min(1.0, (agora - int(m1['time'][i])) / 60.0)
+
+    @staticmethod
+    def _pontos(barra):
+        """Preços da barra M1 nos instantes do _TRAJETO (abertura, extremos, fechamento)"""
+        if barra['close'] >= barra['open']:
+            return (barra['open'], barra['low'], barra['high'], barra['close'])
+        return (barra['open'], barra['high'], barra['low'], barra['close'])
+
+    def _parcial(self, barra, fracao):
+        """Preço atual e extremos já percorridos dentro de uma barra M1"""
+        pontos = self._pontos(barra)
+        percorridos = np.asarray(pontos[:int(np.searchsorted(_TRAJETO, fracao, side="right"))], dtype=np.float64)
+        preco = float(np.interp(fracao, _TRAJETO, pontos))
+        return preco, max(percorridos.max(), preco), min(percorridos.min(), preco)
+
+    def _trecho(self, barra, inicio, fim):
+        """Preço no início e extremos do trajeto de uma barra M1 entre as frações `inicio` e `fim`"""
+        if inicio == 0.0 and fim >= 1.0:
+            return barra['open'], barra['high'], barra['low']
+        pontos = self._pontos(barra)
+        abertura = float(np.interp(inicio, _TRAJETO, pontos))
+        precos = [abertura, float(np.interp(fim, _TRAJETO, pontos))]
+        precos += [ponto for t, ponto in zip(_TRAJETO, pontos) if inicio < t < fim]
+        return abertura, max(precos), min(precos)
+
+    def _ativo(self, nome):
+        ativo = self.ativos.get(nome)
+        if ativo is None:
+            self.ultimo_erro = (-1, f"Ativo {nome} desconhecido")
+        return ativo
+
+    def _cotacao(self, ativo, agora):
+        i, fracao = self._indice_m1(ativo, agora)
+        if i < 0:
+            return None
+        preco, _, _ = self._parcial(ativo.m1[i], fracao)
+        return preco, preco + ativo.spread * ativo.info["point"]
+
+    def copy_rates_from_pos(self, nome, timeframe, pos, count):
+        with self.lock:
+            ativo = self._ativo(nome)
+            if ativo is None:
+                return None
+            agora = self.agora()
+            i, fracao = self._indice_m1(ativo, agora)
+            if i < 0:
+                return np.empty(0, dtype=DTYPE_BARRAS)
+            barras, inicios, mapa = self._agregar(ativo, timeframe)
+            atual = int(mapa[i])
+            fim = atual - pos + 1
+            if fim <= 0:
+                return np.empty(0, dtype=DTYPE_BARRAS)
+            copia = barras[max(0, fim - count):fim].copy()
+            if pos == 0 and len(copia):
+                # Barra em formação: M1 completas do bloco mais o trecho percorrido da M1 corrente
+                primeira = int(inicios[atual])
+                preco, alta, baixa = self._parcial(ativo.m1[i], fracao)
+                anteriores = ativo.m1[primeira:i]
+                formacao = copia[-1:]
+                formacao['high'] = max(alta, anteriores['high'].max()) if len(anteriores) else alta
+                formacao['low'] = min(baixa, anteriores['low'].min()) if len(anteriores) else baixa
+                formacao['close'] = preco
+                formacao['tick_volume'] = int(anteriores['tick_volume'].sum() + ativo.m1['tick_volume'][i] * fracao)
+            return copia
+
+    def copy_rates_range(self, nome, timeframe, date_from, date_to):
+        with self.lock:
+            ativo = self._ativo(nome)
+            if ativo is None:
+                return None
+            inicio, fim = _timestamp(date_from), _timestamp(date_to)
+            copia = self.copy_rates_from_pos(nome, timeframe, 0, len(self._agregar(ativo, timeframe)[0]))
+            tempos = copia['time']
+            return copia[(tempos >= inicio) & (tempos <= fim)]
+
+    def copy_ticks_from(self, nome, date_from, count, flags=COPY_TICKS_ALL):
+        """Quatro ticks por barra M1 (abertura, extremos e fechamento) até o instante atual"""
+        with self.lock:
+            ativo = self._ativo(nome)
+            if ativo is None:
+                return None
+            agora = self.agora()
+            m1 = ativo.m1
+            inicio = _timestamp(date_from)
+            a = max(0, int(np.searchsorted(m1['time'], inicio, side="right")) - 1)
+            b = self._indice_m1(ativo, agora)[0] + 1
+            if b <= a:
+                return np.empty(0, dtype=DTYPE_TICKS)
+            bloco = m1[a:min(b, a + count // 4 + 2)]
+            sobe = bloco['close'] >= bloco['open']
+            precos = np.stack([
+                bloco['open'],
+                np.where(sobe, bloco['low'], bloco['high']),
+                np.where(sobe, bloco['high'], bloco['low']),
+                bloco['close'],
+            ], axis=1).ravel()
+            tempos_msc = (bloco['time'][:, None] * 1000 + (_TRAJETO * 60000).astype(np.int64)).ravel()
+            validos = (tempos_msc >= inicio * 1000) & (tempos_msc <= agora * 1000)
+            ticks = np.zeros(int(validos.sum()), dtype=DTYPE_TICKS)
+            ticks['time_msc'] = tempos_msc[validos]
+            ticks['time'] = ticks['time_msc'] // 1000
+            ticks['bid'] = ticks['last'] = precos[validos]
+            ticks['ask'] = ticks['bid'] + ativo.spread * ativo.info["point"]
+            ticks['volume'] = np.repeat(bloco['tick_volume'] // 4, 4)[validos]
+            ticks['volume_real'] = ticks['volume']
+            return ticks[:count]
+
+    # Conta e ordens
+    def _lucro(self, posicao, preco):
+        ativo = self.ativos[posicao.symbol]
+        pontos = preco - posicao.price_open if posicao.type == POSITION_TYPE_BUY else posicao.price_open - preco
+        return pontos / ativo.info["trade_tick_size"] * ativo.info["trade_tick_value"] * posicao.volume
+
+    def _fechar(self, posicao, preco, tempo, motivo):
+        lucro = self._lucro(posicao, preco)
+        self.saldo += lucro
+        self.posicoes.remove(posicao)
+        self.negocios.append(SimpleNamespace(
+            ticket=self.proximo_ticket, position_id=posicao.ticket, symbol=posicao.symbol,
+            type=1 - posicao.type, volume=posicao.volume, price=preco, profit=lucro,
+            time=int(tempo), comment=motivo, magic=posicao.magic,
+        ))
+        self.proximo_ticket += 1
+
+    def _verificar_stops(self):
+        """Fecha as posições cujo SL/TP foi tocado desde a última verificação (SL vence no empate).
+
+        O trajeto é percorrido a partir do instante da verificação anterior (na
+        primeira, o da entrada), inclusive o resto da barra M1 da entrada.
+        """
+        agora = self.agora()
+        for posicao in list(self.posicoes):
+            if agora <= posicao.verificado_em:
+                continue
+            ativo = self.ativos[posicao.symbol]
+            i, fracao = self._indice_m1(ativo, agora)
+            inicio, fracao_inicio = self._indice_m1(ativo, posicao.verificado_em)
+            spread = ativo.spread * ativo.info["point"] if posicao.type == POSITION_TYPE_SELL else 0.0
+            trechos = [
+                (j, *self._trecho(ativo.m1[j], fracao_inicio if j == inicio else 0.0, fracao if j == i else 1.0))
+                for j in range(inicio, i + 1)
+            ]
+            posicao.verificado_em = agora
+
+            for j, abertura, alta, baixa in trechos:
+                abertura, alta, baixa = abertura + spread, alta + spread, baixa + spread
+                tempo = int(ativo.m1[j]['time'])
+                if posicao.type == POSITION_TYPE_BUY:
+                    if posicao.sl and baixa <= posicao.sl:
+                        self._fechar(posicao, min(abertura, posicao.sl), tempo, "sl")
+                        break
+                    if posicao.tp and alta >= posicao.tp:
+                        self._fechar(posicao, max(abertura, posicao.tp), tempo, "tp")
+                        break
+                else:
+                    if posicao.sl and alta >= posicao.sl:
+                        self._fechar(posicao, max(abertura, posicao.sl), tempo, "sl")
+                        break
+                    if posicao.tp and baixa <= posicao.tp:
+                        self._fechar(posicao, min(abertura, posicao.tp), tempo, "tp")
+                        break
+
+    def account_info(self):
+        with self.lock:
+            self._verificar_stops()
+            agora = self.agora()
+            flutuante = 0.0
+            for posicao in self.posicoes:
+                bid, ask = self._cotacao(self.ativos[posicao.symbol], agora)
+                flutuante += self._lucro(posicao, bid if posicao.type == POSITION_TYPE_BUY else ask)
+            return SimpleNamespace(
+                login=0, server="Simulador", currency="BRL", trade_mode=ACCOUNT_TRADE_MODE_DEMO, leverage=1,
+                balance=self.saldo, equity=self.saldo + flutuante, profit=flutuante,
+                margin=0.0, margin_free=self.saldo + flutuante,
+            )
+
+    def symbols_get(self):
+        return tuple(SimpleNamespace(**ativo.info) for ativo in self.ativos.values())
+
+    def symbol_info(self, nome):
+        ativo = self._ativo(nome)
+        return None if ativo is None else SimpleNamespace(**ativo.info)
+
+    def symbol_info_tick(self, nome):
+        with self.lock:
+            ativo = self._ativo(nome)
+            if ativo is None:
+                return None
+            self._verificar_stops()
+            agora = self.agora()
+            cotacao = self._cotacao(ativo, agora)
+            if cotacao is None:
+                return None
+            bid, ask = cotacao
+            return SimpleNamespace(time=int(agora), bid=bid, ask=ask, last=bid, volume=1,
+                                   time_msc=int(agora * 1000), flags=0, volume_real=1.0)
+
+    def positions_total(self):
+        with self.lock:
+            self._verificar_stops()
+            return len(self.posicoes)
+
+    def positions_get(self, symbol=None, ticket=None):
+        with self.lock:
+            self._verificar_stops()
+            return tuple(
+                SimpleNamespace(**vars(p)) for p in self.posicoes
+                if (symbol is None or p.symbol == symbol) and (ticket is None or p.ticket == ticket)
+            )
+
+    def _resultado(self, retcode, request, comentario, preco=0.0, bid=0.0, ask=0.0, ticket=0, volume=0.0):
+        return SimpleNamespace(retcode=retcode, deal=ticket, order=ticket, volume=volume, price=preco,
+                               bid=bid, ask=ask, comment=comentario, request_id=0,
+                               retcode_external=0, request=SimpleNamespace(**request))
+
+    def order_send(self, request):
+        """Ordem a mercado (TRADE_ACTION_DEAL); com `position` no pedido, fecha aquela posição"""
+        with self.lock:
+            self._verificar_stops()
+            ativo = self._ativo(request.get("symbol"))
+            if ativo is None or request.get("action") != TRADE_ACTION_DEAL:
+                return self._resultado(TRADE_RETCODE_INVALID, request, "Invalid request")
+            agora = self.agora()
+            cotacao = self._cotacao(ativo, agora)
+            if cotacao is None or agora > int(ativo.m1['time'][-1]) + 60:
+                return self._resultado(TRADE_RETCODE_MARKET_CLOSED, request, "Market closed")
+            bid, ask = cotacao
+            info = ativo.info
+            compra = request.get("type") == ORDER_TYPE_BUY
+            preco = ask if compra else bid
+
+            volume = float(request.get("volume", 0))
+            passos = round(volume / info["volume_step"], 8)
+            if not (info["volume_min"] <= volume <= info["volume_max"]) or passos != int(passos):
+                return self._resultado(TRADE_RETCODE_INVALID_VOLUME, request, "Invalid volume", bid=bid, ask=ask)
+
+            solicitado = request.get("price") or preco
+            if abs(preco - solicitado) > request.get("deviation", 0) * info["point"]:
+                return self._resultado(TRADE_RETCODE_REQUOTE, request, "Requote", bid=bid, ask=ask)
+
+            if request.get("position"):
+                alvo = next((p for p in self.posicoes if p.ticket == request["position"]), None)
+                if alvo is None:
+                    return self._resultado(TRADE_RETCODE_INVALID, request, "Position not found", bid=bid, ask=ask)
+                self._fechar(alvo, preco, agora, "cliente")
+                return self._resultado(TRADE_RETCODE_DONE, request, "Request executed", preco, bid, ask,
+                                       self.proximo_ticket - 1, volume)
+
+            sl, tp = request.get("sl", 0.0), request.get("tp", 0.0)
+            if (sl and (sl >= preco if compra else sl <= preco)) or (tp and (tp <= preco if compra else tp >= preco)):
+                return self._resultado(TRADE_RETCODE_INVALID_STOPS, request, "Invalid stops", bid=bid, ask=ask)
+
+            ticket = self.proximo_ticket
+            self.proximo_ticket += 1
+            self.posicoes.append(SimpleNamespace(
+                ticket=ticket, symbol=ativo.nome, type=POSITION_TYPE_BUY if compra else POSITION_TYPE_SELL,
+                volume=volume, price_open=preco, sl=sl, tp=tp, time=int(agora), magic=request.get("magic", 0),
+                comment=request.get("comment", ""), verificado_em=agora,
+            ))
+            return self._resultado(TRADE_RETCODE_DONE, request, "Request executed", preco, bid, ask, ticket, volume)
+
+
+def _timestamp(valor):
+    if isinstance(valor, datetime):
+        return int(valor.timestamp())
+    return int(valor)
+
+
+# API no formato do módulo MetaTrader5, delegando ao simulador instalado
+_simulador = None
+
+
+def instalar(simulador):
+    """Registra este módulo como `MetaTrader5` e faz os agendadores seguirem o relógio simulado"""
+    global _simulador
+    _simulador = simulador
+    sys.modules["MetaTrader5"] = sys.modules[__name__]
+    bar_scheduler.configurar_relogio(simulador.agora, simulador.velocidade)
+    return sys.modules[__name__]
+
+
+def initialize(*args, **kwargs):
+    return _simulador is not None
+
+
+def shutdown():
+    return True
+
+
+def last_error():
+    return _simulador.ultimo_erro if _simulador is not None else (-10004, "No IPC connection")
+
+
+def account_info():
+    return _simulador.account_info()
+
+
+def symbols_get(group=None):
+    return _simulador.symbols_get()
+
+
+def symbol_info(symbol):
+    return _simulador.symbol_info(symbol)
+
+
+def symbol_info_tick(symbol):
+    return _simulador.symbol_info_tick(symbol)
+
+
+def copy_rates_from_pos(symbol, timeframe, start_pos, count):
+    return _simulador.copy_rates_from_pos(symbol, timeframe, start_pos, count)
+
+
+def copy_rates_range(symbol, timeframe, date_from, date_to):
+    return _simulador.copy_rates_range(symbol, timeframe, date_from, date_to)
+
+
+def copy_ticks_from(symbol, date_from, count, flags):
+    return _simulador.copy_ticks_from(symbol, date_from, count, flags)
+
+
+def positions_total():
+    return _simulador.positions_total()
+
+
+def positions_get(symbol=None, ticket=None):
+    return _simulador.positions_get(symbol=symbol, ticket=ticket)
+
+
+def order_send(request):
+    return _simulador.order_send(request)
@@ -1,16 +1,179 @@
+import time
 import tkinter as tk
+import tkinter.font
 from tkinter import ttk
-from datetime import datetime
+from collections import deque
+
+import numpy as np
+
+from src.log_index import CAPACIDADE_PADRAO, IndiceLogs
+
+PERIODOS_FILTRO = {
+    "Tudo": None,
+    "5 min": 300,
+    "15 min": 900,
+    "1 hora": 3600,
+    "24 horas": 86400,
+}
+TODOS = "Todos"
+
+# Níveis de log (DEBUG: análise detalhada; TRADE: sinais e ordens)
+NIVEIS = {"DEBUG": 10, "INFO": 20, "TRADE": 30, "ERROR": 40}
+
+class BufferLog:
+    """Últimas entradas de um log, limitadas por quantidade de linhas e/ou bytes"""
+
+    def __init__(self, max_linhas=None, max_bytes=None):
+        self.max_linhas = max_linhas
+        self.max_bytes = max_bytes
+        self.entradas = deque()
+        self.tamanhos = deque()  # bytes em UTF-8 de cada entrada (emoji e acentos ocupam mais de um)
+        self.bytes = 0
+        self.quebras = 0  # linhas de texto (uma entrada pode ter várias)
+
+    def append(self, entrada):
+        tamanho = len(entrada.encode("utf-8"))
+        self.entradas.append(entrada)
+        self.tamanhos.append(tamanho)
+        self.bytes += tamanho
+        self.quebras += entrada.count("\n")
+        while self.entradas and (
+                (self.max_linhas is not None and len(self.entradas) > self.max_linhas)
+                or (self.max_bytes is not None and self.bytes > self.max_bytes)):
+            antiga = self.entradas.popleft()
+            self.bytes -= self.tamanhos.popleft()
+            self.quebras -= antiga.count("\n")
+
+    def clear(self):
+        self.entradas.clear()
+        self.tamanhos.clear()
+        self.bytes = 0
+        self.quebras = 0
+
+    def __iter__(self):
+        return iter(self.entradas)
+
+    def __len__(self):
+        return len(self.entradas)
+
+class ListaVirtual:
+    """Text que mostra só a janela visível de uma lista de linhas do índice"""
+
+    def __init__(self, parent, indice):
+        self.indice = indice
+        self.ids = np.empty(0, dtype=np.int64)  # ids estáveis: posição no índice + indice.inicio
+        self.topo = 0
+        self.altura = 15
+        self.text = tk.Text(
+            parent,
+            height=15,
+            bg='#1E1E1E',
+            fg='white',
+            relief="flat",
+            font=("Consolas", 11),
+            padx=15,
+            pady=15,
+            wrap="none"
+        )
+        self.text.pack(side="left", fill="both", expand=True)
+        self.scrollbar = ttk.Scrollbar(parent, command=self.rolar)
+        self.scrollbar.pack(side="right", fill="y")
+        self.text.bind("<Configure>", self._redimensionar)
+        self.text.bind("<MouseWheel>", lambda e: self.rolar("scroll", -3 if e.delta > 0 else 3, "units"))
+        self.text.bind("<Button-4>", lambda e: self.rolar("scroll", -3, "units"))
+        self.text.bind("<Button-5>", lambda e: self.rolar("scroll", 3, "units"))
+
+    def no_fim(self):
+        return self.topo + self.altura >= len(self.ids)
+
+    def definir(self, ids, manter_posicao=False):
+        seguir = not manter_posicao or self.no_fim()
+        self.ids = ids
+        if seguir:
+            self.topo = max(0, len(ids) - self.altura)
+        self.topo = min(self.topo, max(0, len(ids) - self.altura))
+        self.desenhar()
+
+    def desenhar(self):
+        visiveis = self.ids[self.topo:self.topo + self.altura] - self.indice.inicio
+        texto = "".join(self.indice.textos_de(visiveis[visiveis >= 0]))
+        self.text.config(state="normal")
+        self.text.delete("1.0", "end")
+        self.text.insert("end", texto)
+        self.text.config(state="disabled")
+        total = max(1, len(self.ids))
+        self.scrollbar.set(self.topo / total, min(1.0, (self.topo + self.altura) / total))
+
+    def rolar(self, acao, quantidade, unidade=None):
+        if acao == "moveto":
+            topo = int(float(quantidade) * len(self.ids))
+        else:
+            passo = self.altura if unidade == "pages" else 1
+            topo = self.topo + int(quantidade) * passo
+        self.topo = max(0, min(topo, len(self.ids) - self.altura))
+        self.desenhar()
+        return "break"
+
+    def _redimensionar(self, event):
+        altura_linha = max(1, tk.font.Font(font=self.text.cget("font")).metrics("linespace"))
+        altura = max(1, (event.height - 30) // altura_linha)
+        if altura != self.altura:
+            self.altura = altura
+            self.desenhar()
 
 class MultiAssetLogSystem:
-    def __init__(self):
+    """Logs por ativo em abas Tk.
+
+    `logar` pode ser chamado de qualquer thread: só enfileira a mensagem. A
+    thread da interface drena a fila a cada `intervalo_ms` (root.after) e faz
+    um único insert + see por widget com todas as linhas acumuladas.
+
+    Memória e widgets guardam só as últimas `max_linhas`/`max_bytes` de cada
+    ativo (e da Visão Geral); com um ArmazemLogs tudo é gravado em disco e as
+    entradas antigas continuam acessíveis por `historico`. Com um
+    SinkLogEstruturado, cada registro também vai, com nível, evento e campos,
+    para os arquivos JSON Lines gravados em segundo plano.
+
+    Todos os registros também entram num IndiceLogs (ativo, nível, evento e
+    balde de tempo), consultado pela barra de filtros da aba "Filtro". Com
+    armazém o índice guarda só o rowid e lê do SQLite o texto exibido; sem
+    ele, guarda os textos com a retenção da Visão Geral.
+
+    Cada ativo tem um nível mínimo (`definir_nivel`; padrão `nivel`).
+    Mensagens abaixo dele são descartadas antes de qualquer formatação: com
+    `logar(ativo, "RSI %.2f", rsi)` o texto só é montado se o registro passar.
+    """
+
+    def __init__(self, intervalo_ms=100, max_por_drenagem=5000, max_linhas=5000, max_bytes=None,
+                 max_linhas_geral=20000, armazem=None, sink=None, nivel="INFO"):
+        self.max_linhas = max_linhas
+        self.max_bytes = max_bytes
+        self.armazem = armazem
+        self.sink = sink
         self.logs = {}
+        self.log_geral = BufferLog(max_linhas_geral, max_bytes)
+        if armazem is not None:
+            self.indice = IndiceLogs(armazem=armazem, formatar=self._entrada_geral)
+        else:
+            self.indice = IndiceLogs(capacidade=max_linhas_geral or CAPACIDADE_PADRAO, max_bytes=max_bytes)
+        self.lista_filtro = None
+        self.filtros = {}
+        self.linhas_widget = {}
         self.interfaces = {}
         self.tabs = None
         self.notebook = None
+        self.pendentes = deque()  # append/popleft são thread-safe
+        self.intervalo_ms = intervalo_ms
+        self.max_por_drenagem = max_por_drenagem
+        self.agendamento = None
+        self.limiar_padrao = NIVEIS[nivel]
+        self.limiares = {}  # ativo -> nível mínimo numérico
+        self._ultimo_segundo = None
+        self._ultimo_timestamp = ""
 
     def criar_interface_logs(self, parent, ativos):
         """Create tabbed interface for multiple asset logs"""
+        self.criar_barra_filtros(parent)
         self.notebook = ttk.Notebook(parent)
         self.notebook.pack(fill="both", expand=True)
 
@@ -40,7 +203,7 @@ class MultiAssetLogSystem:
 
             # Store interface reference
             self.interfaces[ativo] = text_log
-            self.logs[ativo] = []
+            self.logs[ativo] = BufferLog(self.max_linhas, self.max_bytes)
 
         # Create combined view tab
         combined_frame = ttk.Frame(self.notebook)
@@ -65,32 +228,210 @@ class MultiAssetLogSystem:
 
         self.interfaces['combined'] = combined_log
 
-    def logar(self, ativo, mensagem):
-        """Log message for specific asset"""
+        # Filtered view tab (virtualized)
+        filtro_frame = ttk.Frame(self.notebook)
+        self.notebook.add(filtro_frame, text="Filtro")
+        self.lista_filtro = ListaVirtual(filtro_frame, self.indice)
+        self.aba_filtro = filtro_frame
+
+        self._ciclo_drenagem()
+
+    def criar_barra_filtros(self, parent):
+        """Filtros por ativo, nível, evento, período e texto sobre o índice de logs"""
+        barra = tk.Frame(parent, bg='#1E1E1E', padx=10, pady=5)
+        barra.pack(fill="x")
+        self.filtros = {
+            "ativo": tk.StringVar(value=TODOS),
+            "nivel": tk.StringVar(value=TODOS),
+            "evento": tk.StringVar(value=TODOS),
+            "periodo": tk.StringVar(value="Tudo"),
+            "texto": tk.StringVar(),
+        }
+        for campo, rotulo in (("ativo", "Ativo"), ("nivel", "Nível"), ("evento", "Evento")):
+            tk.Label(barra, text=rotulo, fg='white', bg='#1E1E1E').pack(side="left", padx=(0, 4))
+            combo = ttk.Combobox(barra, textvariable=self.filtros[campo], width=14, state="readonly")
+            combo.configure(postcommand=lambda c=combo, f=campo: c.configure(values=[TODOS] + self.indice.valores(f)))
+            combo.pack(side="left", padx=(0, 10))
+        tk.Label(barra, text="Período", fg='white', bg='#1E1E1E').pack(side="left", padx=(0, 4))
+        ttk.Combobox(barra, textvariable=self.filtros["periodo"], values=list(PERIODOS_FILTRO), width=9,
+                     state="readonly").pack(side="left", padx=(0, 10))
+        entrada = tk.Entry(barra, textvariable=self.filtros["texto"], width=20)
+        entrada.pack(side="left", padx=(0, 10))
+        entrada.bind("<Return>", lambda e: self.aplicar_filtro())
+        tk.Button(barra, text="🔍 Filtrar", command=self.aplicar_filtro, relief="flat").pack(side="left")
+        tk.Button(barra, text="✖ Limpar", command=self.limpar_filtro, relief="flat").pack(side="left", padx=5)
+
+        # Nível mínimo registrado para o ativo escolhido no filtro (Todos = padrão)
+        self.filtros["registrar"] = tk.StringVar(value=self.nivel_de(None))
+        combo_nivel = ttk.Combobox(barra, textvariable=self.filtros["registrar"], values=list(NIVEIS), width=7,
+                                   state="readonly")
+        combo_nivel.pack(side="right")
+        combo_nivel.bind("<<ComboboxSelected>>", lambda e: self._aplicar_nivel())
+        tk.Label(barra, text="Registrar a partir de", fg='white', bg='#1E1E1E').pack(side="right", padx=(10, 4))
+        self.filtros["ativo"].trace_add(
+            "write", lambda *a: self.filtros["registrar"].set(self.nivel_de(self._ativo_filtro()))
+        )
+
+    def _ativo_filtro(self):
+        ativo = self.filtros["ativo"].get()
+        return None if ativo == TODOS else ativo
+
+    def _aplicar_nivel(self):
+        self.definir_nivel(self.filtros["registrar"].get(), self._ativo_filtro())
+
+    def consultar(self, ativo=None, nivel=None, evento=None, periodo=None, contem=None):
+        """Ids estáveis das entradas indexadas que atendem aos filtros"""
+        desde = time.time() - periodo if periodo else None
+        return self.indice.consultar(ativo, nivel, evento, desde, contem) + self.indice.inicio
+
+    def aplicar_filtro(self, manter_posicao=False):
+        if self.lista_filtro is None:
+            return
+        valores = {campo: self.filtros[campo].get() for campo in ("ativo", "nivel", "evento", "periodo", "texto")}
+        ids = self.consultar(
+            ativo=None if valores["ativo"] == TODOS else valores["ativo"],
+            nivel=None if valores["nivel"] == TODOS else valores["nivel"],
+            evento=None if valores["evento"] == TODOS else valores["evento"],
+            periodo=PERIODOS_FILTRO.get(valores["periodo"]),
+            contem=valores["texto"].strip() or None,
+        )
+        self.lista_filtro.definir(ids, manter_posicao)
+        if not manter_posicao:
+            self.notebook.select(self.aba_filtro)
+
+    def limpar_filtro(self):
+        for campo in ("ativo", "nivel", "evento"):
+            self.filtros[campo].set(TODOS)
+        self.filtros["periodo"].set("Tudo")
+        self.filtros["texto"].set("")
+        self.aplicar_filtro()
+
+    def definir_nivel(self, nivel, ativo=None):
+        """Nível mínimo de um ativo (ou o padrão de todos, com ativo=None)"""
+        if ativo is None:
+            self.limiar_padrao = NIVEIS[nivel]
+            self.limiares.clear()
+        else:
+            self.limiares[ativo] = NIVEIS[nivel]
+
+    def nivel_de(self, ativo):
+        limiar = self.limiares.get(ativo, self.limiar_padrao)
+        return next(nome for nome, valor in NIVEIS.items() if valor == limiar)
+
+    def habilitado(self, ativo, nivel):
+        """True se uma mensagem desse nível seria registrada para o ativo"""
+        return NIVEIS[nivel] >= self.limiares.get(ativo, self.limiar_padrao)
+
+    def logar(self, ativo, mensagem, *args, nivel="INFO", evento="log", **campos):
+        """Log message for specific asset (thread-safe; shown on the next drain).
+
+        `args` são aplicados com `mensagem % args` só se o nível estiver habilitado.
+        """
+        if NIVEIS[nivel] < self.limiares.get(ativo, self.limiar_padrao):
+            return
+        if args:
+            mensagem = mensagem % args
         if ativo not in self.logs:
-            self.logs[ativo] = []
-
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        log_entry = f"[{timestamp}] {mensagem}\n"
-        
-        # Add to asset specific log
-        if ativo in self.interfaces:
-            self.interfaces[ativo].insert("end", log_entry)
-            self.interfaces[ativo].see("end")
-            self.logs[ativo].append(log_entry)
-
-        # Add to combined view with asset identifier
-        if 'combined' in self.interfaces:
-            combined_entry = f"[{timestamp}] [{ativo}] {mensagem}\n"
-            self.interfaces['combined'].insert("end", combined_entry)
-            self.interfaces['combined'].see("end")
+            self.logs.setdefault(ativo, BufferLog(self.max_linhas, self.max_bytes))
+
+        instante = time.time()
+        if self.sink is not None:
+            self.sink.registrar(ativo, mensagem, nivel, evento, instante, **campos)
+        if self.interfaces:
+            self.pendentes.append((instante, ativo, mensagem, nivel, evento))
+
+    def _timestamp(self, instante):
+        segundo = int(instante)
+        if segundo != self._ultimo_segundo:
+            self._ultimo_segundo = segundo
+            self._ultimo_timestamp = time.strftime("%H:%M:%S", time.localtime(segundo))
+        return self._ultimo_timestamp
+
+    def _entrada_geral(self, instante, ativo, mensagem):
+        return f"[{self._timestamp(instante)}] [{ativo}] {mensagem}\n"
+
+    def drenar_pendentes(self):
+        """Insere as mensagens enfileiradas nos widgets (só na thread da interface)"""
+        linhas = {}
+        registros = []
+        indexados = []
+        for _ in range(min(len(self.pendentes), self.max_por_drenagem)):
+            instante, ativo, mensagem, nivel, evento = self.pendentes.popleft()
+            timestamp = self._timestamp(instante)
+
+            # Add to asset specific log
+            if ativo in self.interfaces:
+                log_entry = f"[{timestamp}] {mensagem}\n"
+                linhas.setdefault(ativo, []).append(log_entry)
+                self.logs[ativo].append(log_entry)
+
+            # Add to combined view with asset identifier
+            combined_entry = self._entrada_geral(instante, ativo, mensagem)
+            if 'combined' in self.interfaces:
+                linhas.setdefault('combined', []).append(combined_entry)
+                self.log_geral.append(combined_entry)
+            registros.append((instante, ativo, mensagem))
+            indexados.append((instante, ativo, nivel, evento, combined_entry))
+
+        for chave, entradas in linhas.items():
+            texto = "".join(entradas)
+            self.interfaces[chave].insert("end", texto)
+            self.linhas_widget[chave] = self.linhas_widget.get(chave, 0) + texto.count("\n")
+            self._aparar_widget(chave)
+            self.interfaces[chave].see("end")
+
+        if self.armazem is not None and registros:
+            rowids = self.armazem.gravar(registros)
+            indexados = [(*registro[:4], rowid) for registro, rowid in zip(indexados, rowids)]
+        self.indice.adicionar(indexados)
+        if indexados and self.lista_filtro is not None and self.notebook.select() == str(self.aba_filtro):
+            self.aplicar_filtro(manter_posicao=True)
+        return len(registros)
+
+    def _aparar_widget(self, chave):
+        """Remove de uma vez as linhas do topo que já saíram da retenção (com folga para não apagar a cada drenagem)"""
+        buffer = self.log_geral if chave == 'combined' else self.logs[chave]
+        excesso = self.linhas_widget[chave] - buffer.quebras
+        if excesso > max(100, buffer.quebras // 10):
+            self.interfaces[chave].delete("1.0", f"{excesso + 1}.0")
+            self.linhas_widget[chave] -= excesso
+
+    def historico(self, ativo=None, inicio=None, fim=None, limite=1000):
+        """Entradas gravadas no armazém (inclusive as que já saíram da memória)"""
+        if self.armazem is None:
+            buffer = self.log_geral if ativo is None else self.logs.get(ativo, ())
+            return list(buffer)[-limite:]
+        return [
+            f"[{self._timestamp(instante)}] {mensagem}\n" if ativo is not None
+            else self._entrada_geral(instante, nome, mensagem)
+            for instante, nome, mensagem in self.armazem.consultar(ativo, inicio, fim, limite)
+        ]
+
+    def _ciclo_drenagem(self):
+        try:
+            self.drenar_pendentes()
+        finally:
+            try:
+                self.agendamento = self.notebook.after(self.intervalo_ms, self._ciclo_drenagem)
+            except tk.TclError:
+                self.agendamento = None  # janela destruída
+
+    def parar_drenagem(self):
+        if self.agendamento is not None:
+            self.notebook.after_cancel(self.agendamento)
+            self.agendamento = None
+        self.drenar_pendentes()
 
     def limpar_logs(self, ativo=None):
         """Clear logs for specific asset or all assets"""
         if ativo and ativo in self.interfaces:
             self.interfaces[ativo].delete(1.0, "end")
-            self.logs[ativo] = []
+            self.logs[ativo].clear()
+            self.linhas_widget[ativo] = 0
         elif ativo is None:
             for interface in self.interfaces.values():
                 interface.delete(1.0, "end")
-            self.logs = {k: [] for k in self.logs}
+            for buffer in self.logs.values():
+                buffer.clear()
+            self.log_geral.clear()
+            self.linhas_widget = {}
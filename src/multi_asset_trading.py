@@ -1,21 +1,54 @@
-import MetaTrader5 as mt5
 import numpy as np
 import pandas as pd
 import time
 import threading
 from datetime import datetime
+from src.mt5_client import mt5
+from src import indicators as indicadores
+from src.bar_ingestion import extrair_campos, precos_validos
+from src.indicator_engine import MotorIndicadores
+from src.bar_scheduler import AgendadorBarras
+from src.market_data_hub import HubDadosMercado
+from src.signal_rules import avaliar_condicoes, distancias_sl_tp, volume_alto
+from src.market_scanner import ScannerMercado
+from src.metrics import metricas
+from src.mt5_cache import cache_mt5
+from src.order_gateway import gateway_ordens
+from src.risk_engine import motor_risco
+from src.worker_pool import PoolEstrategias
+from src.tick_stream import FluxoTicks
+
+TIMEFRAMES = {
+    "M1": mt5.TIMEFRAME_M1,
+    "M5": mt5.TIMEFRAME_M5,
+    "M15": mt5.TIMEFRAME_M15,
+    "M30": mt5.TIMEFRAME_M30,
+    "H1": mt5.TIMEFRAME_H1,
+    "H4": mt5.TIMEFRAME_H4,
+    "D1": mt5.TIMEFRAME_D1,
+}
 
 class MultiAssetTrading:
-    def __init__(self):
+    def __init__(self, armazem=None, trabalhadores=4):
         self.estrategias = {}
         self.lock = threading.Lock()
         self.operando = True
-
-    def adicionar_ativo(self, ativo, timeframe, lote, log_system):
-        """Add new asset for trading"""
+        self.armazem = armazem  # ArmazemBarras opcional para aquecer hub e scanner pelo disco
+        self.hub = HubDadosMercado(armazem=armazem)
+        self.pool = PoolEstrategias(trabalhadores)  # ciclos de todos os ativos num número fixo de threads
+        self.assincronos = set()  # ativos rodando no RuntimeAssincrono, fora do pool
+        self.em_processos = set()  # ativos cujas decisões vêm do analisar_em_processos
+
+    def adicionar_ativo(self, ativo, timeframe, lote, log_system, ticks=False):
+        """Add new asset for trading (ticks=True: barras montadas localmente a partir dos ticks)"""
         with self.lock:
             if ativo not in self.estrategias:
-                self.estrategias[ativo] = EstrategiaTrading(ativo, timeframe, lote, log_system)
+                if ticks:
+                    estrategia = EstrategiaTrading(ativo, timeframe, lote, log_system, ticks=True)
+                else:
+                    estrategia = EstrategiaTrading(ativo, timeframe, lote, log_system, hub=self.hub)
+                    self.hub.assinar(ativo, estrategia.timeframe)
+                self.estrategias[ativo] = estrategia
                 return True
             return False
 
@@ -23,35 +56,113 @@ class MultiAssetTrading:
         """Remove asset from trading"""
         with self.lock:
             if ativo in self.estrategias:
-                self.estrategias[ativo].parar()
-                del self.estrategias[ativo]
+                estrategia = self.estrategias.pop(ativo)
+                self.pool.remover(ativo)
+                self.em_processos.discard(ativo)
+                estrategia.parar()
+                if estrategia.fluxo_ticks is None:
+                    self.hub.cancelar_assinatura(ativo, estrategia.timeframe)
                 return True
             return False
 
+    def iniciar_ativo(self, ativo):
+        """Start trading for one asset (no-op if it is already running)"""
+        with self.lock:
+            estrategia = self.estrategias.get(ativo)
+            if (estrategia is None or self.pool.executando(ativo) or ativo in self.assincronos
+                    or ativo in self.em_processos):
+                return False
+            estrategia.operando = True
+            estrategia.parada.clear()
+            self.pool.adicionar(ativo, estrategia)
+            return True
+
+    def iniciar_em_processos(self, ativo):
+        """Start trading one asset through analisar_em_processos instead of the pool"""
+        with self.lock:
+            estrategia = self.estrategias.get(ativo)
+            if (estrategia is None or self.pool.ocupada(estrategia) or ativo in self.assincronos
+                    or ativo in self.em_processos):
+                return False
+            estrategia.operando = True
+            estrategia.parada.clear()
+            self.em_processos.add(ativo)
+            return True
+
+    def parar_em_processos(self, ativo):
+        with self.lock:
+            if ativo not in self.em_processos:
+                return False
+            self.em_processos.discard(ativo)
+            self.estrategias[ativo].parar()
+            return True
+
     def iniciar_todos(self):
         """Start trading for all assets"""
         self.operando = True
-        for ativo, estrategia in self.estrategias.items():
-            threading.Thread(target=estrategia.executar, daemon=True).start()
+        for ativo in list(self.estrategias):
+            self.iniciar_ativo(ativo)
 
     def parar_todos(self):
-        """Stop trading for all assets"""
+        """Stop trading for all assets (joins the pool workers; iniciar_todos starts new ones)"""
         self.operando = False
-        for estrategia in self.estrategias.values():
-            estrategia.parar()
+        with self.lock:
+            for ativo, estrategia in self.estrategias.items():
+                self.pool.remover(ativo)
+                estrategia.parar()
+            self.em_processos.clear()
+        self.pool.parar()
 
     def get_status(self, ativo):
         """Get trading status for specific asset"""
         return self.estrategias.get(ativo, None)
 
+    def escanear_mercado(self, timeframe="M5", ativos=None):
+        """Scan all visible symbols (or the given ones) and rank buy/sell candidates"""
+        scanner = ScannerMercado(TIMEFRAMES.get(timeframe, mt5.TIMEFRAME_M5), armazem=self.armazem)
+        return scanner.escanear(ativos)
+
+    def analisar_em_processos(self, analisador):
+        """One analysis pass of the assets started with iniciar_em_processos; orders are routed here.
+
+        Returns the Decisao of each asset analysed.
+        """
+        with self.lock:
+            estrategias = {ativo: self.estrategias[ativo] for ativo in self.em_processos
+                           if self.estrategias[ativo].operando}
+        barras = {ativo: estrategia.obter_barras(analisador.janela) for ativo, estrategia in estrategias.items()}
+        decisoes = analisador.analisar(barras)
+        for ativo, decisao in decisoes.items():
+            estrategias[ativo].executar_decisao(decisao)
+        return decisoes
+
 class EstrategiaTrading:
-    def __init__(self, ativo, timeframe, lote, log_system):
+    def __init__(self, ativo, timeframe, lote, log_system, intrabar=False, cadencia_intrabar=5.0, hub=None,
+                 gateway=None, risco=None, ticks=False, intervalo_ticks=1.0):
         self.ativo = ativo
         self.timeframe = self.converter_timeframe(timeframe)
         self.lote = float(lote)
         self.operando = True
+        self.parada = threading.Event()
         self.log_system = log_system
+        self.hub = hub  # HubDadosMercado compartilhado; sem ele a estratégia busca direto no terminal
         self.ticket_atual = None
+        self.tempo_ultima_decisao = None  # barra da última ordem, no ciclo próprio ou pelo AnalisadorProcessos
+        self.metricas = metricas.ativo(self.ativo)  # latência por etapa do ciclo
+        self.cache = cache_mt5  # especificações dos símbolos compartilhadas entre as estratégias
+        self.gateway = gateway or gateway_ordens  # envio das ordens fora da thread de análise
+        self.risco = risco or motor_risco  # limites da carteira (max_positions, max_daily_loss)
+
+        # Acorda no fechamento de cada barra; no modo intrabar também a cada `cadencia_intrabar` segundos
+        self.intrabar = intrabar
+        self.agendador = AgendadorBarras(timeframe, intrabar, cadencia_intrabar)
+
+        # Modo por ticks: só ticks novos a cada `intervalo_ticks` segundos, barras agregadas localmente
+        self.fluxo_ticks = None
+        if ticks:
+            self.intrabar = True
+            self.agendador = AgendadorBarras(timeframe, True, intervalo_ticks)
+            self.fluxo_ticks = FluxoTicks(self.ativo, self.timeframe, self.agendador.segundos)
 
         # Parâmetros otimizados para mais oportunidades
         self.rsi_sobrecomprado = 70  # RSI mais permissivo
@@ -62,257 +173,223 @@ class EstrategiaTrading:
         self.volume_threshold = 1.2  # Volume menos restritivo
 
         # Parâmetros de gestão de risco otimizados
-        self.max_daily_loss = 3.0  # Proteção de capital mais rigorosa
+        # (max_positions e max_daily_loss valem para a carteira e ficam no MotorRisco)
         self.min_rr_ratio = 1.2  # Permite trades com menor reward
-        self.max_positions = 3  # Limita posições por segurança
         self.trailing_stop = True
         self.breakeven_level = 0.3  # Breakeven mais rápido
 
+        # Indicadores incrementais: só a barra nova (ou em formação) é recalculada
+        self.indicadores = MotorIndicadores(
+            self.ativo,
+            self.timeframe,
+            bb_desvio=self.bb_desvio,
+            stoch_period=self.stoch_period,
+            atr_period=self.atr_period
+        )
+
     def converter_timeframe(self, tf):
-        mapping = {
-            "M1": mt5.TIMEFRAME_M1,
-            "M5": mt5.TIMEFRAME_M5,
-            "M15": mt5.TIMEFRAME_M15,
-            "M30": mt5.TIMEFRAME_M30,
-            "H1": mt5.TIMEFRAME_H1,
-            "H4": mt5.TIMEFRAME_H4,
-            "D1": mt5.TIMEFRAME_D1,
-        }
-        return mapping.get(tf, mt5.TIMEFRAME_M5)
+        return TIMEFRAMES.get(tf, mt5.TIMEFRAME_M5)
+
+    def executar_ciclo(self):
+        """Um ciclo de análise; retorna os segundos até o próximo"""
+        try:
+            with self.metricas.medir("ciclo"):
+                self.analisar_e_operar()
+            self.metricas.contar("ciclos")
+            return self.agendador.proxima_espera()
+        except Exception as e:
+            self.logar(f"❌ Erro na estratégia: {str(e)}", nivel="ERROR", evento="erro")
+            self.metricas.contar("erros")
+            return 10
 
     def executar(self):
+        """Laço numa thread própria (uso isolado; o MultiAssetTrading usa o PoolEstrategias)"""
         while self.operando:
-            try:
-                self.analisar_e_operar()
-                time.sleep(5)
-            except Exception as e:
-                self.log_system.logar(self.ativo, f"❌ Erro na estratégia: {str(e)}")
-                time.sleep(10)
+            self.parada.wait(self.executar_ciclo())
+
+    def logar(self, mensagem, *args, nivel="INFO", **campos):
+        """Registra no log do ativo; `args` só são formatados se o nível estiver habilitado"""
+        if not self.log_system.habilitado(self.ativo, nivel):
+            return
+        with self.metricas.medir("log"):
+            self.log_system.logar(self.ativo, mensagem, *args, nivel=nivel, **campos)
 
     def parar(self):
         self.operando = False
+        self.parada.set()
+
+    def obter_barras(self, quantidade):
+        """Últimas `quantidade` barras da fonte da estratégia (ticks, hub ou terminal).
+
+        Fora do modo intrabar a janela termina na última barra fechada.
+        """
+        if self.fluxo_ticks is not None:
+            return self.fluxo_ticks.obter(quantidade)
+        if self.hub is not None:
+            return self.hub.obter(self.ativo, self.timeframe, quantidade, incluir_formacao=self.intrabar)
+        posicao_inicial = 0 if self.intrabar else 1
+        return mt5.copy_rates_from_pos(self.ativo, self.timeframe, posicao_inicial, quantidade)
 
     def analisar_e_operar(self):
         try:
             if self.operando:
-                self.log_system.logar(self.ativo, "🔍 Iniciando análise de mercado...")
+                self.logar("🔍 Iniciando análise de mercado...", nivel="DEBUG")
 
-            barras = mt5.copy_rates_from_pos(self.ativo, self.timeframe, 0, 200)
+            # Fora do modo intrabar a análise roda no fechamento, sobre a última barra fechada
+            with self.metricas.medir("barras"):
+                barras = self.obter_barras(200)
             if barras is None or len(barras) < 100:
-                self.log_system.logar(self.ativo, f"❌ Erro: Não foi possível carregar velas de {self.ativo}")
+                self.logar(f"❌ Erro: Não foi possível carregar velas de {self.ativo}", nivel="ERROR", evento="erro")
                 return
 
-            df = pd.DataFrame(barras)
-            if df.isnull().any().any():
-                self.log_system.logar(self.ativo, "❌ Erro: Dados inválidos ou nulos detectados")
+            tempo_formacao = int(barras['time'][-1]) + (0 if self.intrabar else self.agendador.segundos)
+            if self.agendador.registrar_barra(tempo_formacao):
+                # Uma vez por barra: a hora do último tick tira o atraso de fase da estimativa do relógio
+                tick = mt5.symbol_info_tick(self.ativo)
+                if tick is not None:
+                    self.agendador.registrar_tempo_servidor(tick.time_msc / 1000.0)
+
+            # Colunas consumidas como views do array do terminal, sem DataFrame
+            with self.metricas.medir("ingestao"):
+                validos = precos_validos(barras)
+            if not validos:
+                self.logar("❌ Erro: Dados inválidos ou nulos detectados", nivel="ERROR", evento="erro")
                 return
 
             # Cálculos básicos
             try:
-                close = df['close'].values
-                high = df['high'].values
-                low = df['low'].values
-                volume = df['tick_volume'].values
+                tempo, high, low, close, volume = extrair_campos(barras)
 
                 if len(close) < 50:
-                    self.log_system.logar(self.ativo, "❌ Erro: Dados insuficientes para análise")
+                    self.logar("❌ Erro: Dados insuficientes para análise", nivel="ERROR", evento="erro")
                     return
 
                 # Indicadores principais
                 try:
-                    ema9 = self.ema(close, 9)
-                    ema21 = self.ema(close, 21)
-                    ema50 = self.ema(close, 50)
-
-                    macd_line, signal_line = self.macd(close)
-                    rsi_valores = self.rsi(close, 14)
-                    bb_superior, bb_medio, bb_inferior = self.bollinger_bands(close, 20, self.bb_desvio)
-                    stoch_k, stoch_d = self.stochastic(high, low, close, self.stoch_period)
-                    atr = self.atr(high, low, close, self.atr_period)
-                    momentum = self.momentum(close, 10)
+                    with self.metricas.medir("indicadores"):
+                        valores = self.indicadores.sincronizar(tempo, high, low, close)
+                        volume_alto_serie = volume_alto(volume, self.volume_threshold)
+                    ema9 = valores['ema9']
+                    ema21 = valores['ema21']
+                    ema50 = valores['ema50']
+
+                    macd_line, signal_line = valores['macd'], valores['sinal_macd']
+                    rsi_valores = valores['rsi']
+                    bb_superior, bb_medio, bb_inferior = valores['bb_superior'], valores['bb_medio'], valores['bb_inferior']
+                    stoch_k = valores['stoch_k']
+                    atr = valores['atr']
+                    momentum = valores['momentum']
 
                     # Verificar indicadores
                     if any(map(np.isnan, [ema9[-1], ema21[-1], ema50[-1], macd_line[-1], rsi_valores[-1]])):
-                        self.log_system.logar(self.ativo, "❌ Erro: Indicadores com valores inválidos")
+                        self.logar("❌ Erro: Indicadores com valores inválidos", nivel="ERROR", evento="erro")
                         return
 
                     # Volume analysis
-                    volume_ma = float(np.mean(volume[-20:]))
-                    volume_atual = float(volume[-1])
-                    volume_alto = bool(volume_atual > (volume_ma * self.volume_threshold))
+                    volume_alto_atual = bool(volume_alto_serie[-1])
 
-                    # Análise de sinais
+                    # Análise de sinais (mesmas regras usadas pelo scanner)
                     try:
-                        # Tendência com condições otimizadas
-                        tendencia_alta = bool(np.all([
-                            float(ema9[-1]) > float(ema21[-1]),  # EMA curta acima da média
-                            float(close[-1]) > float(ema21[-1]),  # Preço acima da média
-                            float(momentum[-1]) > 0,  # Momentum positivo
-                            # Novas condições de força da tendência
-                            float(close[-1]) > float(close[-2]),  # Último candle fechou em alta
-                            float(low[-1]) > float(low[-2])  # Suporte crescente
-                        ]))
-
-                        tendencia_baixa = bool(np.all([
-                            float(ema9[-1]) < float(ema21[-1]),  # EMA curta abaixo da média
-                            float(close[-1]) < float(ema21[-1]),  # Preço abaixo da média
-                            float(momentum[-1]) < 0,  # Momentum negativo
-                            # Novas condições de força da tendência
-                            float(close[-1]) < float(close[-2]),  # Último candle fechou em baixa
-                            float(high[-1]) < float(high[-2])  # Resistência decrescente
-                        ]))
-
-                        # Força da tendência (usado para logging)
-                        forca_tendencia = 0
-                        if tendencia_alta:
-                            forca_tendencia = sum([
-                                float(ema9[-1]) > float(ema9[-2]),
-                                float(ema21[-1]) > float(ema21[-2]),
-                                float(close[-1]) > float(bb_medio[-1]),
-                                float(stoch_k[-1]) > float(stoch_k[-2]),
-                                volume_alto
-                            ])
-                        elif tendencia_baixa:
-                            forca_tendencia = sum([
-                                float(ema9[-1]) < float(ema9[-2]),
-                                float(ema21[-1]) < float(ema21[-2]),
-                                float(close[-1]) < float(bb_medio[-1]),
-                                float(stoch_k[-1]) < float(stoch_k[-2]),
-                                volume_alto
-                            ])
-
-                        # RSI com confirmação de reversão
-                        rsi_compra = bool(np.all([
-                            float(rsi_valores[-1]) < self.rsi_sobrevendido,
-                            float(rsi_valores[-1]) > float(rsi_valores[-2]),
-                            float(rsi_valores[-2]) > float(rsi_valores[-3])  # Confirmação de reversão
-                        ]))
-
-                        rsi_venda = bool(np.all([
-                            float(rsi_valores[-1]) > self.rsi_sobrecomprado,
-                            float(rsi_valores[-1]) < float(rsi_valores[-2]),
-                            float(rsi_valores[-2]) < float(rsi_valores[-3])  # Confirmação de reversão
-                        ]))
-
-                        # MACD
-                        macd_compra = bool(np.all([
-                            float(macd_line[-1]) > float(signal_line[-1]),
-                            float(macd_line[-1]) > float(macd_line[-2])
-                        ]))
-
-                        macd_venda = bool(np.all([
-                            float(macd_line[-1]) < float(signal_line[-1]),
-                            float(macd_line[-1]) < float(macd_line[-2])
-                        ]))
-
-                        # Sinais finais com condições otimizadas para mais oportunidades
+                        with self.metricas.medir("sinais"):
+                            condicoes = avaliar_condicoes(
+                                close[-3:], high[-3:], low[-3:], ema9, ema21, macd_line, signal_line,
+                                rsi_valores[-3:], bb_superior, bb_medio, bb_inferior, stoch_k, momentum,
+                                volume_alto_serie[-3:], self
+                            )
+                        tendencia_alta = bool(condicoes.tendencia_alta[-1])
+                        tendencia_baixa = bool(condicoes.tendencia_baixa[-1])
+                        forca_tendencia = int(condicoes.forca_tendencia[-1])  # usado para logging e SL/TP
+                        rsi_compra = bool(condicoes.rsi_compra[-1])
+                        rsi_venda = bool(condicoes.rsi_venda[-1])
+                        macd_compra = bool(condicoes.macd_compra[-1])
+                        macd_venda = bool(condicoes.macd_venda[-1])
+
+                        # Sinais finais: condições da série + horário + risco
                         sinal_compra = bool(np.all([
-                            # Condição principal: Tendência OU (RSI + MACD)
-                            tendencia_alta or (rsi_compra and macd_compra),
-                            # Condições de confirmação (precisa atender pelo menos 2)
-                            sum([
-                                float(close[-1]) < float(bb_superior[-1]),  # Preço abaixo da banda superior
-                                float(stoch_k[-1]) < 80,  # Estocástico não sobrecomprado
-                                volume_alto,  # Volume significativo
-                                float(momentum[-1]) > 0,  # Momentum positivo
-                                float(ema9[-1]) > float(ema9[-2])  # EMA9 subindo
-                            ]) >= 2,
+                            condicoes.pre_compra[-1],
                             self.verificar_horario_favoravel(),
                             self.verificar_risco_posicao()
                         ]))
 
                         sinal_venda = bool(np.all([
-                            # Condição principal: Tendência OU (RSI + MACD)
-                            tendencia_baixa or (rsi_venda and macd_venda),
-                            # Condições de confirmação (precisa atender pelo menos 2)
-                            sum([
-                                float(close[-1]) > float(bb_inferior[-1]),  # Preço acima da banda inferior
-                                float(stoch_k[-1]) > 20,  # Estocástico não sobrevendido
-                                volume_alto,  # Volume significativo
-                                float(momentum[-1]) < 0,  # Momentum negativo
-                                float(ema9[-1]) < float(ema9[-2])  # EMA9 descendo
-                            ]) >= 2,
+                            condicoes.pre_venda[-1],
                             self.verificar_horario_favoravel(),
                             self.verificar_risco_posicao()
                         ]))
 
                         # Log detalhado das condições com força da tendência
-                        if self.operando and (tendencia_alta or tendencia_baixa):
+                        # (só monta as mensagens se o nível DEBUG estiver habilitado para o ativo)
+                        if self.operando and (tendencia_alta or tendencia_baixa) and \
+                                self.log_system.habilitado(self.ativo, "DEBUG"):
                             direcao = "ALTA 📈" if tendencia_alta else "BAIXA 📉"
                             forca = "⭐" * forca_tendencia  # Visualização da força (1 a 5 estrelas)
                             
-                            self.log_system.logar(self.ativo, f"📊 Análise Detalhada - Tendência de {direcao}")
-                            self.log_system.logar(self.ativo, f"  • Força da Tendência: {forca} ({forca_tendencia}/5)")
-                            self.log_system.logar(self.ativo, f"  • RSI: {rsi_valores[-1]:.2f} {'🔴' if rsi_valores[-1] > 70 else '🟢' if rsi_valores[-1] < 30 else '⚪'}")
-                            self.log_system.logar(self.ativo, f"  • Estocástico K: {stoch_k[-1]:.2f} {'🔴' if stoch_k[-1] > 80 else '🟢' if stoch_k[-1] < 20 else '⚪'}")
-                            self.log_system.logar(self.ativo, f"  • Momentum: {momentum[-1]:.2f} {'📈' if momentum[-1] > 0 else '📉'}")
-                            self.log_system.logar(self.ativo, f"  • Volume: {'Alto ✅' if volume_alto else 'Normal ⚠️'}")
-                            self.log_system.logar(self.ativo, f"  • MACD: {'Positivo ✅' if macd_line[-1] > signal_line[-1] else 'Negativo ❌'}")
+                            self.logar("📊 Análise Detalhada - Tendência de %s", direcao, nivel="DEBUG")
+                            self.logar("  • Força da Tendência: %s (%d/5)", forca, forca_tendencia, nivel="DEBUG")
+                            self.logar("  • RSI: %.2f %s", rsi_valores[-1], '🔴' if rsi_valores[-1] > 70 else '🟢' if rsi_valores[-1] < 30 else '⚪', nivel="DEBUG")
+                            self.logar("  • Estocástico K: %.2f %s", stoch_k[-1], '🔴' if stoch_k[-1] > 80 else '🟢' if stoch_k[-1] < 20 else '⚪', nivel="DEBUG")
+                            self.logar("  • Momentum: %.2f %s", momentum[-1], '📈' if momentum[-1] > 0 else '📉', nivel="DEBUG")
+                            self.logar("  • Volume: %s", 'Alto ✅' if volume_alto_atual else 'Normal ⚠️', nivel="DEBUG")
+                            self.logar("  • MACD: %s", 'Positivo ✅' if macd_line[-1] > signal_line[-1] else 'Negativo ❌', nivel="DEBUG")
                             
                             # Adiciona informações sobre possíveis sinais
                             if tendencia_alta and rsi_compra:
-                                self.log_system.logar(self.ativo, "  • Possível oportunidade de COMPRA se confirmada ⏳")
+                                self.logar("  • Possível oportunidade de COMPRA se confirmada ⏳", nivel="DEBUG")
                             elif tendencia_baixa and rsi_venda:
-                                self.log_system.logar(self.ativo, "  • Possível oportunidade de VENDA se confirmada ⏳")
+                                self.logar("  • Possível oportunidade de VENDA se confirmada ⏳", nivel="DEBUG")
 
                         # Logs de sinais
                         if tendencia_alta and self.operando:
-                            self.log_system.logar(self.ativo, "📈 Tendência de ALTA detectada - Aguardando confirmação")
+                            self.logar("📈 Tendência de ALTA detectada - Aguardando confirmação")
                             if macd_compra or rsi_compra:
-                                self.log_system.logar(self.ativo, "🎯 Confirmação técnica positiva")
+                                self.logar("🎯 Confirmação técnica positiva")
 
                         if tendencia_baixa and self.operando:
-                            self.log_system.logar(self.ativo, "📉 Tendência de BAIXA detectada - Aguardando confirmação")
+                            self.logar("📉 Tendência de BAIXA detectada - Aguardando confirmação")
                             if macd_venda or rsi_venda:
-                                self.log_system.logar(self.ativo, "🎯 Confirmação técnica negativa")
+                                self.logar("🎯 Confirmação técnica negativa")
 
-                        # Execução otimizada com base na força da tendência
+                        # Execução otimizada com base na força da tendência (uma ordem por barra)
+                        if (sinal_compra or sinal_venda) and not self._marcar_barra_da_ordem(int(tempo[-1])):
+                            sinal_compra = sinal_venda = False
                         if sinal_compra:
-                            self.log_system.logar(self.ativo, "✅ SINAL DE COMPRA CONFIRMADO")
+                            self.logar("✅ SINAL DE COMPRA CONFIRMADO", nivel="TRADE", evento="sinal")
                             # Ajusta SL e TP baseado na força da tendência
-                            sl_multiplier = max(1.0, min(1.5, 1 + (forca_tendencia * 0.1)))  # 1.0 a 1.5
-                            tp_multiplier = max(1.2, min(2.0, 1.2 + (forca_tendencia * 0.2)))  # 1.2 a 2.0
+                            sl_distance, tp_distance = map(float, distancias_sl_tp(atr[-1], forca_tendencia, self))
                             
-                            sl_distance = atr[-1] * sl_multiplier
-                            tp_distance = atr[-1] * self.min_rr_ratio * tp_multiplier
-                            
-                            self.log_system.logar(self.ativo, f"📊 Parâmetros de Entrada:")
-                            self.log_system.logar(self.ativo, f"  • Força da Tendência: {'⭐' * forca_tendencia} ({forca_tendencia}/5)")
-                            self.log_system.logar(self.ativo, f"  • Stop Loss: {sl_distance:.2f} pontos")
-                            self.log_system.logar(self.ativo, f"  • Take Profit: {tp_distance:.2f} pontos")
+                            self.logar("📊 Parâmetros de Entrada:", nivel="TRADE")
+                            self.logar("  • Força da Tendência: %s (%d/5)", '⭐' * forca_tendencia, forca_tendencia, nivel="TRADE")
+                            self.logar("  • Stop Loss: %.2f pontos", sl_distance, nivel="TRADE")
+                            self.logar("  • Take Profit: %.2f pontos", tp_distance, nivel="TRADE")
                             
                             self.abrir_ordem(mt5.ORDER_TYPE_BUY, sl_distance, tp_distance)
 
                         elif sinal_venda:
-                            self.log_system.logar(self.ativo, "✅ SINAL DE VENDA CONFIRMADO")
+                            self.logar("✅ SINAL DE VENDA CONFIRMADO", nivel="TRADE", evento="sinal")
                             # Ajusta SL e TP baseado na força da tendência
-                            sl_multiplier = max(1.0, min(1.5, 1 + (forca_tendencia * 0.1)))  # 1.0 a 1.5
-                            tp_multiplier = max(1.2, min(2.0, 1.2 + (forca_tendencia * 0.2)))  # 1.2 a 2.0
-                            
-                            sl_distance = atr[-1] * sl_multiplier
-                            tp_distance = atr[-1] * self.min_rr_ratio * tp_multiplier
+                            sl_distance, tp_distance = map(float, distancias_sl_tp(atr[-1], forca_tendencia, self))
                             
-                            self.log_system.logar(self.ativo, f"📊 Parâmetros de Entrada:")
-                            self.log_system.logar(self.ativo, f"  • Força da Tendência: {'⭐' * forca_tendencia} ({forca_tendencia}/5)")
-                            self.log_system.logar(self.ativo, f"  • Stop Loss: {sl_distance:.2f} pontos")
-                            self.log_system.logar(self.ativo, f"  • Take Profit: {tp_distance:.2f} pontos")
+                            self.logar("📊 Parâmetros de Entrada:", nivel="TRADE")
+                            self.logar("  • Força da Tendência: %s (%d/5)", '⭐' * forca_tendencia, forca_tendencia, nivel="TRADE")
+                            self.logar("  • Stop Loss: %.2f pontos", sl_distance, nivel="TRADE")
+                            self.logar("  • Take Profit: %.2f pontos", tp_distance, nivel="TRADE")
                             
                             self.abrir_ordem(mt5.ORDER_TYPE_SELL, sl_distance, tp_distance)
 
                     except Exception as e:
-                        self.log_system.logar(self.ativo, f"❌ Erro no cálculo de sinais: {str(e)}")
+                        self.logar(f"❌ Erro no cálculo de sinais: {str(e)}", nivel="ERROR", evento="erro")
                         return
 
                 except Exception as e:
-                    self.log_system.logar(self.ativo, f"❌ Erro no cálculo de indicadores: {str(e)}")
+                    self.logar(f"❌ Erro no cálculo de indicadores: {str(e)}", nivel="ERROR", evento="erro")
                     return
 
             except Exception as e:
-                self.log_system.logar(self.ativo, f"❌ Erro nos cálculos básicos: {str(e)}")
+                self.logar(f"❌ Erro nos cálculos básicos: {str(e)}", nivel="ERROR", evento="erro")
                 return
 
         except Exception as e:
-            self.log_system.logar(self.ativo, f"❌ Erro na análise: {str(e)}")
+            self.logar(f"❌ Erro na análise: {str(e)}", nivel="ERROR", evento="erro")
             return
 
     def verificar_horario_favoravel(self):
@@ -325,123 +402,151 @@ class EstrategiaTrading:
         return False
 
     def verificar_risco_posicao(self):
-        """Verifica se a posição atende aos critérios de risco"""
-        posicoes = mt5.positions_total()
-        if posicoes >= self.max_positions:
-            if self.operando:
-                self.log_system.logar(self.ativo, "⚠️ Máximo de posições atingido")
-            return False
-
-        saldo_inicial = mt5.account_info().balance
-        saldo_atual = mt5.account_info().equity
-        drawdown = (saldo_inicial - saldo_atual) / saldo_inicial * 100
-
-        if drawdown > self.max_daily_loss:
-            if self.operando:
-                self.log_system.logar(self.ativo, f"⚠️ Máximo drawdown diário atingido: {drawdown:.2f}%")
+        """Verifica se a carteira comporta uma nova posição (a vaga só é reservada em abrir_ordem)"""
+        with self.metricas.medir("risco"):
+            permitido, motivo = self.risco.verificar()
+            if not permitido and self.operando:
+                self._logar_bloqueio(motivo)
+            return permitido
+
+    def _logar_bloqueio(self, motivo):
+        if motivo == "max_positions":
+            self.logar("⚠️ Máximo de posições atingido")
+        else:
+            self.logar("⚠️ Máximo drawdown diário atingido: %.2f%%", self.risco.resumo()["perda_diaria_pct"])
+
+    def executar_decisao(self, decisao):
+        """Envia a ordem de uma Decisao calculada fora da estratégia (AnalisadorProcessos).
+
+        Cada barra gera no máximo uma ordem: decisões sobre uma barra que não é
+        mais nova que a da última ordem são ignoradas.
+        """
+        if not self.operando or decisao.sinal == 0:
+            return None
+        if not self.verificar_horario_favoravel() or not self.verificar_risco_posicao():
+            return None
+        if not self._marcar_barra_da_ordem(decisao.tempo):
+            return None
+        tipo_ordem = mt5.ORDER_TYPE_BUY if decisao.sinal > 0 else mt5.ORDER_TYPE_SELL
+        self.logar("✅ SINAL DE %s CONFIRMADO", "COMPRA" if decisao.sinal > 0 else "VENDA",
+                   nivel="TRADE", evento="sinal", forca=decisao.forca_tendencia)
+        self.logar("  • Stop Loss: %.2f pontos", decisao.sl_distance, nivel="TRADE")
+        self.logar("  • Take Profit: %.2f pontos", decisao.tp_distance, nivel="TRADE")
+        return self.abrir_ordem(tipo_ordem, decisao.sl_distance, decisao.tp_distance)
+
+    def _marcar_barra_da_ordem(self, tempo):
+        """Registra a barra da próxima ordem; False se já houve ordem nela ou numa mais nova"""
+        if self.tempo_ultima_decisao is not None and tempo <= self.tempo_ultima_decisao:
             return False
-
+        self.tempo_ultima_decisao = tempo
         return True
 
     def abrir_ordem(self, tipo_ordem, sl_distance, tp_distance):
+        """Entrega a ordem ao gateway e retorna o Future (o resultado é tratado em _ordem_concluida)"""
         tick = mt5.symbol_info_tick(self.ativo)
         if tick is None:
             if self.operando:
-                self.log_system.logar(self.ativo, "❌ Erro ao obter cotação atual")
+                self.logar("❌ Erro ao obter cotação atual", nivel="ERROR", evento="erro")
             return
 
-        preco = tick.ask if tipo_ordem == mt5.ORDER_TYPE_BUY else tick.bid
-        point = mt5.symbol_info(self.ativo).point
-
-        sl = preco - sl_distance * point if tipo_ordem == mt5.ORDER_TYPE_BUY else preco + sl_distance * point
-        tp = preco + tp_distance * point if tipo_ordem == mt5.ORDER_TYPE_BUY else preco - tp_distance * point
-
-        request = {
-            "action": mt5.TRADE_ACTION_DEAL,
-            "symbol": self.ativo,
-            "volume": self.lote,
-            "type": tipo_ordem,
-            "price": preco,
-            "sl": sl,
-            "tp": tp,
-            "deviation": 10,
-            "magic": 123456,
-            "comment": "Future MT5 Robo v2",
-            "type_time": mt5.ORDER_TIME_GTC,
-            "type_filling": mt5.ORDER_FILLING_IOC,
-        }
-
-        resultado = mt5.order_send(request)
-
-        if resultado.retcode != mt5.TRADE_RETCODE_DONE:
+        especificacao = self.cache.simbolo(self.ativo)
+        if especificacao is None:
             if self.operando:
-                self.log_system.logar(self.ativo, f"❌ Erro ao enviar ordem: {resultado.comment}")
+                self.logar("❌ Erro ao obter informações do símbolo", nivel="ERROR", evento="erro")
+            return
+
+        # Vaga na carteira reservada antes do envio; devolvida se a ordem não for executada
+        reserva = self.risco.reservar(self.ativo)
+        if reserva is None:
+            if self.operando:
+                self._logar_bloqueio(self.risco.verificar()[1])
+            return
+
+        try:
+            preco = tick.ask if tipo_ordem == mt5.ORDER_TYPE_BUY else tick.bid
+            point = especificacao.point
+
+            sl = preco - sl_distance * point if tipo_ordem == mt5.ORDER_TYPE_BUY else preco + sl_distance * point
+            tp = preco + tp_distance * point if tipo_ordem == mt5.ORDER_TYPE_BUY else preco - tp_distance * point
+
+            request = {
+                "action": mt5.TRADE_ACTION_DEAL,
+                "symbol": self.ativo,
+                "volume": self.lote,
+                "type": tipo_ordem,
+                "price": preco,
+                "sl": sl,
+                "tp": tp,
+                "deviation": 10,
+                "magic": 123456,
+                "comment": "Future MT5 Robo v2",
+                "type_time": mt5.ORDER_TIME_GTC,
+                "type_filling": mt5.ORDER_FILLING_IOC,
+            }
+
+            enviado_em = time.perf_counter_ns()
+            futuro = self.gateway.enviar(request)
+        except Exception:
+            self.risco.liberar(reserva)  # a vaga não fica presa até expirar
+            raise
+        futuro.add_done_callback(lambda f: self._ordem_concluida(f, tipo_ordem, enviado_em, reserva))
+        return futuro
+
+    def _ordem_concluida(self, futuro, tipo_ordem, enviado_em, reserva):
+        """Callback do gateway (roda na thread dele) com o resultado final da ordem"""
+        self.metricas.registrar("order_send", time.perf_counter_ns() - enviado_em)
+        try:
+            envio = futuro.result()
+        except Exception as e:
+            self.risco.liberar(reserva)
+            self.metricas.contar("ordens_rejeitadas")
+            self.logar("❌ Erro ao enviar ordem: %s", e, nivel="ERROR", evento="ordem_rejeitada", tipo=tipo_ordem)
+            return
+
+        request = envio.request
+        preco, sl, tp = request["price"], request["sl"], request["tp"]
+        if not envio.executada:
+            self.risco.liberar(reserva)
+            self.metricas.contar("ordens_rejeitadas")
+            if self.operando:
+                self.logar("❌ Erro ao enviar ordem: %s", envio.comentario, nivel="ERROR", evento="ordem_rejeitada",
+                           retcode=envio.retcode, tentativas=envio.tentativas, tipo=tipo_ordem,
+                           preco=preco, sl=sl, tp=tp)
         else:
+            resultado = envio.resultado
+            preco = resultado.price or preco
             self.ticket_atual = resultado.order
+            self.risco.confirmar(reserva, self.ticket_atual)
+            self.metricas.contar("ordens_executadas")
             direcao = "COMPRA" if tipo_ordem == mt5.ORDER_TYPE_BUY else "VENDA"
             if self.operando:
-                self.log_system.logar(self.ativo, f"✅ ORDEM DE {direcao} CONFIRMADA E EXECUTADA!")
-                self.log_system.logar(self.ativo, f"📊 Detalhes da Ordem:")
-                self.log_system.logar(self.ativo, f"  • Ticket: {self.ticket_atual}")
-                self.log_system.logar(self.ativo, f"  • Preço: {preco:.5f}")
-                self.log_system.logar(self.ativo, f"  • Stop Loss: {sl:.5f}")
-                self.log_system.logar(self.ativo, f"  • Take Profit: {tp:.5f}")
-
-    # Technical indicator methods remain the same as they are calculation utilities
+                self.logar("✅ ORDEM DE %s CONFIRMADA E EXECUTADA!", direcao, nivel="TRADE", evento="ordem_executada",
+                           ticket=self.ticket_atual, direcao=direcao, volume=self.lote, preco=preco, sl=sl, tp=tp,
+                           tentativas=envio.tentativas)
+                self.logar("📊 Detalhes da Ordem:", nivel="TRADE")
+                self.logar("  • Ticket: %s", self.ticket_atual, nivel="TRADE")
+                self.logar("  • Preço: %.5f", preco, nivel="TRADE")
+                self.logar("  • Stop Loss: %.5f", sl, nivel="TRADE")
+                self.logar("  • Take Profit: %.5f", tp, nivel="TRADE")
+
+    # Versões em lote dos indicadores (referência do MotorIndicadores), em NumPy puro
     def ema(self, data, period):
-        return pd.Series(data).ewm(span=period, adjust=False).mean().values
+        return indicadores.ema(data, period)
 
     def macd(self, data, short_period=12, long_period=26, signal_period=9):
-        ema_short = self.ema(data, short_period)
-        ema_long = self.ema(data, long_period)
-        macd_line = ema_short - ema_long
-        signal_line = self.ema(macd_line, signal_period)
-        return macd_line, signal_line
+        return indicadores.macd(data, short_period, long_period, signal_period)
 
     def rsi(self, data, period=14):
-        delta = np.diff(data)
-        gain = np.where(delta > 0, delta, 0)
-        loss = np.where(delta < 0, -delta, 0)
-
-        avg_gain = np.convolve(gain, np.ones(period) / period, mode='valid')
-        avg_loss = np.convolve(loss, np.ones(period) / period, mode='valid')
-
-        rs = avg_gain / np.where(avg_loss == 0, 0.000001, avg_loss)
-        rsi = 100 - (100 / (1 + rs))
-
-        return np.concatenate([np.full(period - 1, 50), rsi])
+        return indicadores.rsi(data, period)
 
     def bollinger_bands(self, data, period=20, num_std=2):
-        sma = pd.Series(data).rolling(window=period).mean()
-        std = pd.Series(data).rolling(window=period).std()
-        upper = sma + (std * num_std)
-        lower = sma - (std * num_std)
-        return upper.values, sma.values, lower.values
+        return indicadores.bollinger_bands(data, period, num_std)
 
     def stochastic(self, high, low, close, period=14, k_smooth=3, d_smooth=3):
-        low_min = pd.Series(low).rolling(window=period).min()
-        high_max = pd.Series(high).rolling(window=period).max()
-        k = 100 * ((pd.Series(close) - low_min) / (high_max - low_min))
-        k = k.rolling(window=k_smooth).mean()
-        d = k.rolling(window=d_smooth).mean()
-        return k.values, d.values
+        return indicadores.stochastic(high, low, close, period, k_smooth, d_smooth)
 
     def atr(self, high, low, close, period=14):
-        high = pd.Series(high)
-        low = pd.Series(low)
-        close = pd.Series(close)
-
-        tr1 = high - low
-        tr2 = abs(high - close.shift())
-        tr3 = abs(low - close.shift())
-
-        tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-        atr = tr.rolling(window=period).mean()
-
-        return atr.values
+        return indicadores.atr(high, low, close, period)
 
     def momentum(self, data, period=10):
-        momentum = np.zeros_like(data)
-        momentum[period:] = data[period:] - data[:-period]
-        momentum[:period] = momentum[period]
-        return momentum
+        return indicadores.momentum(data, period)
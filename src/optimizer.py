@@ -0,0 +1,155 @@
+"""Otimização dos parâmetros da EstrategiaTrading sobre o backtest vetorizado.
+
+As barras ficam num único bloco de memória compartilhada (ou num arquivo
+mapeado em memória); cada processo do pool só recebe o nome do bloco no
+início e monta uma view sem cópia, então as tarefas carregam apenas o
+dicionário de parâmetros. Os resultados são gravados no CSV à medida que
+chegam, na ordem em que os processos terminam.
+
+No Windows o pool usa spawn: chame o otimizador dentro de
+`if __name__ == "__main__":`.
+"""
+import csv
+import itertools
+import os
+import random
+from multiprocessing import Pool
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+import pandas as pd
+
+from src.backtest import MotorBacktest
+from src.bar_ingestion import DTYPE_BARRAS
+from src.signal_rules import ParametrosEstrategia
+
+# Parâmetros que o __init__ da EstrategiaTrading fixa "otimizados"
+ESPACO_PADRAO = {
+    "rsi_sobrecomprado": [65, 70, 75, 80],
+    "rsi_sobrevendido": [20, 25, 30, 35],
+    "bb_desvio": [1.5, 1.8, 2.0, 2.5],
+    "atr_period": [7, 10, 14, 20],
+    "stoch_period": [7, 10, 14],
+    "volume_threshold": [1.0, 1.2, 1.5, 2.0],
+    "min_rr_ratio": [1.0, 1.2, 1.5, 2.0],
+    "breakeven_level": [0.3],
+}
+
+METRICAS = ["trades", "lucro", "taxa_acerto", "fator_lucro", "max_drawdown"]
+
+# Estado de cada processo do pool, preenchido pelo _iniciar_processo
+_barras_processo = None
+_memoria_processo = None
+_opcoes_processo = None
+
+
+def _iniciar_processo(origem, tamanho, opcoes):
+    global _barras_processo, _memoria_processo, _opcoes_processo
+    tipo, nome = origem
+    if tipo == "shm":
+        _memoria_processo = SharedMemory(name=nome)
+        _barras_processo = np.ndarray((tamanho,), dtype=DTYPE_BARRAS, buffer=_memoria_processo.buf)
+    else:
+        _barras_processo = np.memmap(nome, dtype=DTYPE_BARRAS, mode="r", shape=(tamanho,))
+    _opcoes_processo = opcoes
+
+
+def metricas(resultado):
+    """Resumo de um ResultadoBacktest usado para ranquear as combinações"""
+    ganhos = resultado.trades["resultado"].to_numpy()
+    equity = resultado.equity.to_numpy()
+    lucro_bruto = ganhos[ganhos > 0].sum()
+    perda_bruta = -ganhos[ganhos < 0].sum()
+    return {
+        "trades": len(ganhos),
+        "lucro": float(ganhos.sum()),
+        "taxa_acerto": float((ganhos > 0).mean()) if len(ganhos) else 0.0,
+        "fator_lucro": float(lucro_bruto / perda_bruta) if perda_bruta > 0 else float("inf") if lucro_bruto else 0.0,
+        "max_drawdown": float((np.maximum.accumulate(equity) - equity).max()) if len(equity) else 0.0,
+    }
+
+
+def _avaliar(combinacao):
+    try:
+        motor = MotorBacktest(ParametrosEstrategia(**combinacao), **_opcoes_processo)
+        linha = metricas(motor.executar(_barras_processo))
+        linha["erro"] = ""
+    except Exception as e:
+        linha = dict.fromkeys(METRICAS, float("nan"))
+        linha["erro"] = str(e)
+    linha.update(combinacao)
+    return linha
+
+
+def gerar_grade(espaco):
+    """Todas as combinações do produto cartesiano do espaço"""
+    nomes = list(espaco)
+    for valores in itertools.product(*(espaco[nome] for nome in nomes)):
+        yield dict(zip(nomes, valores))
+
+
+def gerar_aleatorias(espaco, amostras, seed=None):
+    """Amostras aleatórias do espaço; uma tupla (min, max) é sorteada uniformemente no intervalo"""
+    rng = random.Random(seed)
+    for _ in range(amostras):
+        combinacao = {}
+        for nome, valores in espaco.items():
+            if isinstance(valores, tuple):
+                inicio, fim = valores
+                if isinstance(inicio, int) and isinstance(fim, int):
+                    combinacao[nome] = rng.randint(inicio, fim)
+                else:
+                    combinacao[nome] = rng.uniform(inicio, fim)
+            else:
+                combinacao[nome] = rng.choice(valores)
+        yield combinacao
+
+
+class OtimizadorParametros:
+    """Varredura de parâmetros em paralelo com resultados gravados em CSV"""
+
+    def __init__(self, barras, arquivo_resultados, processos=None, **opcoes_backtest):
+        if not (isinstance(barras, np.memmap) and barras.dtype == DTYPE_BARRAS):
+            barras = np.ascontiguousarray(barras, dtype=DTYPE_BARRAS)
+        self.barras = barras
+        self.arquivo_resultados = arquivo_resultados
+        self.processos = processos or os.cpu_count() or 1
+        self.opcoes_backtest = opcoes_backtest
+
+    def grade(self, espaco=None, metrica="lucro"):
+        return self.executar(gerar_grade(espaco or ESPACO_PADRAO), metrica)
+
+    def aleatoria(self, amostras, espaco=None, seed=None, metrica="lucro"):
+        return self.executar(gerar_aleatorias(espaco or ESPACO_PADRAO, amostras, seed), metrica)
+
+    def _origem(self):
+        """Arquivo do memmap se as barras já estão mapeadas, senão copia uma vez para memória compartilhada"""
+        if isinstance(self.barras, np.memmap) and self.barras.filename and self.barras.offset == 0:
+            return ("arquivo", self.barras.filename), None
+        memoria = SharedMemory(create=True, size=max(1, self.barras.nbytes))
+        np.ndarray(self.barras.shape, dtype=DTYPE_BARRAS, buffer=memoria.buf)[:] = self.barras
+        return ("shm", memoria.name), memoria
+
+    def executar(self, combinacoes, metrica="lucro", chunksize=4):
+        """Avalia as combinações e devolve o CSV gravado como DataFrame, ordenado por `metrica`"""
+        origem, memoria = self._origem()
+        campos = None
+        try:
+            with open(self.arquivo_resultados, "w", newline="", encoding="utf-8") as arquivo, \
+                    Pool(self.processos, _iniciar_processo, (origem, len(self.barras), self.opcoes_backtest)) as pool:
+                escritor = None
+                for linha in pool.imap_unordered(_avaliar, combinacoes, chunksize):
+                    if escritor is None:
+                        campos = list(linha)
+                        escritor = csv.DictWriter(arquivo, fieldnames=campos)
+                        escritor.writeheader()
+                    escritor.writerow(linha)
+                    arquivo.flush()
+        finally:
+            if memoria is not None:
+                memoria.close()
+                memoria.unlink()
+
+        if campos is None:
+            return pd.DataFrame(columns=METRICAS)
+        return pd.read_csv(self.arquivo_resultados).sort_values(metrica, ascending=False, ignore_index=True)
@@ -0,0 +1,155 @@
+"""Gateway único de envio de ordens.
+
+As estratégias não chamam mais `order_send` na própria thread: entregam o
+pedido ao gateway e recebem um Future. Uma thread do gateway consome uma
+fila com prioridade (fechamentos antes de aberturas; na mesma prioridade, a
+ordem de chegada), atualiza o preço pela cotação do momento logo antes de
+cada envio (deslocando SL/TP junto nas aberturas) e repete o envio em
+REQUOTE/PRICE_CHANGED/PRICE_OFF, desde que o preço novo continue dentro do
+`deviation` do pedido em relação ao preço original. Sem resposta do
+terminal o pedido não é repetido: a ordem pode ter sido executada, e um
+reenvio abriria a posição duas vezes. Um limite global de envios por
+segundo vale para todas as estratégias.
+
+O Future sempre resolve para um ResultadoEnvio; `resultado` é o retorno do
+order_send (None se o terminal não respondeu, caso em que o resultado é
+incerto e `executada` é falso) e `request` o último pedido enviado.
+"""
+import itertools
+import queue
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import Future
+
+from src.metrics import metricas
+from src.mt5_cache import cache_mt5
+from src.mt5_client import mt5
+
+PRIORIDADE_FECHAMENTO = 0
+PRIORIDADE_ABERTURA = 10
+
+# Retcodes que valem uma nova tentativa com preço atualizado
+RETCODES_REPETIR = frozenset({
+    getattr(mt5, "TRADE_RETCODE_REQUOTE", 10004),
+    getattr(mt5, "TRADE_RETCODE_PRICE_CHANGED", 10020),
+    getattr(mt5, "TRADE_RETCODE_PRICE_OFF", 10021),
+})
+RETCODES_EXECUTADA = frozenset({
+    getattr(mt5, "TRADE_RETCODE_DONE", 10009),
+    getattr(mt5, "TRADE_RETCODE_DONE_PARTIAL", 10010),
+})
+
+
+class ResultadoEnvio(namedtuple("ResultadoEnvio", "resultado request tentativas retcode comentario")):
+    __slots__ = ()
+
+    @property
+    def executada(self):
+        return self.retcode in RETCODES_EXECUTADA
+
+
+class GatewayOrdens:
+    def __init__(self, max_por_segundo=5.0, max_tentativas=3, cache=None):
+        self.max_por_segundo = max_por_segundo
+        self.max_tentativas = max_tentativas
+        self.cache = cache or cache_mt5
+        self.fila = queue.PriorityQueue()
+        self.sequencia = itertools.count()
+        self.lock = threading.Lock()
+        self.thread = None
+        self.fichas = max_por_segundo
+        self.ultima_reposicao = time.monotonic()
+        self.metricas = metricas.ativo("gateway")
+
+    def enviar(self, request, prioridade=PRIORIDADE_ABERTURA):
+        """Enfileira o pedido (dict do order_send) e retorna um Future[ResultadoEnvio]"""
+        futuro = Future()
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._executar, daemon=True, name="gateway-ordens")
+                self.thread.start()
+        self.fila.put((prioridade, next(self.sequencia), (futuro, dict(request))))
+        return futuro
+
+    def pendentes(self):
+        return self.fila.qsize()
+
+    def _executar(self):
+        while True:
+            _, _, pedido = self.fila.get()
+            if pedido is None:
+                break
+            futuro, request = pedido
+            if not futuro.set_running_or_notify_cancel():
+                continue
+            try:
+                futuro.set_result(self._processar(request))
+            except Exception as e:
+                futuro.set_exception(e)
+
+    def _aguardar_vez(self):
+        """Limite global de envios (balde de fichas com `max_por_segundo` de capacidade)"""
+        agora = time.monotonic()
+        self.fichas = min(self.max_por_segundo,
+                          self.fichas + (agora - self.ultima_reposicao) * self.max_por_segundo)
+        self.ultima_reposicao = agora
+        if self.fichas < 1:
+            time.sleep((1 - self.fichas) / self.max_por_segundo)
+            self.fichas = 1.0
+            self.ultima_reposicao = time.monotonic()
+        self.fichas -= 1
+
+    def _atualizar_preco(self, request):
+        tick = mt5.symbol_info_tick(request["symbol"])
+        if tick is None:
+            return
+        novo = tick.ask if request["type"] == mt5.ORDER_TYPE_BUY else tick.bid
+        anterior = request.get("price")
+        request["price"] = novo
+        if anterior and not request.get("position"):
+            # Abertura: SL/TP mantêm a distância do preço de entrada
+            for campo in ("sl", "tp"):
+                if request.get(campo):
+                    request[campo] += novo - anterior
+
+    def _processar(self, request):
+        original = request.get("price")
+        especificacao = self.cache.simbolo(request["symbol"])
+        limite = request.get("deviation", 0) * (especificacao.point if especificacao else 0.0)
+        resultado, retcode, comentario = None, None, ""
+
+        for tentativa in range(1, self.max_tentativas + 1):
+            self._aguardar_vez()
+            self._atualizar_preco(request)
+            if original and abs(request["price"] - original) > limite:
+                self.metricas.contar("fora_do_desvio")
+                return ResultadoEnvio(resultado, request, tentativa, retcode,
+                                      f"Preço {request['price']} fora do desvio de {original}")
+
+            with self.metricas.medir("order_send"):
+                resultado = mt5.order_send(request)
+            self.metricas.contar("envios")
+            if resultado is None:
+                # Resultado incerto: não reenvia
+                retcode, comentario = None, f"Sem resposta do terminal (não reenviada): {mt5.last_error()}"
+                self.metricas.contar("sem_resposta")
+                break
+            retcode, comentario = resultado.retcode, resultado.comment
+            if retcode not in RETCODES_REPETIR:
+                break
+            self.metricas.contar("repeticoes")
+
+        return ResultadoEnvio(resultado, request, tentativa, retcode, comentario)
+
+    def fechar(self, timeout=5.0):
+        """Encerra a thread depois dos pedidos já enfileirados"""
+        with self.lock:
+            thread, self.thread = self.thread, None
+        if thread is not None:
+            self.fila.put((float("inf"), next(self.sequencia), None))
+            thread.join(timeout)
+
+
+# Gateway padrão compartilhado pelas estratégias
+gateway_ordens = GatewayOrdens()
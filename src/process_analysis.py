@@ -0,0 +1,125 @@
+"""Análise dos ativos num pool de processos sobre janelas de barras em memória compartilhada.
+
+Modo opcional para muitos ativos: o cálculo de indicadores e regras sai do
+processo principal (e do GIL dele). As janelas das últimas `janela` barras
+de cada ativo ficam num único bloco SharedMemory (ativos x barras, layout
+do MT5); cada ativo tem uma linha fixa. A cada passagem o processo
+principal regrava a janela do ativo na sua linha (uma cópia de `janela`
+barras por ativo, sem serializar nada) e envia aos processos listas de linhas;
+cada processo monta uma view do bloco no início, avalia as linhas em lote
+(mesmas regras vetorizadas do ScannerMercado) e devolve só a Decisao de cada
+ativo. Horário, risco e envio da ordem continuam no processo principal.
+
+No Windows o pool usa spawn: crie o analisador dentro de
+`if __name__ == "__main__":`.
+"""
+import os
+from collections import namedtuple
+from multiprocessing import Pool
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from src.bar_ingestion import DTYPE_BARRAS
+from src.signal_rules import ParametrosEstrategia, avaliar_series, calcular_series, distancias_sl_tp
+
+# sinal: 1 compra, -1 venda, 0 nada; distâncias em preço (como no analisar_e_operar)
+Decisao = namedtuple("Decisao", "sinal forca_tendencia sl_distance tp_distance tempo")
+
+# Estado de cada processo do pool, preenchido pelo _iniciar_processo
+_janelas_processo = None
+_memoria_processo = None
+_parametros_processo = None
+
+
+def _iniciar_processo(nome, capacidade, janela, parametros):
+    global _janelas_processo, _memoria_processo, _parametros_processo
+    _memoria_processo = SharedMemory(name=nome)
+    _janelas_processo = np.ndarray((capacidade, janela), dtype=DTYPE_BARRAS, buffer=_memoria_processo.buf)
+    _parametros_processo = ParametrosEstrategia(**parametros)
+
+
+def avaliar_janelas(janelas, parametros):
+    """Decisões (listas sinal, forca, sl, tp) para uma matriz de janelas ativos x barras"""
+    close = janelas["close"].astype(np.float64)
+    high = janelas["high"].astype(np.float64)
+    low = janelas["low"].astype(np.float64)
+    volume = janelas["tick_volume"].astype(np.float64)
+    series = calcular_series(close, high, low, volume, parametros)
+    condicoes = avaliar_series(series, close, high, low, parametros, ultimas=3)
+    compra = condicoes.pre_compra[:, -1]
+    venda = condicoes.pre_venda[:, -1] & ~compra
+    forca = condicoes.forca_tendencia[:, -1].astype(np.int64)
+    sl, tp = distancias_sl_tp(series["atr"][:, -1], forca, parametros)
+    sinal = np.where(compra, 1, np.where(venda, -1, 0))
+    validos = np.isfinite(close).all(axis=1) & np.isfinite(high).all(axis=1) & np.isfinite(low).all(axis=1)
+    return np.where(validos, sinal, 0), forca, sl, tp
+
+
+def _analisar_lote(linhas):
+    janelas = _janelas_processo[list(linhas)]
+    sinal, forca, sl, tp = avaliar_janelas(janelas, _parametros_processo)
+    tempos = janelas["time"][:, -1]
+    return [
+        (linha, int(sinal[i]), int(forca[i]), float(sl[i]), float(tp[i]), int(tempos[i]))
+        for i, linha in enumerate(linhas)
+    ]
+
+
+class AnalisadorProcessos:
+    """Avalia as regras de sinal de muitos ativos num pool de processos"""
+
+    def __init__(self, capacidade=256, janela=200, processos=None, parametros=None, linhas_por_tarefa=16):
+        self.capacidade = capacidade
+        self.janela = janela
+        self.linhas_por_tarefa = linhas_por_tarefa
+        self.parametros = parametros or ParametrosEstrategia()
+        self.memoria = SharedMemory(create=True, size=capacidade * janela * DTYPE_BARRAS.itemsize)
+        self.janelas = np.ndarray((capacidade, janela), dtype=DTYPE_BARRAS, buffer=self.memoria.buf)
+        self.linhas = {}  # ativo -> linha do bloco
+        self.processos = processos or os.cpu_count() or 1
+        try:
+            self.pool = Pool(self.processos, _iniciar_processo,
+                             (self.memoria.name, capacidade, janela, self.parametros.como_dict()))
+        except BaseException:
+            # Sem pool o bloco não teria quem o liberasse
+            self.janelas = None
+            self.memoria.close()
+            self.memoria.unlink()
+            raise
+
+    def _linha(self, ativo):
+        linha = self.linhas.get(ativo)
+        if linha is None:
+            if len(self.linhas) >= self.capacidade:
+                raise ValueError(f"Capacidade de {self.capacidade} ativos esgotada")
+            linha = self.linhas[ativo] = len(self.linhas)
+        return linha
+
+    def analisar(self, barras_por_ativo):
+        """Decisao por ativo para as barras dadas ({ativo: barras}); ativos com menos de `janela` barras ficam de fora"""
+        linhas = []
+        for ativo, barras in barras_por_ativo.items():
+            if barras is None or len(barras) < self.janela:
+                continue
+            linha = self._linha(ativo)
+            self.janelas[linha] = np.asarray(barras[-self.janela:]).astype(DTYPE_BARRAS, copy=False)
+            linhas.append(linha)
+        if not linhas:
+            return {}
+
+        linhas.sort()
+        lotes = [tuple(linhas[i:i + self.linhas_por_tarefa]) for i in range(0, len(linhas), self.linhas_por_tarefa)]
+        ativos = {linha: ativo for ativo, linha in self.linhas.items()}
+        decisoes = {}
+        for resultado in self.pool.imap_unordered(_analisar_lote, lotes):
+            for linha, sinal, forca, sl, tp, tempo in resultado:
+                decisoes[ativos[linha]] = Decisao(sinal, forca, sl, tp, tempo)
+        return decisoes
+
+    def fechar(self):
+        self.pool.close()
+        self.pool.join()
+        self.janelas = None
+        self.memoria.close()
+        self.memoria.unlink()
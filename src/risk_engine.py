@@ -0,0 +1,176 @@
+"""Risco da carteira compartilhado por todas as estratégias.
+
+Antes cada estratégia consultava `positions_total()` e `account_info()` na
+própria thread e decidia sozinha: duas threads podiam ver 2 posições e abrir
+a terceira ao mesmo tempo. Aqui uma única thread de monitoramento acompanha
+as posições abertas (positions_get), a exposição por ativo e o resultado do
+dia (equity contra o saldo do início do dia), e as estratégias reservam uma
+vaga antes de enviar a ordem:
+
+    reserva = motor_risco.reservar(ativo)   # None se algum limite impede
+    ...
+    motor_risco.confirmar(reserva, ticket)  # ou liberar(reserva) se a ordem falhou
+
+Reservar é uma operação sob lock que conta posições abertas + ordens
+executadas ainda não vistas pelo monitor + reservas em andamento, então
+`max_positions` e `max_daily_loss` valem para a carteira inteira mesmo com
+várias threads enviando ordens ao mesmo tempo. Reservas esquecidas expiram
+depois de `validade_reserva` segundos.
+"""
+import itertools
+import threading
+import time
+from datetime import date
+
+from src.mt5_client import mt5
+from src.signal_rules import ParametrosEstrategia
+
+
+class MotorRisco:
+    def __init__(self, max_positions=ParametrosEstrategia.PADRAO["max_positions"],
+                 max_daily_loss=ParametrosEstrategia.PADRAO["max_daily_loss"],
+                 intervalo=0.5, validade_reserva=30.0, carencia_confirmacao=10.0):
+        self.max_positions = max_positions
+        self.max_daily_loss = max_daily_loss  # em % do saldo do início do dia
+        self.intervalo = intervalo
+        self.validade_reserva = validade_reserva
+        self.carencia_confirmacao = carencia_confirmacao
+        self.lock = threading.Lock()
+        self.posicoes = {}  # ticket -> posição vista no último monitoramento
+        self.confirmadas = {}  # ticket -> instante da execução (ainda não vista pelo monitor)
+        self.reservas = {}  # id -> (ativo, instante)
+        self.ids = itertools.count(1)
+        self.dia = None
+        self.saldo_inicio_dia = None
+        self.equity = None
+        self.sincronizado = False
+        self.thread = None
+        self.parada = threading.Event()
+
+    # Monitoramento
+    def sincronizar(self):
+        """Lê posições e conta do terminal e atualiza o estado (uma ida ao terminal para todas as estratégias)"""
+        posicoes = mt5.positions_get()
+        conta = mt5.account_info()
+        agora = time.monotonic()
+        with self.lock:
+            if posicoes is not None:
+                self.posicoes = {p.ticket: p for p in posicoes}
+                self.confirmadas = {
+                    ticket: instante for ticket, instante in self.confirmadas.items()
+                    if ticket not in self.posicoes and agora - instante < self.carencia_confirmacao
+                }
+            if conta is not None:
+                hoje = date.today()
+                if hoje != self.dia:
+                    # Novo dia: o resultado é medido a partir do saldo atual (sem o flutuante)
+                    self.dia = hoje
+                    self.saldo_inicio_dia = conta.balance
+                self.equity = conta.equity
+            self.sincronizado = True
+
+    def _monitorar(self):
+        while not self.parada.wait(self.intervalo):
+            try:
+                self.sincronizar()
+            except Exception:
+                pass
+
+    def iniciar(self):
+        with self.lock:
+            if self.thread is not None:
+                return
+            self.parada.clear()
+            self.thread = threading.Thread(target=self._monitorar, daemon=True, name="monitor-risco")
+            self.thread.start()
+
+    def parar(self):
+        self.parada.set()
+        with self.lock:
+            thread, self.thread = self.thread, None
+        if thread is not None:
+            thread.join(self.intervalo * 2)
+
+    def _garantir_estado(self):
+        if not self.sincronizado:
+            self.sincronizar()
+        if self.thread is None:
+            self.iniciar()
+
+    # Estado (chamar com o lock)
+    def _expirar_reservas(self, agora):
+        for id_reserva in [i for i, (_, instante) in self.reservas.items() if agora - instante > self.validade_reserva]:
+            del self.reservas[id_reserva]
+
+    def _ocupadas(self):
+        return len(self.posicoes) + len(self.confirmadas) + len(self.reservas)
+
+    def _perda_diaria(self):
+        if not self.saldo_inicio_dia or self.equity is None:
+            return 0.0
+        return (self.saldo_inicio_dia - self.equity) / self.saldo_inicio_dia * 100
+
+    def _motivo_bloqueio(self):
+        if self._ocupadas() >= self.max_positions:
+            return "max_positions"
+        if self._perda_diaria() > self.max_daily_loss:
+            return "max_daily_loss"
+        return None
+
+    # API das estratégias
+    def verificar(self):
+        """(permitido, motivo) sem reservar; motivo é 'max_positions' ou 'max_daily_loss'"""
+        self._garantir_estado()
+        with self.lock:
+            self._expirar_reservas(time.monotonic())
+            motivo = self._motivo_bloqueio()
+        return motivo is None, motivo
+
+    def reservar(self, ativo):
+        """Reserva atomicamente uma vaga para uma ordem de abertura; None se algum limite impede"""
+        self._garantir_estado()
+        agora = time.monotonic()
+        with self.lock:
+            self._expirar_reservas(agora)
+            if self._motivo_bloqueio() is not None:
+                return None
+            id_reserva = next(self.ids)
+            self.reservas[id_reserva] = (ativo, agora)
+            return id_reserva
+
+    def confirmar(self, reserva, ticket):
+        """A ordem da reserva foi executada: a vaga passa a ser da posição `ticket`"""
+        with self.lock:
+            self.reservas.pop(reserva, None)
+            if ticket not in self.posicoes:
+                self.confirmadas[ticket] = time.monotonic()
+
+    def liberar(self, reserva):
+        """A ordem da reserva não foi executada: devolve a vaga"""
+        with self.lock:
+            self.reservas.pop(reserva, None)
+
+    def exposicao(self):
+        """Volume líquido por ativo (compras positivas, vendas negativas) das posições abertas"""
+        with self.lock:
+            posicoes = list(self.posicoes.values())
+        exposicao = {}
+        for p in posicoes:
+            sinal = 1 if p.type == mt5.POSITION_TYPE_BUY else -1
+            exposicao[p.symbol] = exposicao.get(p.symbol, 0.0) + sinal * p.volume
+        return exposicao
+
+    def resumo(self):
+        with self.lock:
+            return {
+                "posicoes": len(self.posicoes),
+                "confirmadas": len(self.confirmadas),
+                "reservas": len(self.reservas),
+                "perda_diaria_pct": round(self._perda_diaria(), 3),
+                "saldo_inicio_dia": self.saldo_inicio_dia,
+                "equity": self.equity,
+            }
+
+
+# Motor padrão compartilhado pelas estratégias
+motor_risco = MotorRisco()
@@ -0,0 +1,159 @@
+from collections import namedtuple
+
+import numpy as np
+
+from src import indicators as indicadores
+
+
+class ParametrosEstrategia:
+    """Parâmetros da EstrategiaTrading para uso fora dela (scanner, backtest)"""
+
+    PADRAO = {
+        "rsi_sobrecomprado": 70,
+        "rsi_sobrevendido": 30,
+        "bb_desvio": 1.8,
+        "atr_period": 10,
+        "stoch_period": 10,
+        "volume_threshold": 1.2,
+        "max_daily_loss": 3.0,
+        "min_rr_ratio": 1.2,
+        "max_positions": 3,
+        "breakeven_level": 0.3,
+    }
+
+    def __init__(self, **valores):
+        desconhecidos = set(valores) - set(self.PADRAO)
+        if desconhecidos:
+            raise ValueError(f"Parâmetros desconhecidos: {sorted(desconhecidos)}")
+        for nome, padrao in self.PADRAO.items():
+            setattr(self, nome, valores.get(nome, padrao))
+
+    def como_dict(self):
+        return {nome: getattr(self, nome) for nome in self.PADRAO}
+
+
+Condicoes = namedtuple("Condicoes", [
+    "tendencia_alta", "tendencia_baixa", "forca_tendencia",
+    "rsi_compra", "rsi_venda", "macd_compra", "macd_venda",
+    "confirmacao_compra", "confirmacao_venda", "pre_compra", "pre_venda",
+])
+
+
+def volume_alto(volume, threshold, janela=20):
+    """Volume da barra acima de `threshold` vezes a média das últimas `janela` barras (inclusive)"""
+    volume = np.asarray(volume, dtype=np.float64)
+    acumulado = np.cumsum(volume, axis=-1)
+    media = np.full(volume.shape, np.nan)
+    media[..., janela - 1:] = acumulado[..., janela - 1:]
+    media[..., janela:] -= acumulado[..., :-janela]
+    media /= janela
+    return volume > media * threshold
+
+
+def rsi_por_barra(close, period=14):
+    """RSI alinhado por barra: a primeira barra recebe 50, como o aquecimento do original"""
+    close = np.asarray(close, dtype=np.float64)
+    saida = np.empty_like(close)
+    saida[..., 0] = 50
+    indicadores.rsi(close, period, out=saida[..., 1:])
+    return saida
+
+
+def calcular_series(close, high, low, volume, params):
+    """Todos os indicadores usados pelas regras, alinhados por barra no último eixo"""
+    macd_line, signal_line = indicadores.macd(close)
+    bb_superior, bb_medio, bb_inferior = indicadores.bollinger_bands(close, 20, params.bb_desvio)
+    stoch_k, _ = indicadores.stochastic(high, low, close, params.stoch_period)
+    return {
+        "ema9": indicadores.ema(close, 9),
+        "ema21": indicadores.ema(close, 21),
+        "ema50": indicadores.ema(close, 50),
+        "macd": macd_line,
+        "sinal_macd": signal_line,
+        "rsi": rsi_por_barra(close, 14),
+        "bb_superior": bb_superior,
+        "bb_medio": bb_medio,
+        "bb_inferior": bb_inferior,
+        "stoch_k": stoch_k,
+        "atr": indicadores.atr(high, low, close, params.atr_period),
+        "momentum": indicadores.momentum(close, 10),
+        "volume_alto": volume_alto(volume, params.volume_threshold),
+    }
+
+
+def avaliar_series(series, close, high, low, params, ultimas=None):
+    """avaliar_condicoes a partir do dicionário de calcular_series (opcionalmente só nas últimas barras)"""
+    corte = slice(None) if ultimas is None else slice(-ultimas, None)
+
+    def c(x):
+        return np.asarray(x)[..., corte]
+
+    return avaliar_condicoes(
+        c(close), c(high), c(low), c(series["ema9"]), c(series["ema21"]), c(series["macd"]),
+        c(series["sinal_macd"]), c(series["rsi"]), c(series["bb_superior"]), c(series["bb_medio"]),
+        c(series["bb_inferior"]), c(series["stoch_k"]), c(series["momentum"]), c(series["volume_alto"]), params
+    )
+
+
+def avaliar_condicoes(close, high, low, ema9, ema21, macd_line, signal_line, rsi, bb_superior, bb_medio,
+                      bb_inferior, stoch_k, momentum, volume_alto, params):
+    """Regras de sinal do analisar_e_operar, vetorizadas no último eixo.
+
+    Todas as séries devem estar alinhadas por barra (mesmo comprimento L >= 3);
+    o resultado cobre as barras 2..L-1, pois as regras olham até duas barras
+    para trás. Horário e risco não entram aqui: dependem da conta, não da série.
+    """
+    def agora(x):
+        return np.asarray(x)[..., 2:]
+
+    def anterior(x):
+        return np.asarray(x)[..., 1:-1]
+
+    def antes_anterior(x):
+        return np.asarray(x)[..., :-2]
+
+    alto = agora(volume_alto)
+
+    tendencia_alta = ((agora(ema9) > agora(ema21)) & (agora(close) > agora(ema21)) & (agora(momentum) > 0)
+                      & (agora(close) > anterior(close)) & (agora(low) > anterior(low)))
+    tendencia_baixa = ((agora(ema9) < agora(ema21)) & (agora(close) < agora(ema21)) & (agora(momentum) < 0)
+                       & (agora(close) < anterior(close)) & (agora(high) < anterior(high)))
+
+    forca_alta = ((agora(ema9) > anterior(ema9)).astype(np.int64) + (agora(ema21) > anterior(ema21))
+                  + (agora(close) > agora(bb_medio)) + (agora(stoch_k) > anterior(stoch_k)) + alto)
+    forca_baixa = ((agora(ema9) < anterior(ema9)).astype(np.int64) + (agora(ema21) < anterior(ema21))
+                   + (agora(close) < agora(bb_medio)) + (agora(stoch_k) < anterior(stoch_k)) + alto)
+    forca_tendencia = np.where(tendencia_alta, forca_alta, np.where(tendencia_baixa, forca_baixa, 0))
+
+    rsi_compra = ((agora(rsi) < params.rsi_sobrevendido) & (agora(rsi) > anterior(rsi))
+                  & (anterior(rsi) > antes_anterior(rsi)))
+    rsi_venda = ((agora(rsi) > params.rsi_sobrecomprado) & (agora(rsi) < anterior(rsi))
+                 & (anterior(rsi) < antes_anterior(rsi)))
+
+    macd_compra = (agora(macd_line) > agora(signal_line)) & (agora(macd_line) > anterior(macd_line))
+    macd_venda = (agora(macd_line) < agora(signal_line)) & (agora(macd_line) < anterior(macd_line))
+
+    # Condições de confirmação (precisa atender pelo menos 2)
+    confirmacao_compra = ((agora(close) < agora(bb_superior)).astype(np.int64) + (agora(stoch_k) < 80) + alto
+                          + (agora(momentum) > 0) + (agora(ema9) > anterior(ema9))) >= 2
+    confirmacao_venda = ((agora(close) > agora(bb_inferior)).astype(np.int64) + (agora(stoch_k) > 20) + alto
+                         + (agora(momentum) < 0) + (agora(ema9) < anterior(ema9))) >= 2
+
+    pre_compra = (tendencia_alta | (rsi_compra & macd_compra)) & confirmacao_compra
+    pre_venda = (tendencia_baixa | (rsi_venda & macd_venda)) & confirmacao_venda
+
+    return Condicoes(
+        tendencia_alta, tendencia_baixa, forca_tendencia,
+        rsi_compra, rsi_venda, macd_compra, macd_venda,
+        confirmacao_compra, confirmacao_venda, pre_compra, pre_venda,
+    )
+
+
+def distancias_sl_tp(atr, forca_tendencia, params):
+    """Distâncias de SL e TP a partir do ATR, ajustadas pela força da tendência"""
+    forca = np.asarray(forca_tendencia)
+    sl_multiplier = np.clip(1 + forca * 0.1, 1.0, 1.5)  # 1.0 a 1.5
+    tp_multiplier = np.clip(1.2 + forca * 0.2, 1.2, 2.0)  # 1.2 a 2.0
+    sl_distance = np.asarray(atr) * sl_multiplier
+    tp_distance = np.asarray(atr) * params.min_rr_ratio * tp_multiplier
+    return sl_distance, tp_distance
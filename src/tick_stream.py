@@ -0,0 +1,116 @@
+"""Barras montadas localmente a partir do fluxo de ticks do terminal.
+
+No modo por ticks a estratégia não baixa mais as 200 barras a cada ciclo:
+o histórico vem uma vez do copy_rates_from_pos e, daí em diante, só os
+ticks novos são pedidos (copy_ticks_from a partir de um cursor por ativo).
+Os ticks de cada lote são agregados em OHLCV no timeframe da estratégia (o
+preço é o `last`, ou o `bid` quando o ativo não informa negócio) e gravados
+num FluxoBarras: a barra em formação é substituída a cada lote e as
+fechadas são acrescentadas. O MotorIndicadores recebe a barra em formação a
+cada lote, então o atraso de um sinal cai para o intervalo entre lotes.
+
+Como no terminal, `tick_volume` é a quantidade de ticks da barra e barras
+sem nenhum tick não existem.
+"""
+import numpy as np
+
+from src.bar_ingestion import DTYPE_BARRAS
+from src.market_data_hub import FluxoBarras
+from src.mt5_cache import cache_mt5
+from src.mt5_client import mt5
+
+
+class FluxoTicks:
+    def __init__(self, ativo, timeframe, segundos, capacidade=1000, lote=5000, max_lotes=20):
+        self.ativo = ativo
+        self.timeframe = timeframe
+        self.segundos = segundos
+        self.capacidade = capacidade
+        self.lote = lote
+        self.max_lotes = max_lotes  # lotes seguidos por atualização ao recuperar um atraso
+        self.fluxo = FluxoBarras(capacidade)
+        self.formacao = None  # barra em formação montada pelos ticks
+        self.cursor_msc = None  # time_msc do último tick incorporado
+        self.vistos_no_cursor = 0  # ticks já incorporados com esse mesmo time_msc
+        self.ticks = 0
+
+    def _semear(self):
+        """Histórico inicial pelas barras do terminal; os ticks começam na abertura da barra em formação"""
+        barras = mt5.copy_rates_from_pos(self.ativo, self.timeframe, 0, self.capacidade)
+        if barras is None or len(barras) == 0:
+            return False
+        self.fluxo.escrever(np.asarray(barras).astype(DTYPE_BARRAS))
+        self.formacao = None
+        self.cursor_msc = int(barras['time'][-1]) * 1000 - 1
+        self.vistos_no_cursor = 0
+        return True
+
+    def _novos(self, ticks):
+        """Descarta os ticks já incorporados (copy_ticks_from tem resolução de segundos)"""
+        msc = ticks['time_msc']
+        novos = msc > self.cursor_msc
+        iguais = np.flatnonzero(msc == self.cursor_msc)
+        if len(iguais) > self.vistos_no_cursor:
+            novos[iguais[self.vistos_no_cursor:]] = True
+        ticks = ticks[novos]
+        if len(ticks):
+            ultimo = int(ticks['time_msc'][-1])
+            repetidos = int(np.count_nonzero(ticks['time_msc'] == ultimo))
+            self.vistos_no_cursor = repetidos + (self.vistos_no_cursor if ultimo == self.cursor_msc else 0)
+            self.cursor_msc = ultimo
+        return ticks
+
+    def _agregar(self, ticks):
+        precos = np.where(ticks['last'] > 0, ticks['last'], ticks['bid'])
+        tempos = ticks['time'] - ticks['time'] % self.segundos
+        inicios = np.flatnonzero(np.r_[True, tempos[1:] != tempos[:-1]])
+        finais = np.r_[inicios[1:] - 1, len(precos) - 1]
+
+        barras = np.zeros(len(inicios), dtype=DTYPE_BARRAS)
+        barras['time'] = tempos[inicios]
+        barras['open'] = precos[inicios]
+        barras['high'] = np.maximum.reduceat(precos, inicios)
+        barras['low'] = np.minimum.reduceat(precos, inicios)
+        barras['close'] = precos[finais]
+        barras['tick_volume'] = finais - inicios + 1
+        barras['real_volume'] = np.add.reduceat(ticks['volume'].astype(np.uint64), inicios)
+        especificacao = cache_mt5.simbolo(self.ativo)
+        if especificacao is not None and especificacao.point:
+            barras['spread'] = np.rint((ticks['ask'][finais] - ticks['bid'][finais]) / especificacao.point)
+
+        # Continuação da barra em formação do lote anterior
+        anterior = self.formacao
+        if anterior is not None and barras['time'][0] == anterior['time']:
+            barras['open'][0] = anterior['open']
+            barras['high'][0] = max(barras['high'][0], anterior['high'])
+            barras['low'][0] = min(barras['low'][0], anterior['low'])
+            barras['tick_volume'][0] += anterior['tick_volume']
+            barras['real_volume'][0] += anterior['real_volume']
+        self.formacao = barras[-1].copy()
+        return barras
+
+    def atualizar(self):
+        """Busca e incorpora os ticks novos; retorna quantos foram incorporados"""
+        if self.cursor_msc is None and not self._semear():
+            return 0
+        incorporados = 0
+        for _ in range(self.max_lotes):
+            brutos = mt5.copy_ticks_from(self.ativo, self.cursor_msc // 1000, self.lote, mt5.COPY_TICKS_ALL)
+            if brutos is None or len(brutos) == 0:
+                break
+            ticks = self._novos(brutos)
+            if len(ticks):
+                self.fluxo.escrever(self._agregar(ticks))
+                incorporados += len(ticks)
+            if len(brutos) < self.lote:
+                break
+        self.ticks += incorporados
+        return incorporados
+
+    def obter(self, quantidade):
+        """Últimas `quantidade` barras depois de incorporar os ticks novos (a última está em formação)"""
+        with self.fluxo.lock:
+            self.atualizar()
+            if self.fluxo.total == 0:
+                return None
+            return self.fluxo.janela(quantidade)
@@ -0,0 +1,132 @@
+"""Pool fixo de threads que executa os ciclos de todas as estratégias.
+
+Em vez de uma thread por ativo dormindo até a próxima barra, cada
+estratégia ativa tem uma entrada num heap ordenado pelo próximo horário de
+execução (o `proxima_espera` do AgendadorBarras dela). Os trabalhadores
+pegam a entrada vencida mais antiga, rodam um ciclo (`executar_ciclo`) e
+devolvem a estratégia ao heap com o novo vencimento. Com N trabalhadores, no
+máximo N ciclos (e portanto N conjuntos de chamadas ao terminal) estão em
+andamento ao mesmo tempo, qualquer que seja o número de ativos.
+
+Uma estratégia nunca roda em dois trabalhadores ao mesmo tempo: ela só volta
+ao heap quando o ciclo termina. Remover um ativo invalida a entrada dele
+(por geração), então um ciclo em andamento termina e não é reagendado. Se a
+mesma estratégia for adicionada de novo enquanto esse ciclo ainda roda (parar
+e iniciar em seguida), a entrada nova só vai para o heap quando ele terminar.
+
+Cada leva de trabalhadores tem o seu sinal de parada: um trabalhador preso
+num ciclo lento além do timeout de `parar()` sai quando o ciclo termina, em
+vez de continuar como trabalhador extra da leva seguinte.
+"""
+import heapq
+import itertools
+import threading
+import time
+
+from src.metrics import metricas
+
+
+class PoolEstrategias:
+    def __init__(self, trabalhadores=4):
+        self.trabalhadores = trabalhadores
+        self.fila = []  # heap de (vencimento monotônico, sequência, ativo, geração)
+        self.ativas = {}  # ativo -> (estratégia, geração)
+        self.em_ciclo = {}  # estratégia com ciclo em andamento -> ativo
+        self.geracoes = itertools.count()
+        self.sequencia = itertools.count()
+        self.condicao = threading.Condition()
+        self.threads = []
+        self.parada = None  # threading.Event da leva atual de trabalhadores
+        self.metricas = metricas.ativo("agendador")
+
+    def _iniciar(self):
+        if not self.threads:
+            self.parada = threading.Event()
+            self.threads = [
+                threading.Thread(target=self._trabalhar, args=(self.parada,), daemon=True, name=f"estrategias-{i}")
+                for i in range(self.trabalhadores)
+            ]
+            for thread in self.threads:
+                thread.start()
+
+    def adicionar(self, ativo, estrategia, atraso=0.0):
+        """Passa a executar a estratégia (substitui a anterior do mesmo ativo)"""
+        with self.condicao:
+            self._iniciar()
+            geracao = next(self.geracoes)
+            self.ativas[ativo] = (estrategia, geracao)
+            if estrategia in self.em_ciclo:
+                return  # vai para o heap quando o ciclo em andamento terminar (_trabalhar)
+            heapq.heappush(self.fila, (time.monotonic() + atraso, next(self.sequencia), ativo, geracao))
+            self.condicao.notify()
+
+    def remover(self, ativo):
+        """Deixa de agendar o ativo; um ciclo em andamento termina normalmente"""
+        with self.condicao:
+            return self.ativas.pop(ativo, None) is not None
+
+    def executando(self, ativo):
+        return ativo in self.ativas
+
+    def ocupada(self, estrategia):
+        """A estratégia está agendada aqui ou com um ciclo em andamento"""
+        with self.condicao:
+            return estrategia in self.em_ciclo or any(e is estrategia for e, _ in self.ativas.values())
+
+    def _proxima(self, parada):
+        """Espera (com a condição adquirida) a próxima estratégia vencida"""
+        while not parada.is_set():
+            if not self.fila:
+                self.condicao.wait()
+                continue
+            vencimento, _, ativo, geracao = self.fila[0]
+            estrategia, atual = self.ativas.get(ativo, (None, None))
+            if atual != geracao:
+                heapq.heappop(self.fila)  # ativo removido ou readicionado
+                continue
+            espera = vencimento - time.monotonic()
+            if espera > 0:
+                self.condicao.wait(espera)
+                continue
+            heapq.heappop(self.fila)
+            self.metricas.registrar("atraso", int(-espera * 1e9))
+            self.em_ciclo[estrategia] = ativo
+            return ativo, estrategia, geracao
+        return None
+
+    def _trabalhar(self, parada):
+        while True:
+            with self.condicao:
+                proxima = self._proxima(parada)
+            if proxima is None:
+                return
+            ativo, estrategia, geracao = proxima
+            espera = estrategia.executar_ciclo()
+            with self.condicao:
+                del self.em_ciclo[estrategia]
+                atual, geracao_atual = self.ativas.get(ativo, (None, None))
+                if atual is estrategia:
+                    # Mesma geração: próximo ciclo; geração nova: readicionada durante o ciclo, roda já
+                    vencimento = time.monotonic() + (espera if geracao_atual == geracao else 0.0)
+                    heapq.heappush(self.fila, (vencimento, next(self.sequencia), ativo, geracao_atual))
+                    self.condicao.notify()
+
+    def parar(self, timeout=5.0):
+        """Remove todas as estratégias e encerra os trabalhadores"""
+        with self.condicao:
+            self.ativas.clear()
+            self.fila.clear()
+            if self.parada is not None:
+                self.parada.set()
+            self.condicao.notify_all()
+            threads, self.threads = self.threads, []
+        for thread in threads:
+            thread.join(timeout)
+
+    def resumo(self):
+        with self.condicao:
+            return {
+                "trabalhadores": len(self.threads),
+                "ativas": len(self.ativas),
+                "agendadas": len(self.fila),
+            }
@@ -0,0 +1,36 @@
+"""Os testes rodam sobre o mt5_simulado.
+
+Ele é instalado aqui, antes de qualquer teste importar os módulos de `src`:
+alguns deles leem constantes do MetaTrader5 na importação.
+"""
+import pytest
+
+from src import mt5_simulado
+
+simulador = mt5_simulado.SimuladorMT5(velocidade=0)
+simulador.gerar_sintetico("WIN$", barras=20000, seed=3)
+mt5_simulado.instalar(simulador)
+
+
+class LogNulo:
+    def __init__(self):
+        self.registros = []
+
+    def habilitado(self, ativo, nivel):
+        return True
+
+    def logar(self, ativo, mensagem, *args, nivel="INFO", evento="log", **campos):
+        self.registros.append((ativo, nivel, evento))
+
+
+@pytest.fixture
+def sim():
+    """Simulador com o relógio parado logo depois do aquecimento e sem posições"""
+    simulador.posicoes.clear()
+    simulador.posicionar(int(simulador.ativos["WIN$"].m1['time'][simulador.aquecimento]) + 30)
+    return simulador
+
+
+@pytest.fixture
+def log():
+    return LogNulo()
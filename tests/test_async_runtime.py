@@ -0,0 +1,119 @@
+"""RuntimeAssincrono: ciclos travados, cancelamento e convivência com o PoolEstrategias"""
+import asyncio
+import threading
+import time
+
+from src.async_runtime import RuntimeAssincrono
+from src.multi_asset_trading import MultiAssetTrading
+
+
+class EstrategiaFalsa:
+    def __init__(self, duracao=0.0, espera=0.01):
+        self.duracao = duracao
+        self.espera = espera
+        self.operando = False
+        self.parada = threading.Event()
+        self.lock = threading.Lock()
+        self.rodando = 0
+        self.maximo = 0
+        self.ciclos = 0
+        self.logs = []
+
+    def executar_ciclo(self):
+        with self.lock:
+            self.rodando += 1
+            self.maximo = max(self.maximo, self.rodando)
+        time.sleep(self.duracao)
+        with self.lock:
+            self.rodando -= 1
+            self.ciclos += 1
+        return self.espera
+
+    def parar(self):
+        self.operando = False
+        self.parada.set()
+
+    def logar(self, mensagem, *args, nivel="INFO", evento="log", **campos):
+        self.logs.append(evento)
+
+
+def montar(**estrategias):
+    multi = MultiAssetTrading()
+    multi.estrategias.update(estrategias)
+    return multi, RuntimeAssincrono(multi, timeout_ciclo=0.05)
+
+
+def test_ciclo_travado_para_a_estrategia():
+    estrategia = EstrategiaFalsa(duracao=0.3)
+    multi, runtime = montar(WIN=estrategia)
+
+    async def cenario():
+        assert runtime.iniciar_ativo("WIN")
+        await asyncio.sleep(0.12)
+        tarefa_encerrada = runtime.tarefas["WIN"].done()
+        degradado = runtime.status()["WIN"]["degradado"]
+        recusado = not runtime.iniciar_ativo("WIN")
+        await asyncio.sleep(0.25)
+        liberado = "WIN" not in multi.assincronos and runtime.status() == {}
+        estrategia.duracao = 0.0
+        reiniciado = runtime.iniciar_ativo("WIN")
+        await asyncio.sleep(0.03)
+        runtime.parar_ativo("WIN")
+        return tarefa_encerrada, degradado, recusado, liberado, reiniciado
+
+    assert asyncio.run(cenario()) == (True, True, True, True, True)
+    assert estrategia.logs.count("timeout") == 1
+    assert estrategia.ciclos > 1
+    assert estrategia.maximo == 1
+    runtime.executor.shutdown()
+
+
+def test_libera_depois_de_fechar_o_loop():
+    estrategia = EstrategiaFalsa(duracao=0.3)
+    multi, runtime = montar(WIN=estrategia)
+
+    async def cenario():
+        runtime.iniciar_ativo("WIN")
+        await asyncio.sleep(0.05)
+
+    asyncio.run(cenario())  # cancela a tarefa com o ciclo ainda no executor
+    assert "WIN" in multi.assincronos
+    runtime.executor.shutdown()
+    assert "WIN" not in multi.assincronos
+    assert multi.iniciar_ativo("WIN")
+    multi.parar_todos()
+
+
+def test_cancelado_so_libera_depois_do_ciclo():
+    estrategia = EstrategiaFalsa(duracao=0.3)
+    multi, runtime = montar(WIN=estrategia)
+
+    async def cenario():
+        runtime.iniciar_ativo("WIN")
+        await asyncio.sleep(0.05)
+        runtime.parar_ativo("WIN")
+        await asyncio.sleep(0.01)
+        recusados = (not runtime.iniciar_ativo("WIN"), not multi.iniciar_ativo("WIN"))
+        await asyncio.sleep(0.35)
+        return recusados, "WIN" in multi.assincronos
+
+    recusados, ainda_reservado = asyncio.run(cenario())
+    assert recusados == (True, True)
+    assert not ainda_reservado
+    assert estrategia.maximo == 1
+    runtime.executor.shutdown()
+
+
+def test_recusa_ativo_do_pool():
+    estrategia = EstrategiaFalsa(duracao=0.01)
+    multi, runtime = montar(WIN=estrategia)
+    assert multi.iniciar_ativo("WIN")
+
+    async def cenario():
+        return runtime.iniciar_ativo("WIN")
+
+    try:
+        assert not asyncio.run(cenario())
+    finally:
+        multi.parar_todos()
+        runtime.executor.shutdown()
@@ -0,0 +1,97 @@
+"""MotorIndicadores incremental contra os kernels em lote de src/indicators.py"""
+import numpy as np
+import pytest
+
+from benchmarks.indicadores import gerar_barras
+from src import indicators as indicadores
+from src.indicator_engine import MotorIndicadores
+
+TOLERANCIA = 1e-9
+AQUECIMENTO = 60  # barras até todos os indicadores terem janela completa
+JANELA = 200  # barras por chamada, como no analisar_e_operar
+
+
+def lote(high, low, close, motor):
+    """Valores dos kernels em lote na série inteira, no formato de MotorIndicadores.valores()"""
+    bb_period, stoch_period, atr_period, rsi_period, momentum_period = motor.params
+    macd, sinal = indicadores.macd(close)
+    superior, medio, inferior = indicadores.bollinger_bands(close, bb_period, motor.bb_desvio)
+    stoch_k, stoch_d = indicadores.stochastic(high, low, close, stoch_period)
+    series = {
+        "ema9": indicadores.ema(close, 9), "ema21": indicadores.ema(close, 21), "ema50": indicadores.ema(close, 50),
+        "macd": macd, "sinal_macd": sinal, "rsi": indicadores.rsi(close, rsi_period),
+        "bb_superior": superior, "bb_medio": medio, "bb_inferior": inferior,
+        "stoch_k": stoch_k, "stoch_d": stoch_d,
+        "atr": indicadores.atr(high, low, close, atr_period),
+        "momentum": indicadores.momentum(close, momentum_period),
+    }
+    return {campo: serie[-motor.historico:] for campo, serie in series.items()}
+
+
+def comparar(motor, high, low, close):
+    esperado = lote(high, low, close, motor)
+    for campo, valores in motor.valores().items():
+        erro = np.abs(valores - esperado[campo]) / np.maximum(1.0, np.abs(esperado[campo]))
+        assert erro.max() <= TOLERANCIA, f"{campo}: erro relativo {erro.max():.3e}"
+
+
+def formacoes(high, low, close, i, passos=3):
+    """Estados intermediários da barra i: extremos parciais e o fechamento andando até o final"""
+    abertura = close[i - 1]
+    for p in range(1, passos + 1):
+        parcial = abertura + (close[i] - abertura) * p / passos
+        yield max(abertura, parcial, high[i] if p == passos else parcial), \
+            min(abertura, parcial, low[i] if p == passos else parcial), parcial
+
+
+def test_fluxo_barra_a_barra_com_formacao():
+    n = 1500  # passa do RESSINCRONIZAR_A_CADA da MediaMovel
+    high, low, close = gerar_barras(n, seed=7)
+    tempo = 1_700_000_000 + 60 * np.arange(n)
+    motor = MotorIndicadores("TESTE", 1, bb_desvio=1.8, stoch_period=10, atr_period=10)
+
+    for i in range(1, n):
+        inicio = max(0, i + 1 - JANELA)
+        for h, l, c in formacoes(high, low, close, i):
+            alta, baixa, fechamento = high[:i + 1].copy(), low[:i + 1].copy(), close[:i + 1].copy()
+            alta[-1], baixa[-1], fechamento[-1] = h, l, c
+            motor.sincronizar(tempo[inicio:i + 1], alta[inicio:], baixa[inicio:], fechamento[inicio:])
+            if i >= AQUECIMENTO and i % 13 == 0:
+                comparar(motor, alta, baixa, fechamento)
+
+    assert motor.barras == n - 1
+    assert motor.tempo_ultima_fechada == tempo[-2]
+
+
+def test_fechar_barra_e_atualizar_formacao():
+    high, low, close = gerar_barras(300, seed=8)
+    motor = MotorIndicadores("TESTE", 1)
+    for i in range(len(close) - 1):
+        motor.fechar_barra(i, high[i], low[i], close[i])
+    motor.atualizar_formacao(high[-1], low[-1], close[-1])
+    comparar(motor, high, low, close)
+
+    # Espiar a formação não altera o estado consolidado
+    motor.atualizar_formacao(high[-1] + 500, low[-1] - 500, close[-1] + 400)
+    motor.atualizar_formacao(high[-1], low[-1], close[-1])
+    comparar(motor, high, low, close)
+
+
+def test_buraco_na_janela_reaquece():
+    high, low, close = gerar_barras(600, seed=9)
+    tempo = 1_700_000_000 + 60 * np.arange(600)
+    motor = MotorIndicadores("TESTE", 1)
+    motor.sincronizar(tempo[:JANELA], high[:JANELA], low[:JANELA], close[:JANELA])
+    motor.sincronizar(tempo[-JANELA:], high[-JANELA:], low[-JANELA:], close[-JANELA:])
+    # Reaquecido só com a última janela: igual ao lote sobre ela
+    comparar(motor, high[-JANELA:], low[-JANELA:], close[-JANELA:])
+    assert motor.barras == JANELA - 1
+
+
+@pytest.mark.parametrize("n", [1, 2, 30])
+def test_poucas_barras_nao_quebra(n):
+    high, low, close = gerar_barras(n, seed=n)
+    motor = MotorIndicadores("TESTE", 1)
+    valores = motor.sincronizar(np.arange(n), high, low, close)
+    assert set(valores) == set(MotorIndicadores.CAMPOS)
+    assert np.isfinite(valores["ema9"]).all()
@@ -0,0 +1,84 @@
+"""Equivalência dos kernels NumPy (src/indicators.py) com as implementações originais em pandas"""
+import numpy as np
+import pytest
+
+from benchmarks.indicadores import casos, ema_pandas, gerar_barras
+from src import indicators as indicadores
+
+TOLERANCIA = 1e-9
+
+
+NOMES = [nome for nome, _, _ in casos(*gerar_barras(30))]
+
+
+def _caso(nome, high, low, close):
+    """(kernel, referência) do caso `nome` ligados às séries dadas"""
+    return next((kernel, referencia) for n, kernel, referencia in casos(high, low, close) if n == nome)
+
+
+def comparar(obtido, esperado):
+    obtido = obtido if isinstance(obtido, tuple) else (obtido,)
+    esperado = esperado if isinstance(esperado, tuple) else (esperado,)
+    assert len(obtido) == len(esperado)
+    for a, b in zip(obtido, esperado):
+        a, b = np.asarray(a, dtype=np.float64), np.asarray(b, dtype=np.float64)
+        assert a.shape == b.shape
+        np.testing.assert_array_equal(np.isnan(a), np.isnan(b))
+        validos = ~np.isnan(a)
+        erro = np.abs(a[validos] - b[validos]) / np.maximum(1.0, np.abs(b[validos]))
+        assert erro.size == 0 or erro.max() <= TOLERANCIA
+
+
+@pytest.mark.parametrize("nome", NOMES)
+@pytest.mark.parametrize("n, seed", [(30, 1), (200, 2), (5000, 3), (100000, 4)])
+def test_serie_igual_ao_original(nome, n, seed):
+    kernel, referencia = _caso(nome, *gerar_barras(n, seed))
+    comparar(kernel(), referencia())
+
+
+@pytest.mark.parametrize("nome", NOMES)
+def test_matriz_igual_a_cada_linha(nome):
+    series = [gerar_barras(300, seed) for seed in range(4)]
+    kernel, _ = _caso(nome, *(np.stack(campo) for campo in zip(*series)))
+    obtido = kernel()
+    for linha, serie in enumerate(series):
+        por_linha = tuple(o[linha] for o in obtido) if isinstance(obtido, tuple) else obtido[linha]
+        comparar(por_linha, _caso(nome, *serie)[1]())
+
+
+@pytest.mark.parametrize("nome", ["ema9", "ema50", "macd", "bollinger", "stochastic", "atr"])
+@pytest.mark.parametrize("n", [1, 5, 9])
+def test_serie_curta_igual_ao_original(nome, n):
+    kernel, referencia = _caso(nome, *gerar_barras(n, seed=n))
+    comparar(kernel(), referencia())
+
+
+@pytest.mark.parametrize("n", [1, 5, 9])
+def test_rsi_serie_curta(n):
+    # O original não trata n-1 < period; o kernel devolve os n-1 valores neutros
+    close = gerar_barras(n, seed=n)[2]
+    np.testing.assert_array_equal(indicadores.rsi(close, 14), np.full(n - 1, 50.0))
+
+
+@pytest.mark.parametrize("n", [1, 5, 10])
+def test_momentum_serie_curta(n):
+    # O original falha com n <= period; sem janela completa o kernel devolve zeros
+    close = gerar_barras(n, seed=n)[2]
+    np.testing.assert_array_equal(indicadores.momentum(close, 10), np.zeros(n))
+
+
+def test_serie_curta_em_matriz():
+    close = np.stack([gerar_barras(5, seed)[2] for seed in range(3)])
+    np.testing.assert_array_equal(indicadores.rsi(close, 14), np.full((3, 4), 50.0))
+    np.testing.assert_array_equal(indicadores.momentum(close, 10), np.zeros((3, 5)))
+    assert np.isnan(indicadores.ema(close, 9)).sum() == 0
+    assert np.isnan(indicadores.media_movel(close, 20)).all()
+
+
+def test_buffer_de_saida():
+    close = gerar_barras(200)[2]
+    buffer = np.empty_like(close)
+    assert indicadores.ema(close, 9, out=buffer) is buffer
+    np.testing.assert_allclose(buffer, ema_pandas(close, 9), rtol=TOLERANCIA)
+    with pytest.raises(ValueError):
+        indicadores.ema(close, 9, out=np.empty(10))
@@ -0,0 +1,18 @@
+"""ScannerMercado: mesmas barras com ou sem ArmazemBarras"""
+import numpy as np
+import pandas as pd
+
+from src.bar_store import ArmazemBarras
+from src.market_scanner import ScannerMercado
+from src.mt5_client import mt5
+
+
+def test_so_barras_fechadas_com_ou_sem_armazem(sim, tmp_path):
+    direto = ScannerMercado(mt5.TIMEFRAME_M5, barras=150)
+    pelo_disco = ScannerMercado(mt5.TIMEFRAME_M5, barras=150, armazem=ArmazemBarras(tmp_path, carga_inicial=500))
+
+    barras = direto.buscar_barras("WIN$")
+    assert barras['time'][-1] + 300 <= sim.agora()
+    np.testing.assert_array_equal(barras, pelo_disco.buscar_barras("WIN$"))
+    pd.testing.assert_frame_equal(direto.escanear(["WIN$"], apenas_candidatos=False),
+                                  pelo_disco.escanear(["WIN$"], apenas_candidatos=False))
@@ -0,0 +1,42 @@
+"""SimuladorMT5: execução de SL/TP pelo trajeto das barras M1"""
+from src.mt5_client import mt5
+
+
+def comprar(sim, sl, tp):
+    tick = sim.symbol_info_tick("WIN$")
+    return sim.order_send({
+        "action": mt5.TRADE_ACTION_DEAL, "symbol": "WIN$", "volume": 1.0, "type": mt5.ORDER_TYPE_BUY,
+        "price": tick.ask, "sl": sl, "tp": tp, "deviation": 10,
+    })
+
+
+def test_stop_no_resto_da_barra_da_entrada(sim):
+    m1 = sim.ativos["WIN$"].m1
+    entrada = m1[sim.aquecimento]
+    # Barra de baixa: a mínima vem depois da metade do minuto, onde o fixture põe o relógio
+    assert entrada['close'] < entrada['open']
+    seguintes = min(m1[sim.aquecimento + 1]['low'], m1[sim.aquecimento + 2]['low'])
+    assert entrada['low'] < seguintes
+    sl = (entrada['low'] + seguintes) / 2
+
+    assert comprar(sim, sl, sim.symbol_info_tick("WIN$").ask + 1000).retcode == mt5.TRADE_RETCODE_DONE
+    sim.avancar(120)
+    assert sim.positions_total() == 0
+    saida = sim.negocios[-1]
+    assert (saida.comment, saida.price, saida.time) == ("sl", sl, int(entrada['time']))
+
+
+def test_stop_dentro_da_barra_da_entrada(sim):
+    entrada = sim.ativos["WIN$"].m1[sim.aquecimento]
+    sl = entrada['low'] + 1
+    assert comprar(sim, sl, sim.symbol_info_tick("WIN$").ask + 1000).retcode == mt5.TRADE_RETCODE_DONE
+    sim.avancar(15)  # a mínima já passou, o preço atual está acima do SL
+    assert sim.symbol_info_tick("WIN$").bid > sl
+    assert sim.positions_total() == 0
+    assert sim.negocios[-1].comment == "sl"
+
+
+def test_sem_toque_continua_aberta(sim):
+    assert comprar(sim, 1.0, 10 ** 9).retcode == mt5.TRADE_RETCODE_DONE
+    sim.avancar(600)
+    assert sim.positions_total() == 1
@@ -0,0 +1,132 @@
+"""GatewayOrdens: repetições, desvio de preço, prioridade e limite de envios"""
+import threading
+import time
+
+import pytest
+
+from src.mt5_client import mt5
+from src.order_gateway import PRIORIDADE_ABERTURA, PRIORIDADE_FECHAMENTO, GatewayOrdens
+
+
+@pytest.fixture
+def gateway():
+    gateway = GatewayOrdens(max_por_segundo=1e9)
+    yield gateway
+    gateway.fechar()
+
+
+def pedido(sim, deslocamento=0.0, **extra):
+    """Compra a mercado pelo ask atual (mais `deslocamento` em preço), com SL/TP a 100 pontos"""
+    preco = sim.symbol_info_tick("WIN$").ask + deslocamento
+    return {
+        "action": mt5.TRADE_ACTION_DEAL, "symbol": "WIN$", "volume": 1.0, "type": mt5.ORDER_TYPE_BUY,
+        "price": preco, "sl": preco - 100, "tp": preco + 100, "deviation": 10, **extra,
+    }
+
+
+def respostas(sim, monkeypatch, *roteiro):
+    """Troca o order_send do simulador: cada item do roteiro é um retcode, None (sem resposta) ou
+    "real" (envio de verdade); depois do roteiro, sempre "real". Retorna a lista de pedidos recebidos"""
+    real = sim.order_send
+    recebidos = []
+    pendentes = list(roteiro)
+
+    def order_send(request):
+        recebidos.append(dict(request))
+        passo = pendentes.pop(0) if pendentes else "real"
+        if passo == "real":
+            return real(request)
+        if passo is None:
+            return None
+        return sim._resultado(passo, request, "Roteiro")
+
+    monkeypatch.setattr(sim, "order_send", order_send)
+    return recebidos
+
+
+def test_requote_e_repetido(sim, gateway, monkeypatch):
+    recebidos = respostas(sim, monkeypatch, mt5.TRADE_RETCODE_REQUOTE)
+    envio = gateway.enviar(pedido(sim)).result(timeout=5)
+    assert envio.executada
+    assert envio.tentativas == 2
+    assert len(recebidos) == 2
+
+
+def test_sem_resposta_nao_e_reenviado(sim, gateway, monkeypatch):
+    recebidos = respostas(sim, monkeypatch, None)
+    envio = gateway.enviar(pedido(sim)).result(timeout=5)
+    assert not envio.executada
+    assert envio.resultado is None and envio.retcode is None
+    assert envio.tentativas == 1 and len(recebidos) == 1
+    assert sim.posicoes == []
+
+
+def test_desiste_depois_de_max_tentativas(sim, gateway, monkeypatch):
+    recebidos = respostas(sim, monkeypatch, *[mt5.TRADE_RETCODE_REQUOTE] * 5)
+    envio = gateway.enviar(pedido(sim)).result(timeout=5)
+    assert not envio.executada
+    assert envio.retcode == mt5.TRADE_RETCODE_REQUOTE
+    assert envio.tentativas == gateway.max_tentativas == len(recebidos)
+
+
+def test_rejeicao_definitiva_nao_e_repetida(sim, gateway, monkeypatch):
+    recebidos = respostas(sim, monkeypatch, mt5.TRADE_RETCODE_INVALID_STOPS)
+    envio = gateway.enviar(pedido(sim)).result(timeout=5)
+    assert not envio.executada
+    assert envio.tentativas == 1 and len(recebidos) == 1
+
+
+def test_preco_atualizado_desloca_sl_tp(sim, gateway, monkeypatch):
+    recebidos = respostas(sim, monkeypatch)
+    original = pedido(sim, deslocamento=-5.0)  # dentro do desvio de 10 pontos
+    envio = gateway.enviar(original).result(timeout=5)
+    assert envio.executada
+    enviado = recebidos[0]
+    assert enviado["price"] == original["price"] + 5.0
+    assert enviado["sl"] == original["sl"] + 5.0 and enviado["tp"] == original["tp"] + 5.0
+
+
+def test_fora_do_desvio_nao_envia(sim, gateway, monkeypatch):
+    recebidos = respostas(sim, monkeypatch)
+    envio = gateway.enviar(pedido(sim, deslocamento=-50.0)).result(timeout=5)
+    assert not envio.executada
+    assert envio.resultado is None
+    assert "fora do desvio" in envio.comentario
+    assert recebidos == []
+
+
+def test_fechamento_passa_na_frente_das_aberturas(sim, gateway, monkeypatch):
+    liberar = threading.Event()
+    real = sim.order_send
+    ordem = []
+
+    def order_send(request):
+        ordem.append(request.get("comment"))
+        if request.get("comment") == "bloqueio":
+            liberar.wait(5)
+        return real(request)
+
+    monkeypatch.setattr(sim, "order_send", order_send)
+    primeiro = gateway.enviar(pedido(sim, comment="bloqueio"))
+    while not ordem:
+        time.sleep(0.001)  # o gateway está preso no primeiro envio
+    aberturas = [gateway.enviar(pedido(sim, comment=f"abertura{i}"), PRIORIDADE_ABERTURA) for i in range(2)]
+    fechamento = gateway.enviar(pedido(sim, comment="fechamento"), PRIORIDADE_FECHAMENTO)
+    liberar.set()
+    for futuro in (primeiro, *aberturas, fechamento):
+        futuro.result(timeout=5)
+    assert ordem == ["bloqueio", "fechamento", "abertura0", "abertura1"]
+
+
+def test_limite_de_envios_por_segundo(sim, monkeypatch):
+    respostas(sim, monkeypatch)
+    gateway = GatewayOrdens(max_por_segundo=20)
+    try:
+        inicio = time.monotonic()
+        futuros = [gateway.enviar(pedido(sim)) for _ in range(30)]
+        for futuro in futuros:
+            assert futuro.result(timeout=10).executada
+        # 20 fichas no balde; as outras 10 saem a 20 por segundo
+        assert time.monotonic() - inicio >= 0.45
+    finally:
+        gateway.fechar()
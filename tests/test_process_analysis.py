@@ -0,0 +1,95 @@
+"""AnalisadorProcessos e o roteamento das decisões pelo MultiAssetTrading"""
+from multiprocessing.shared_memory import SharedMemory
+
+import pytest
+
+from src import process_analysis
+from src.market_data_hub import HubDadosMercado
+from src.multi_asset_trading import EstrategiaTrading, MultiAssetTrading
+from src.process_analysis import AnalisadorProcessos, Decisao
+
+
+def test_janela_termina_na_ultima_barra_fechada(sim, log):
+    agora = sim.agora()
+    direta = EstrategiaTrading("WIN$", "M5", 1, log)
+    barras = direta.obter_barras(50)
+    assert len(barras) == 50
+    assert barras['time'][-1] + 300 <= agora
+
+    hub = HubDadosMercado()
+    hub.assinar("WIN$", direta.timeframe)
+    pelo_hub = EstrategiaTrading("WIN$", "M5", 1, log, hub=hub)
+    assert (pelo_hub.obter_barras(50)['time'] == barras['time']).all()
+
+    intrabar = EstrategiaTrading("WIN$", "M5", 1, log, intrabar=True)
+    assert intrabar.obter_barras(50)['time'][-1] == barras['time'][-1] + 300
+
+
+def test_uma_ordem_por_barra(sim, log, monkeypatch):
+    estrategia = EstrategiaTrading("WIN$", "M5", 1, log)
+    enviadas = []
+    monkeypatch.setattr(estrategia, "verificar_horario_favoravel", lambda: True)
+    monkeypatch.setattr(estrategia, "abrir_ordem", lambda *args: enviadas.append(args))
+
+    for tempo in (600, 600, 300, 900):
+        estrategia.executar_decisao(Decisao(1, 2, 100.0, 200.0, tempo))
+    estrategia.executar_decisao(Decisao(0, 0, 0.0, 0.0, 1200))
+    estrategia.executar_decisao(Decisao(-1, 2, 100.0, 200.0, 1200))
+    assert len(enviadas) == 3
+
+
+def test_estrategia_parada_nao_envia(sim, log, monkeypatch):
+    estrategia = EstrategiaTrading("WIN$", "M5", 1, log)
+    monkeypatch.setattr(estrategia, "verificar_horario_favoravel", lambda: True)
+    estrategia.parar()
+    assert estrategia.executar_decisao(Decisao(1, 2, 100.0, 200.0, 10 ** 10)) is None
+    assert sim.posicoes == []
+
+
+def test_so_ativos_iniciados_em_processos(sim, log, monkeypatch):
+    multi = MultiAssetTrading()
+    multi.adicionar_ativo("WIN$", "M5", 1, log)
+    estrategia = multi.estrategias["WIN$"]
+    roteadas = []
+    monkeypatch.setattr(estrategia, "executar_decisao", roteadas.append)
+    analisador = AnalisadorProcessos(capacidade=2, janela=200, processos=1)
+    try:
+        assert multi.analisar_em_processos(analisador) == {}
+
+        assert multi.iniciar_em_processos("WIN$")
+        assert not multi.iniciar_ativo("WIN$")  # nem no pool enquanto roda aqui
+        decisoes = multi.analisar_em_processos(analisador)
+        assert list(decisoes) == ["WIN$"]
+        assert decisoes["WIN$"].tempo == estrategia.obter_barras(1)['time'][-1]
+        assert roteadas == [decisoes["WIN$"]]
+
+        assert multi.parar_em_processos("WIN$")
+        assert multi.analisar_em_processos(analisador) == {}
+        assert len(roteadas) == 1
+
+        assert multi.iniciar_ativo("WIN$")
+        assert not multi.iniciar_em_processos("WIN$")
+    finally:
+        multi.parar_todos()
+        analisador.fechar()
+
+
+def test_memoria_liberada_se_o_pool_falhar(monkeypatch):
+    criadas = []
+    original = process_analysis.SharedMemory
+
+    def registrar(*args, **kwargs):
+        memoria = original(*args, **kwargs)
+        criadas.append(memoria.name)
+        return memoria
+
+    def falhar(*args, **kwargs):
+        raise OSError("sem processos")
+
+    monkeypatch.setattr(process_analysis, "SharedMemory", registrar)
+    monkeypatch.setattr(process_analysis, "Pool", falhar)
+    with pytest.raises(OSError):
+        AnalisadorProcessos(capacidade=2, janela=10, processos=1)
+    assert len(criadas) == 1
+    with pytest.raises(FileNotFoundError):
+        SharedMemory(name=criadas[0])
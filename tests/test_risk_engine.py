@@ -0,0 +1,88 @@
+"""Limites da carteira no MotorRisco com várias estratégias enviando ao mesmo tempo"""
+import threading
+
+import pytest
+
+from src.mt5_cache import CacheMT5
+from src.mt5_client import mt5
+from src.multi_asset_trading import EstrategiaTrading
+from src.order_gateway import GatewayOrdens
+from src.risk_engine import MotorRisco
+
+
+@pytest.fixture
+def risco():
+    motor = MotorRisco(max_positions=3, max_daily_loss=float("inf"), intervalo=0.05)
+    yield motor
+    motor.parar()
+
+
+@pytest.fixture
+def gateway():
+    gateway = GatewayOrdens(max_por_segundo=1e9)
+    yield gateway
+    gateway.fechar()
+
+
+def test_seis_threads_abrem_exatamente_o_limite(sim, log, risco, gateway):
+    estrategias = [EstrategiaTrading("WIN$", "M5", 1, log, gateway=gateway, risco=risco) for _ in range(6)]
+    largada = threading.Barrier(len(estrategias))
+    futuros = []
+
+    def abrir(estrategia):
+        largada.wait()
+        futuro = estrategia.abrir_ordem(mt5.ORDER_TYPE_BUY, 100.0, 150.0)
+        if futuro is not None:
+            futuros.append(futuro)
+
+    threads = [threading.Thread(target=abrir, args=(e,)) for e in estrategias]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    executadas = [f.result(timeout=5) for f in futuros]
+    assert len(executadas) == 3
+    assert all(envio.executada for envio in executadas)
+    assert len(sim.posicoes) == 3
+    assert risco.reservar("WIN$") is None
+
+
+def test_vaga_da_ordem_rejeitada_e_devolvida(sim, log, risco, gateway, monkeypatch):
+    estrategia = EstrategiaTrading("WIN$", "M5", 1, log, gateway=gateway, risco=risco)
+    monkeypatch.setattr(sim, "order_send", lambda request: sim._resultado(
+        mt5.TRADE_RETCODE_INVALID, request, "Invalid request"))
+    envio = estrategia.abrir_ordem(mt5.ORDER_TYPE_BUY, 100.0, 150.0).result(timeout=5)
+    assert not envio.executada
+    assert risco.resumo()["reservas"] == 0
+
+
+def test_sem_especificacao_nao_reserva(sim, log, risco, gateway, monkeypatch):
+    estrategia = EstrategiaTrading("WIN$", "M5", 1, log, gateway=gateway, risco=risco)
+    estrategia.cache = CacheMT5()
+    monkeypatch.setattr(sim, "symbol_info", lambda nome: None)
+    assert estrategia.abrir_ordem(mt5.ORDER_TYPE_BUY, 100.0, 150.0) is None
+    assert risco.resumo()["reservas"] == 0
+
+
+def test_falha_no_envio_devolve_a_vaga(sim, log, risco, gateway, monkeypatch):
+    estrategia = EstrategiaTrading("WIN$", "M5", 1, log, gateway=gateway, risco=risco)
+
+    def falhar(request, prioridade=None):
+        raise RuntimeError("gateway parado")
+
+    monkeypatch.setattr(gateway, "enviar", falhar)
+    with pytest.raises(RuntimeError):
+        estrategia.abrir_ordem(mt5.ORDER_TYPE_BUY, 100.0, 150.0)
+    assert risco.resumo()["reservas"] == 0
+
+
+def test_perda_diaria_bloqueia(sim):
+    risco = MotorRisco(max_positions=3, max_daily_loss=1.0, intervalo=3600)  # sem sincronizar no meio do teste
+    try:
+        risco.sincronizar()
+        risco.equity = risco.saldo_inicio_dia * 0.98
+        assert risco.verificar() == (False, "max_daily_loss")
+        assert risco.reservar("WIN$") is None
+    finally:
+        risco.parar()
@@ -0,0 +1,64 @@
+"""FluxoTicks: barras agregadas dos ticks contra as do terminal"""
+import numpy as np
+
+from src.mt5_client import mt5
+from src.tick_stream import FluxoTicks
+
+CAMPOS = ["time", "open", "high", "low", "close"]
+
+
+def comparar(fluxo, quantidade):
+    """Barras fechadas idênticas; da barra em formação só abertura e horário.
+
+    O simulador gera quatro ticks por barra M1 em instantes fixos, e a barra em
+    formação dele interpola o preço dentro do minuto.
+    """
+    locais = fluxo.obter(quantidade)
+    terminal = mt5.copy_rates_from_pos(fluxo.ativo, fluxo.timeframe, 0, quantidade)
+    assert len(locais) == len(terminal) == quantidade
+    for campo in CAMPOS:
+        np.testing.assert_array_equal(locais[campo][:-1], terminal[campo][:-1], err_msg=campo)
+    assert (locais[-1]['time'], locais[-1]['open']) == (terminal[-1]['time'], terminal[-1]['open'])
+
+
+def test_barras_agregadas_iguais_as_do_terminal(sim):
+    fluxo = FluxoTicks("WIN$", mt5.TIMEFRAME_M5, 300, lote=7)  # vários lotes por atualização
+    comparar(fluxo, 50)
+    for passo in (7, 61, 1, 299, 13, 900, 3, 45, 301, 120):
+        sim.avancar(passo)
+        comparar(fluxo, 50)
+    assert fluxo.ticks > 0
+
+
+def test_relogio_parado_nao_repete_ticks(sim):
+    fluxo = FluxoTicks("WIN$", mt5.TIMEFRAME_M5, 300, lote=37)
+    fluxo.obter(10)
+    sim.avancar(90)
+    assert fluxo.atualizar() > 0
+    assert fluxo.atualizar() == 0
+    assert fluxo.atualizar() == 0
+
+
+def test_ticks_com_o_mesmo_time_msc(sim):
+    fluxo = FluxoTicks("WIN$", mt5.TIMEFRAME_M5, 300)
+    fluxo.cursor_msc = 1000
+    fluxo.vistos_no_cursor = 1
+    ticks = np.zeros(5, dtype=[("time_msc", np.int64)])
+    ticks["time_msc"] = [999, 1000, 1000, 1001, 1001]
+    novos = fluxo._novos(ticks)
+    np.testing.assert_array_equal(novos["time_msc"], [1000, 1001, 1001])
+    assert (fluxo.cursor_msc, fluxo.vistos_no_cursor) == (1001, 2)
+
+    # Mesmo lote pedido de novo, agora com mais um tick no cursor
+    ticks = np.zeros(4, dtype=[("time_msc", np.int64)])
+    ticks["time_msc"] = [1001, 1001, 1001, 1002]
+    novos = fluxo._novos(ticks)
+    np.testing.assert_array_equal(novos["time_msc"], [1001, 1002])
+    assert (fluxo.cursor_msc, fluxo.vistos_no_cursor) == (1002, 1)
+
+    # Lote que termina no próprio cursor: a contagem acumula
+    ticks = np.zeros(2, dtype=[("time_msc", np.int64)])
+    ticks["time_msc"] = [1002, 1002]
+    novos = fluxo._novos(ticks)
+    np.testing.assert_array_equal(novos["time_msc"], [1002])
+    assert (fluxo.cursor_msc, fluxo.vistos_no_cursor) == (1002, 2)
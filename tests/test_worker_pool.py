@@ -0,0 +1,91 @@
+"""PoolEstrategias: uma estratégia nunca roda em dois trabalhadores ao mesmo tempo"""
+import threading
+import time
+
+import pytest
+
+from src.worker_pool import PoolEstrategias
+
+
+class EstrategiaLenta:
+    """Conta ciclos simultâneos; cada ciclo demora `duracao` segundos"""
+
+    def __init__(self, duracao=0.05, espera=0.0):
+        self.duracao = duracao
+        self.espera = espera
+        self.lock = threading.Lock()
+        self.rodando = 0
+        self.maximo = 0
+        self.ciclos = 0
+        self.comecou = threading.Event()
+
+    def executar_ciclo(self):
+        with self.lock:
+            self.rodando += 1
+            self.maximo = max(self.maximo, self.rodando)
+        self.comecou.set()
+        time.sleep(self.duracao)
+        with self.lock:
+            self.rodando -= 1
+            self.ciclos += 1
+        return self.espera
+
+
+@pytest.fixture
+def pool():
+    pool = PoolEstrategias(trabalhadores=4)
+    yield pool
+    pool.parar()
+
+
+def test_reiniciar_durante_o_ciclo_nao_sobrepoe(pool):
+    estrategia = EstrategiaLenta()
+    pool.adicionar("WIN$", estrategia)
+    estrategia.comecou.wait(1)
+    for _ in range(5):
+        pool.remover("WIN$")
+        pool.adicionar("WIN$", estrategia)
+    time.sleep(0.3)
+    assert estrategia.maximo == 1
+    assert estrategia.ciclos >= 2  # a entrada readicionada voltou a rodar
+
+
+def test_removida_durante_o_ciclo_nao_volta(pool):
+    estrategia = EstrategiaLenta()
+    pool.adicionar("WIN$", estrategia)
+    estrategia.comecou.wait(1)
+    pool.remover("WIN$")
+    assert pool.ocupada(estrategia)
+    time.sleep(0.2)
+    assert estrategia.ciclos == 1
+    assert not pool.ocupada(estrategia)
+
+
+def test_muitos_ativos_com_poucos_trabalhadores(pool):
+    estrategias = {f"A{i}": EstrategiaLenta(duracao=0.001, espera=0.01) for i in range(50)}
+    for ativo, estrategia in estrategias.items():
+        pool.adicionar(ativo, estrategia)
+    time.sleep(0.3)
+    assert all(e.ciclos > 0 and e.maximo == 1 for e in estrategias.values())
+
+
+def test_parar_encerra_os_trabalhadores(pool):
+    pool.adicionar("WIN$", EstrategiaLenta(duracao=0.01))
+    threads = list(pool.threads)
+    pool.parar()
+    assert not any(thread.is_alive() for thread in threads)
+    assert pool.resumo()["trabalhadores"] == 0
+
+
+def test_trabalhador_atrasado_nao_fica_na_leva_seguinte(pool):
+    lenta = EstrategiaLenta(duracao=0.3)
+    pool.adicionar("WIN$", lenta)
+    assert lenta.comecou.wait(1)
+    antigas = list(pool.threads)
+    pool.parar(timeout=0.01)  # o trabalhador com o ciclo lento ainda não saiu
+    assert any(thread.is_alive() for thread in antigas)
+
+    pool.adicionar("PETR4", EstrategiaLenta(duracao=0.001, espera=0.01))
+    time.sleep(0.4)
+    assert not any(thread.is_alive() for thread in antigas)
+    assert sum(thread.is_alive() for thread in pool.threads) == pool.trabalhadores
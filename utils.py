@@ -1,6 +1,6 @@
 import json
 import os
-import MetaTrader5 as mt5
+from src.mt5_client import mt5
 
 CAMINHO_LOGIN_SALVO = "login_salvo.json"
 